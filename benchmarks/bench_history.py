@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark memori riwayat sesi EduBot
+Membandingkan memori per 1.000 sesi antara representasi lama (list dict per sesi,
+dipangkas saat melebihi 10 pesan) dan SessionHistory (pesan slot, ring buffer, prompt
+sistem bersama), untuk sesi yang dibuat di memori dan sesi yang dimuat ulang dari disk.
+
+Jalankan dari direktori repositori:
+    python3 benchmarks/bench_history.py [jumlah_sesi]
+"""
+import os
+import sys
+import json
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from message_history import SessionHistory
+
+# Prompt sistem sepanjang prompt penjelasan kode
+SYSTEM_PROMPT = "Anda adalah asisten yang ahli dalam pemrograman. " * 20
+EXCHANGES = 12
+
+def legacy_session(system_prompt, exchanges):
+    """Riwayat dengan cara lama: list dict, dipangkas ke prompt sistem + 6 pesan terakhir"""
+    history = [{"role": "system", "content": system_prompt}]
+    for user, answer in exchanges:
+        history.append({"role": "user", "content": user})
+        history.append({"role": "assistant", "content": answer})
+        if len(history) > 10:
+            system_prompts = [msg for msg in history if msg["role"] == "system"]
+            history = system_prompts + history[-6:]
+    return history
+
+def compact_session(system_prompt, exchanges):
+    """Riwayat dengan SessionHistory"""
+    history = SessionHistory(system_prompt)
+    for user, answer in exchanges:
+        history.append("user", user)
+        history.append("assistant", answer)
+    return history
+
+def make_exchanges(index):
+    return [
+        (f"Pertanyaan {index}-{turn}: bagaimana cara kerja perintah ini?",
+         f"Jawaban {index}-{turn}: " + "penjelasan " * 40)
+        for turn in range(EXCHANGES)
+    ]
+
+def measure(build, sessions, reload):
+    """Memori (byte) yang dipakai oleh riwayat semua sesi"""
+    # Isi pesan dibuat sebelum pengukuran; yang diukur hanya struktur riwayat (dan
+    # salinan prompt sistem untuk sesi yang dimuat ulang dari disk)
+    inputs = [make_exchanges(index) for index in range(sessions)]
+    encoded = json.dumps(SYSTEM_PROMPT)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Sesi yang dimuat dari disk membawa salinan prompt sistemnya sendiri
+    prompts = [json.loads(encoded) if reload else SYSTEM_PROMPT for _ in range(sessions)]
+    histories = [build(prompts[index], inputs[index]) for index in range(sessions)]
+    # Prompt hasil muat ulang yang tidak dipakai lagi ikut dibebaskan
+    del prompts
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, histories
+
+def assembly_time(histories, legacy, rounds=20):
+    """Waktu rata-rata (mikrodetik) menyusun pesan permintaan dan payload-nya untuk satu sesi"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for history in histories:
+            if legacy:
+                list(history) + [{"role": "user", "content": "pertanyaan baru"}]
+            else:
+                history.view("pertanyaan baru").payload()
+    return (time.perf_counter() - started) / (rounds * len(histories)) * 1e6
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"{sessions} sesi, {EXCHANGES} pertukaran per sesi, prompt sistem {len(SYSTEM_PROMPT)} karakter\n")
+    print(f"{'skenario':<24}{'lama (KB)':>12}{'baru (KB)':>12}{'selisih':>10}")
+    for label, reload in (("sesi di memori", False), ("sesi dimuat dari disk", True)):
+        legacy, legacy_histories = measure(legacy_session, sessions, reload)
+        compact, compact_histories = measure(compact_session, sessions, reload)
+        scale = 1000 / sessions / 1024
+        print(f"{label:<24}{legacy * scale:>12.1f}{compact * scale:>12.1f}{(compact - legacy) / legacy:>10.0%}")
+
+    print(f"\nmenyusun pesan + payload per permintaan: lama {assembly_time(legacy_histories, True):.2f} us, "
+          f"baru {assembly_time(compact_histories, False):.2f} us")
+
+if __name__ == "__main__":
+    main()
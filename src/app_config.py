@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul konfigurasi bersama untuk EduBot
+Menyediakan lokasi direktori data dan pembacaan config.json tanpa bergantung pada PyQt
+"""
+import os
+import json
+
+# Direktori data aplikasi (sama dengan yang digunakan AuthManager)
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".edubot")
+CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+
+# Penanda di keyring untuk provider tanpa API key (misalnya server lokal tanpa otentikasi)
+NO_API_KEY = "none"
+
+# URL bawaan untuk server OpenAI-kompatibel
+DEFAULT_COMPATIBLE_URL = "http://localhost:8000/v1"
+
+def load_config():
+    """
+    Membaca konfigurasi dari config.json
+
+    Returns:
+        dict: Isi konfigurasi, atau dict kosong jika file tidak ada atau rusak
+    """
+    if not os.path.exists(CONFIG_FILE):
+        return {}
+
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            config = json.load(f)
+        return config if isinstance(config, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def normalize_base_url(base_url):
+    """
+    Menyeragamkan URL dasar server OpenAI-kompatibel menjadi bentuk ".../v1"
+
+    Args:
+        base_url (str): URL dari pengguna, boleh dengan atau tanpa /v1 atau /chat/completions
+
+    Returns:
+        str: URL dasar tanpa garis miring di akhir
+    """
+    url = (base_url or DEFAULT_COMPATIBLE_URL).strip().rstrip("/")
+    if not url.startswith(("http://", "https://")):
+        url = "http://" + url
+    if url.endswith("/chat/completions"):
+        url = url[:-len("/chat/completions")]
+    if "/v1" not in url:
+        url += "/v1"
+    return url
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul logging untuk EduBot
+Menulis log terstruktur (ID permintaan, provider, sesi, waktu) ke berkas bergulir di
+~/.edubot/logs melalui antrean, sehingga thread GUI dan pekerja tidak pernah menunggu disk
+"""
+import os
+import sys
+import copy
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from app_config import CONFIG_DIR
+from metrics import registry
+
+LOGS_DIR = os.path.join(CONFIG_DIR, "logs")
+LOG_FILE = os.path.join(LOGS_DIR, "edubot.log")
+
+# Nilai bawaan yang dapat diubah melalui bagian "logging" di config.json
+DEFAULT_LEVEL = "INFO"
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_BUFFER_SIZE = 2000
+
+# Field tambahan (logger.info(..., extra={...})) yang ikut disimpan dan ditampilkan
+CONTEXT_FIELDS = ("request_id", "session", "provider", "model", "source", "elapsed_ms")
+
+# Pustaka yang terlalu ramai pada level INFO
+NOISY_LOGGERS = ("httpx", "httpcore", "urllib3", "openai", "google")
+
+_request_id = contextvars.ContextVar("edubot_request_id", default=None)
+
+def new_request_id():
+    """ID pendek untuk satu permintaan"""
+    return uuid.uuid4().hex[:8]
+
+def current_request_id():
+    """ID permintaan yang sedang diproses di thread/konteks ini, atau None"""
+    return _request_id.get()
+
+@contextmanager
+def request_scope(request_id=None):
+    """
+    Menandai semua log di dalam blok dengan satu ID permintaan
+
+    Dapat dipakai sebagai decorator (@request_scope()); setiap panggilan mendapat ID baru.
+
+    Args:
+        request_id (str, optional): ID yang dipakai. Defaults to None (dibuat baru).
+
+    Yields:
+        str: ID permintaan
+    """
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+class ContextFilter(logging.Filter):
+    """Menambahkan ID permintaan aktif ke record di thread yang menulis log"""
+
+    def filter(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = _request_id.get()
+        return True
+
+def record_fields(record):
+    """
+    Mengubah record menjadi dict yang dapat disimpan sebagai JSON
+
+    Args:
+        record (logging.LogRecord): Record log
+
+    Returns:
+        dict: Waktu, level, modul, thread, pesan, dan field tambahan yang terisi
+    """
+    data = {
+        "time": record.created,
+        "level": record.levelname,
+        "logger": record.name,
+        "thread": record.threadName,
+        "message": record.getMessage(),
+    }
+    for field in CONTEXT_FIELDS:
+        value = getattr(record, field, None)
+        if value is not None:
+            data[field] = value
+    if record.exc_text:
+        data["exc"] = record.exc_text
+    return data
+
+class JsonFormatter(logging.Formatter):
+    """Satu record per baris dalam format JSON"""
+
+    def format(self, record):
+        data = record_fields(record)
+        data["time"] = self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}"
+        return json.dumps(data, ensure_ascii=False)
+
+class RecentRecords(logging.Handler):
+    """Menyimpan record terakhir di memori untuk penampil log"""
+
+    def __init__(self, capacity=DEFAULT_BUFFER_SIZE):
+        super().__init__()
+        self._records = deque(maxlen=capacity)
+        self._seq = 0
+        self._records_lock = threading.Lock()
+        self.counts = {}
+
+    def emit(self, record):
+        data = record_fields(record)
+        with self._records_lock:
+            self._seq += 1
+            data["seq"] = self._seq
+            self._records.append(data)
+            self.counts[record.levelname] = self.counts.get(record.levelname, 0) + 1
+
+    def since(self, seq=0):
+        """Record dengan nomor urut lebih besar dari seq"""
+        with self._records_lock:
+            return [data for data in self._records if data["seq"] > seq]
+
+    def stats(self):
+        """Mengembalikan jumlah record per level untuk diagnostik"""
+        with self._records_lock:
+            return dict(self.counts, buffered=len(self._records))
+
+class _Queue(QueueHandler):
+    """QueueHandler yang menyimpan traceback terpisah dari pesan"""
+
+    def prepare(self, record):
+        # Pesan dan traceback disusun di thread asal selagi argumen dan frame-nya masih ada
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener = None
+_recent = None
+_setup_lock = threading.Lock()
+
+def setup_logging(config=None):
+    """
+    Memasang logging aplikasi; pemanggilan berikutnya tidak melakukan apa pun
+
+    Semua record masuk ke antrean dan ditulis oleh satu thread latar ke berkas bergulir,
+    stderr, dan buffer memori untuk penampil log.
+
+    Args:
+        config (dict, optional): Bagian "logging" dari config.json. Defaults to None.
+
+    Returns:
+        bool: True jika logging baru dipasang
+    """
+    global _listener, _recent
+    config = config or {}
+    with _setup_lock:
+        if _listener is not None:
+            return False
+
+        handlers = []
+        try:
+            os.makedirs(LOGS_DIR, exist_ok=True)
+            file_handler = RotatingFileHandler(
+                LOG_FILE,
+                maxBytes=config.get("max_bytes", DEFAULT_MAX_BYTES),
+                backupCount=config.get("backup_count", DEFAULT_BACKUP_COUNT),
+                encoding="utf-8"
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        except OSError as e:
+            sys.stderr.write(f"Gagal membuka berkas log {LOG_FILE}: {e}\n")
+
+        # Build PyInstaller berjendela tidak memiliki stderr
+        if sys.stderr is not None:
+            console = logging.StreamHandler(sys.stderr)
+            console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s", "%H:%M:%S"))
+            handlers.append(console)
+
+        _recent = RecentRecords(config.get("buffer_size", DEFAULT_BUFFER_SIZE))
+        handlers.append(_recent)
+
+        records = queue.SimpleQueue()
+        queue_handler = _Queue(records)
+        queue_handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        root.setLevel(str(config.get("level", DEFAULT_LEVEL)).upper())
+        root.addHandler(queue_handler)
+        for name in NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+
+        registry.register_source("logging", _recent.stats)
+        logging.captureWarnings(True)
+        _install_excepthooks()
+        return True
+
+def _install_excepthooks():
+    """Mencatat exception yang tidak tertangani (GUI maupun thread latar) ke log"""
+    logger = logging.getLogger("edubot")
+    previous = sys.excepthook
+
+    def excepthook(exc_type, exc, tb):
+        if issubclass(exc_type, KeyboardInterrupt):
+            previous(exc_type, exc, tb)
+            return
+        # Traceback sudah ditulis ke stderr oleh handler konsol
+        logger.critical("Exception tidak tertangani", exc_info=(exc_type, exc, tb))
+
+    def thread_excepthook(args):
+        if args.exc_type is not SystemExit:
+            thread = args.thread.name if args.thread else "?"
+            logger.critical(
+                "Exception tidak tertangani di thread %s", thread,
+                exc_info=(args.exc_type, args.exc_value, args.exc_traceback)
+            )
+
+    sys.excepthook = excepthook
+    threading.excepthook = thread_excepthook
+
+def shutdown():
+    """Menulis semua record yang tersisa di antrean lalu menghentikan thread log"""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+def recent_records(since=0):
+    """
+    Record log terakhir untuk penampil log
+
+    Args:
+        since (int, optional): Hanya record dengan nomor urut lebih besar. Defaults to 0.
+
+    Returns:
+        list: Dict record (lihat record_fields) dengan kunci tambahan "seq"
+    """
+    if _recent is None:
+        return []
+    return _recent.since(since)
+
+def elapsed_ms(started):
+    """Milidetik sejak time.perf_counter() started"""
+    return round((time.perf_counter() - started) * 1000)
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 """
 Modul Auth Manager untuk EduBot
-Mengelola otentikasi pengguna dengan OpenAI/ChatGPT API, DeepSeek API, dan Google Gemini API
+Mengelola otentikasi pengguna dengan OpenAI/ChatGPT API, DeepSeek API, Google Gemini API,
+dan server OpenAI-kompatibel (misalnya server inferensi lokal)
 """
+import logging
 import os
 import json
 import webbrowser
@@ -18,19 +20,40 @@ from PyQt5.QtWidgets import QMessageBox, QInputDialog, QLineEdit, QDialog, QVBox
 from PyQt5.QtCore import QUrl, QDir
 from dotenv import load_dotenv
 
+from app_config import NO_API_KEY, DEFAULT_COMPATIBLE_URL, normalize_base_url
+
+logger = logging.getLogger(__name__)
+
 # Konstanta untuk otentikasi
 AUTH_SERVER_PORT = 8000
 SERVICE_NAME = "edubot"
 OPENAI_API_KEY_NAME = "openai_api_key"
 DEEPSEEK_API_KEY_NAME = "deepseek_api_key"
 GEMINI_API_KEY_NAME = "gemini_api_key"
+COMPATIBLE_API_KEY_NAME = "compatible_api_key"
+
+# Nama entri keyring untuk setiap provider
+API_KEY_NAMES = {
+    "openai": OPENAI_API_KEY_NAME,
+    "deepseek": DEEPSEEK_API_KEY_NAME,
+    "gemini": GEMINI_API_KEY_NAME,
+    "compatible": COMPATIBLE_API_KEY_NAME,
+}
+
+# Nama tampilan setiap provider
+PROVIDER_NAMES = {
+    "openai": "OpenAI (ChatGPT)",
+    "deepseek": "DeepSeek AI",
+    "gemini": "Google Gemini",
+    "compatible": "Server OpenAI-kompatibel",
+}
 CONFIG_DIR = os.path.join(QDir.homePath(), ".edubot")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 
 class ApiKeyDialog(QDialog):
     """Dialog untuk memilih provider AI dan memasukkan API key"""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, base_url=None):
         super().__init__(parent)
         self.setWindowTitle("EduBot - Pilih AI Provider dan Masukkan API Key")
         self.setMinimumWidth(500)
@@ -61,6 +84,11 @@ class ApiKeyDialog(QDialog):
         provider_layout.addWidget(self.gemini_radio)
         self.provider_group.addButton(self.gemini_radio)
         
+        self.compatible_radio = QRadioButton("Server OpenAI-kompatibel (lokal/LAN)")
+        self.compatible_radio.toggled.connect(self._toggle_provider)
+        provider_layout.addWidget(self.compatible_radio)
+        self.provider_group.addButton(self.compatible_radio)
+        
         layout.addLayout(provider_layout)
         
         # Info label
@@ -68,9 +96,17 @@ class ApiKeyDialog(QDialog):
         self.info_label.setWordWrap(True)
         layout.addWidget(self.info_label)
         
+        # URL server, hanya untuk server OpenAI-kompatibel
+        self.base_url_label = QLabel("URL Server:")
+        layout.addWidget(self.base_url_label)
+        
+        self.base_url_input = QLineEdit(base_url or DEFAULT_COMPATIBLE_URL)
+        self.base_url_input.setPlaceholderText(DEFAULT_COMPATIBLE_URL)
+        layout.addWidget(self.base_url_input)
+        
         # API key input
-        key_label = QLabel("Masukkan API Key:")
-        layout.addWidget(key_label)
+        self.key_label = QLabel("Masukkan API Key:")
+        layout.addWidget(self.key_label)
         
         self.api_key_input = QLineEdit()
         self.api_key_input.setPlaceholderText("API Key...")
@@ -98,6 +134,11 @@ class ApiKeyDialog(QDialog):
     
     def _toggle_provider(self):
         """Toggle informasi berdasarkan provider yang dipilih"""
+        compatible = self.compatible_radio.isChecked()
+        self.base_url_label.setVisible(compatible)
+        self.base_url_input.setVisible(compatible)
+        self.key_label.setText("Masukkan API Key (kosongkan jika server tanpa otentikasi):" if compatible else "Masukkan API Key:")
+        
         if self.openai_radio.isChecked():
             self.info_label.setText(
                 "Untuk mendapatkan API key OpenAI, kunjungi:\n"
@@ -108,6 +149,12 @@ class ApiKeyDialog(QDialog):
                 "Untuk mendapatkan API key DeepSeek, kunjungi:\n"
                 "https://platform.deepseek.com"
             )
+        elif compatible:
+            self.info_label.setText(
+                "Gunakan server apa pun yang menyediakan endpoint /v1/chat/completions, "
+                "misalnya server inferensi lokal di jaringan lab (vLLM, llama.cpp, Ollama) "
+                "atau proxy cache lokal."
+            )
         else:  # Gemini
             self.info_label.setText(
                 "Untuk mendapatkan API key Google Gemini, kunjungi:\n"
@@ -120,8 +167,15 @@ class ApiKeyDialog(QDialog):
             return "openai", self.api_key_input.text()
         elif self.deepseek_radio.isChecked():
             return "deepseek", self.api_key_input.text()
+        elif self.compatible_radio.isChecked():
+            # Server tanpa otentikasi tetap membutuhkan entri di keyring
+            return "compatible", self.api_key_input.text() or NO_API_KEY
         else:
             return "gemini", self.api_key_input.text()
+    
+    def get_base_url(self):
+        """Mendapatkan URL server OpenAI-kompatibel"""
+        return self.base_url_input.text().strip() or DEFAULT_COMPATIBLE_URL
 
 class AuthCallbackHandler(http.server.SimpleHTTPRequestHandler):
     """Handler untuk server HTTP callback otentikasi"""
@@ -211,12 +265,7 @@ class AuthManager:
     def is_authenticated(self):
         """Memeriksa apakah pengguna sudah terotentikasi"""
         # Coba mendapatkan API key dari keyring berdasarkan provider
-        if self.provider == "openai":
-            api_key = keyring.get_password(SERVICE_NAME, OPENAI_API_KEY_NAME)
-        elif self.provider == "deepseek":
-            api_key = keyring.get_password(SERVICE_NAME, DEEPSEEK_API_KEY_NAME)
-        else:  # gemini
-            api_key = keyring.get_password(SERVICE_NAME, GEMINI_API_KEY_NAME)
+        api_key = keyring.get_password(SERVICE_NAME, API_KEY_NAMES[self.provider])
         
         if api_key:
             # Verifikasi API key
@@ -229,24 +278,22 @@ class AuthManager:
     def authenticate(self):
         """Memulai proses otentikasi pengguna"""
         # Tampilkan dialog untuk memilih provider dan memasukkan API key
-        api_dialog = ApiKeyDialog()
+        api_dialog = ApiKeyDialog(base_url=self._compatible_base_url())
         if api_dialog.exec_() == QDialog.Accepted:
             self.provider, api_key = api_dialog.get_provider_and_key()
+            base_url = api_dialog.get_base_url() if self.provider == "compatible" else None
             
             if api_key:
                 # Verifikasi API key
-                if self._verify_api_key(api_key):
+                if self._verify_api_key(api_key, base_url=base_url):
                     # Simpan API key ke keyring berdasarkan provider
-                    if self.provider == "openai":
-                        keyring.set_password(SERVICE_NAME, OPENAI_API_KEY_NAME, api_key)
-                    elif self.provider == "deepseek":
-                        keyring.set_password(SERVICE_NAME, DEEPSEEK_API_KEY_NAME, api_key)
-                    else:  # gemini
-                        keyring.set_password(SERVICE_NAME, GEMINI_API_KEY_NAME, api_key)
+                    keyring.set_password(SERVICE_NAME, API_KEY_NAMES[self.provider], api_key)
                     
                     self.api_key = api_key
                     
-                    # Simpan provider ke konfigurasi
+                    # Simpan provider (dan URL server yang sudah terverifikasi) ke konfigurasi
+                    if base_url:
+                        self.config.setdefault("compatible", {})["base_url"] = base_url
                     self.config["provider"] = self.provider
                     self._save_config()
                     
@@ -262,15 +309,108 @@ class AuthManager:
         
         return False
     
-    def _verify_api_key(self, api_key):
-        """Memverifikasi API key dengan mengirim permintaan uji ke API"""
-        if self.provider == "openai":
+    def add_provider(self, parent=None):
+        """
+        Menambahkan API key untuk provider lain tanpa logout
+        
+        Args:
+            parent (QWidget, optional): Induk dialog. Defaults to None.
+            
+        Returns:
+            str: Provider yang ditambahkan, atau None jika dibatalkan/tidak valid
+        """
+        api_dialog = ApiKeyDialog(parent, base_url=self._compatible_base_url())
+        if api_dialog.exec_() != QDialog.Accepted:
+            return None
+        
+        provider, api_key = api_dialog.get_provider_and_key()
+        if not api_key:
+            return None
+        base_url = api_dialog.get_base_url() if provider == "compatible" else None
+        
+        if not self._verify_api_key(api_key, provider, base_url):
+            QMessageBox.critical(
+                parent,
+                "EduBot - API Key Tidak Valid",
+                f"API key {provider.upper()} yang Anda masukkan tidak valid. Silakan coba lagi."
+            )
+            return None
+        
+        keyring.set_password(SERVICE_NAME, API_KEY_NAMES[provider], api_key)
+        # URL server baru disimpan setelah terverifikasi agar URL yang salah ketik tidak terpakai
+        if base_url:
+            self.config.setdefault("compatible", {})["base_url"] = base_url
+            self._save_config()
+        return provider
+    
+    def get_api_keys(self):
+        """
+        Mendapatkan API key semua provider yang tersimpan di keyring
+        
+        Returns:
+            dict: Pemetaan provider ke API key
+        """
+        api_keys = {}
+        for provider, key_name in API_KEY_NAMES.items():
+            if provider == self.provider and self.api_key:
+                api_keys[provider] = self.api_key
+                continue
+            try:
+                api_key = keyring.get_password(SERVICE_NAME, key_name)
+            except Exception as e:
+                logger.error("Error saat membaca API key %s: %s", provider, e)
+                api_key = None
+            if api_key:
+                api_keys[provider] = api_key
+        return api_keys
+    
+    def set_provider(self, provider, api_key):
+        """
+        Mengganti provider aktif dan menyimpannya ke konfigurasi
+        
+        Args:
+            provider (str): Provider AI ("openai", "deepseek", atau "gemini")
+            api_key (str): API key untuk provider tersebut
+        """
+        self.provider = provider
+        self.api_key = api_key
+        self.config["provider"] = provider
+        self._save_config()
+    
+    def _verify_api_key(self, api_key, provider=None, base_url=None):
+        """Memverifikasi API key dengan mengirim permintaan uji ke API
+        
+        base_url hanya dipakai provider "compatible"; None berarti URL dari konfigurasi.
+        """
+        provider = provider or self.provider
+        if provider == "openai":
             return self._verify_openai_key(api_key)
-        elif self.provider == "deepseek":
+        elif provider == "deepseek":
             return self._verify_deepseek_key(api_key)
+        elif provider == "compatible":
+            return self._verify_compatible_key(api_key, base_url)
         else:
             return self._verify_gemini_key(api_key)
     
+    def _compatible_base_url(self):
+        """URL server OpenAI-kompatibel yang tersimpan di konfigurasi"""
+        return self.config.get("compatible", {}).get("base_url", DEFAULT_COMPATIBLE_URL)
+    
+    def _verify_compatible_key(self, api_key, base_url=None):
+        """Memverifikasi server OpenAI-kompatibel (dan API key jika ada) lewat endpoint /models"""
+        headers = {}
+        if api_key and api_key != NO_API_KEY:
+            headers["Authorization"] = f"Bearer {api_key}"
+        
+        base_url = normalize_base_url(base_url or self._compatible_base_url())
+        
+        try:
+            response = requests.get(f"{base_url}/models", headers=headers, timeout=10)
+            return response.status_code == 200
+        except Exception as e:
+            logger.error("Error saat menghubungi server %s: %s", base_url, e)
+            return False
+    
     def _verify_openai_key(self, api_key):
         """Memverifikasi API key OpenAI"""
         headers = {
@@ -323,18 +463,18 @@ class AuthManager:
                 # Jika berhasil mendapatkan daftar model, API key valid
                 return True
             except Exception as e:
-                print(f"SDK Error saat verifikasi API key Gemini: {e}")
+                logger.error("SDK Error saat verifikasi API key Gemini: %s", e)
                 
                 # Jika SDK error, coba panggil REST API langsung
                 test_url = f"https://generativelanguage.googleapis.com/v1beta/models?key={api_key}"
                 try:
                     response = requests.get(test_url)
                     if response.status_code == 200:
-                        print("Verifikasi API key Gemini berhasil melalui REST API")
+                        logger.info("Verifikasi API key Gemini berhasil melalui REST API")
                         return True
                     else:
                         error_message = response.text
-                        print(f"REST API Error: {error_message}")
+                        logger.error("REST API Error: %s", error_message)
                         
                         # Jika error adalah kuota terlampaui, API key tetap valid
                         if "429" in str(response.status_code) or "quota" in error_message.lower():
@@ -351,11 +491,11 @@ class AuthManager:
                         
                         return False
                 except Exception as net_e:
-                    print(f"Network error saat verifikasi API key: {net_e}")
+                    logger.warning("Network error saat verifikasi API key: %s", net_e)
                     # Asumsi error koneksi, anggap valid untuk pengembangan
                     return True
         except Exception as e:
-            print(f"Error saat memverifikasi API key Gemini: {e}")
+            logger.error("Error saat memverifikasi API key Gemini: %s", e)
             
             # Jika error adalah 429 (quota exceeded), beritahu user bahwa API key valid
             # tapi kuota telah terlampaui
@@ -379,13 +519,17 @@ class AuthManager:
             
             return True
     
+    def save_config(self):
+        """Menyimpan konfigurasi yang diubah dari antarmuka (misalnya pilihan model)"""
+        self._save_config()
+    
     def _save_config(self):
         """Menyimpan konfigurasi ke file"""
         try:
             with open(CONFIG_FILE, "w") as f:
                 json.dump(self.config, f)
         except Exception as e:
-            print(f"Error saat menyimpan konfigurasi: {e}")
+            logger.error("Error saat menyimpan konfigurasi: %s", e)
     
     def get_provider(self):
         """Mendapatkan provider AI yang digunakan"""
@@ -398,12 +542,7 @@ class AuthManager:
     def logout(self):
         """Menghapus kredensial pengguna"""
         try:
-            if self.provider == "openai":
-                keyring.delete_password(SERVICE_NAME, OPENAI_API_KEY_NAME)
-            elif self.provider == "deepseek":
-                keyring.delete_password(SERVICE_NAME, DEEPSEEK_API_KEY_NAME)
-            else:  # gemini
-                keyring.delete_password(SERVICE_NAME, GEMINI_API_KEY_NAME)
+            keyring.delete_password(SERVICE_NAME, API_KEY_NAMES[self.provider])
             
             self.api_key = None
             return True
@@ -4,19 +4,528 @@
 Modul AI API untuk EduBot
 Mengelola komunikasi dengan OpenAI API, DeepSeek API, dan Google Gemini API
 """
+import logging
 import os
 import json
+import time
+import socket
 import openai
 import requests
+import threading
 from datetime import datetime
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from search_index import ConversationIndex
+from semantic_cache import SemanticCache
+from shared_cache import SharedCache, publish, read_entries, entry_key
+from prefetch import SpeculativePrefetcher, command_key
+from singleflight import SingleFlight
+from code_chunker import split_sections, split_lines, estimate_tokens, MIN_SECTION_TOKENS
+from section_cache import SectionCache, section_key
+from script_validator import extract_script, validate_candidates
+from model_catalog import ModelCatalog, ModelInfo, DEFAULT_TTL
+from session_store import SessionStore
+from message_history import SessionHistory, as_payload
+from generation_profiles import DEFAULT_PROFILE, load_profiles, resolve
+from usage_tracker import UsageTracker, QuotaExceeded
+from outbox import Outbox, Offline, is_connectivity_error
+from system_probe import ProbeRunner
+from metrics import registry
+from profiling import stage
+from app_logging import request_scope, elapsed_ms
+from app_config import NO_API_KEY, DEFAULT_COMPATIBLE_URL, normalize_base_url
+
+logger = logging.getLogger(__name__)
+
+# Prompt sistem untuk penjelasan kode
+EXPLAIN_CODE_SYSTEM_PROMPT = """
+        Anda adalah asisten yang ahli dalam menjelaskan kode.
+        
+        Berikan penjelasan yang jelas dan terperinci tentang kode yang diberikan dengan mengikuti panduan berikut:
+        1. Jelaskan fungsi utama kode secara keseluruhan
+        2. Jelaskan cara kerjanya dengan detail
+        3. Identifikasi komponen dan alur penting
+        4. Gunakan bahasa yang sederhana dan mudah dipahami
+        5. Gunakan format paragraf yang baik dengan baris kosong antar paragraf
+        6. Gunakan teks biasa, hindari format bold atau italic
+        7. Gunakan `code` untuk nama fungsi, variabel, dan istilah teknis
+        8. Berikan konteks yang cukup untuk pemahaman
+        9. Hindari jargon teknis yang berlebihan
+        """
+
+# Pengaturan bawaan mode kode besar (bagian "large_code" di config.json)
+LARGE_CODE_TOKENS = 1500
+DEFAULT_CHUNK_TOKENS = 1200
+DEFAULT_CHUNK_WORKERS = 3
+
+# Konteks yang ditambahkan di depan pertanyaan tab Bantuan Terminal
+TERMINAL_CONTEXT = "Berikan bantuan untuk perintah terminal Linux. Jawaban yang berisi contoh perintah harus diberikan dalam bentuk kode (menggunakan tag <pre> untuk format). "
+
+# Panjang cuplikan penjelasan per bagian yang dipakai untuk menyusun gambaran umum file
+OVERVIEW_EXCERPT_CHARS = 400
+
+# Mode penjelasan kode dua tingkat (bagian "code_explanation" di config.json): jumlah baris
+# per blok rincian untuk kode tanpa fungsi/kelas, dan baris awal tiap bagian pada kerangka kode besar
+DETAIL_BLOCK_LINES = 8
+OUTLINE_LINES = 4
+
+# Jumlah kandidat bawaan untuk mode kandidat pembuatan skrip
+DEFAULT_SCRIPT_CANDIDATES = 3
+
+# Pengaturan bawaan server OpenAI-kompatibel (bagian "compatible" di config.json)
+DEFAULT_COMPATIBLE_POOL_SIZE = 8
+DEFAULT_COMPATIBLE_TIMEOUT = 120
+
+# Giliran tool calling paling banyak sebelum jawaban akhir diminta tanpa alat
+MAX_TOOL_ROUNDS = 3
+
+# Ditambahkan setelah prompt sistem jika model boleh memanggil pemeriksaan sistem lokal
+TOOLS_SYSTEM_PROMPT = (
+    "Anda dapat memeriksa komputer pengguna secara langsung dengan alat yang tersedia (baca-saja). "
+    "Jika jawaban bergantung pada keadaan sistem (disk, memori, paket, layanan, log), panggil alat "
+    "yang sesuai, beberapa sekaligus jika perlu, daripada meminta pengguna menjalankan perintah."
+)
+
+class APIError(Exception):
+    """Kesalahan dari provider AI (misalnya kode status HTTP selain 200)"""
+    
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _is_rate_limited(error):
+    """Memeriksa apakah kesalahan provider adalah penolakan 429 (kuota/laju)"""
+    return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429
+
+@stage("provider.stream")
+def _read_sse(response, on_delta=None):
+    """
+    Membaca stream Server-Sent Events chat completion ala OpenAI
+    
+    Args:
+        response (requests.Response): Respons yang dibuka dengan stream=True
+        on_delta (callable, optional): Dipanggil dengan setiap potongan teks. Defaults to None.
+        
+    Returns:
+        tuple: (jawaban lengkap, dict pemakaian dari event terakhir atau dict kosong)
+    """
+    parts = []
+    usage = {}
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        
+        # Server yang mendukung stream_options mengirim pemakaian di event terakhir
+        usage = event.get("usage") or usage
+        for choice in event.get("choices") or []:
+            delta = (choice.get("delta") or {}).get("content")
+            if delta:
+                parts.append(delta)
+                if on_delta:
+                    on_delta(delta)
+    return "".join(parts), usage
+
+def _as_attrs(value):
+    """Dict (field tambahan dari SDK lama) sebagai objek dengan atribut; nilai lain dikembalikan apa adanya"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**value)
+    return value
+
+def _tool_reply(message):
+    """
+    Pesan asisten dari respons chat completion (dict JSON) dalam bentuk yang dapat dikirim ulang
+    
+    Returns:
+        dict: {"role": "assistant", "content", "tool_calls"}; tool_calls kosong jika model menjawab langsung
+    """
+    return {
+        "role": "assistant",
+        "content": message.get("content") or "",
+        "tool_calls": [
+            {
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["function"]["name"], "arguments": call["function"].get("arguments") or "{}"},
+            }
+            for call in message.get("tool_calls") or []
+        ],
+    }
 
 class BaseAPI:
     """Kelas dasar untuk API AI"""
     
+    # Nama provider untuk pesan error
+    name = "AI"
+    
+    # Prompt sistem yang digunakan jika sesi dibuat tanpa prompt sistem
+    default_system_prompt = None
+    
+    # URL ringan untuk membuka koneksi lebih awal (lihat warm_up)
+    warm_url = None
+    
+    # Alamat untuk memeriksa koneksi (lihat is_reachable); bawaannya host warm_url
+    probe_url = None
+    
+    # True jika provider menerima tool calling format OpenAI (lihat complete_with_tools)
+    supports_tools = False
+    
     def __init__(self, api_key):
         """Inisialisasi API dengan API key"""
         self.api_key = api_key
         self.chat_history = {}
+        
+        # Riwayat sesi yang lama tidak dipakai dapat dipindahkan ke disk (lihat evict_idle_sessions)
+        self.session_store = None
+        self.session_access = {}
+        self._history_lock = threading.RLock()
+        
+        # Dipanggil dengan (token masukan, token keluaran, perkiraan?) setelah setiap respons
+        self.usage_callback = None
+        self._last_usage = threading.local()
+        
+        # Session HTTP bersama agar koneksi TLS ke provider dipakai ulang antar permintaan
+        self.http = requests.Session()
+    
+    def warm_up(self):
+        """
+        Membuka koneksi ke provider sebelum permintaan pertama
+        
+        Kesalahan diabaikan; permintaan berikutnya tetap membuka koneksi sendiri jika perlu.
+        """
+        if not self.warm_url:
+            return
+        try:
+            self.http.head(self.warm_url, timeout=5)
+        except Exception as e:
+            logger.warning("Gagal menghangatkan koneksi %s: %s", self.name, e)
+    
+    def is_reachable(self, timeout=3):
+        """
+        Memeriksa apakah server provider dapat dihubungi (DNS dan koneksi TCP saja)
+        
+        Args:
+            timeout (float, optional): Batas waktu koneksi (detik). Defaults to 3.
+            
+        Returns:
+            bool: True jika koneksi TCP berhasil dibuka, atau jika alamat provider tidak diketahui
+        """
+        url = urlsplit(self.probe_url or self.warm_url or "")
+        if not url.hostname:
+            return True
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            socket.create_connection((url.hostname, port), timeout=timeout).close()
+            return True
+        except OSError:
+            return False
+    
+    def _report_usage(self, messages, contents, prompt_tokens=None, completion_tokens=None):
+        """
+        Melaporkan pemakaian token satu respons ke usage_callback
+        
+        Jika provider tidak mengirim metadata pemakaian, token diperkirakan dari panjang teks.
+        
+        Args:
+            messages (list): Pesan yang dikirim
+            contents (list): Teks jawaban yang diterima
+            prompt_tokens (int, optional): Token masukan dari provider. Defaults to None.
+            completion_tokens (int, optional): Token keluaran dari provider. Defaults to None.
+        """
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens("".join(msg["content"] or "" for msg in messages))
+        if completion_tokens is None:
+            completion_tokens = sum(estimate_tokens(content or "") for content in contents)
+        self._last_usage.value = (prompt_tokens, completion_tokens, estimated)
+        
+        if self.usage_callback is None:
+            return
+        try:
+            self.usage_callback(prompt_tokens, completion_tokens, estimated)
+        except Exception as e:
+            logger.error("Error saat mencatat pemakaian %s: %s", self.name, e)
+    
+    def last_usage(self):
+        """
+        Pemakaian token respons terakhir di thread saat ini
+        
+        Returns:
+            tuple: (token masukan, token keluaran, perkiraan?), atau None
+        """
+        return getattr(self._last_usage, "value", None)
+    
+    def _ensure_session(self, session_id, system_prompt=None):
+        """
+        Memastikan riwayat untuk sesi tertentu sudah ada
+        
+        Args:
+            session_id (str): ID sesi
+            system_prompt (str, optional): Prompt sistem untuk pesan pertama sesi baru
+        """
+        self.session_access[session_id] = time.monotonic()
+        if session_id not in self.chat_history and not self._rehydrate_session(session_id):
+            # Jika disediakan prompt sistem, simpan sebagai pesan pertama (dipakai bersama antar sesi)
+            self.chat_history[session_id] = SessionHistory(system_prompt or self.default_system_prompt)
+    
+    def _rehydrate_session(self, session_id):
+        """
+        Memuat kembali riwayat sesi yang sebelumnya dipindahkan ke disk
+        
+        Returns:
+            bool: True jika sesi ditemukan di disk
+        """
+        if self.session_store is None:
+            return False
+        messages = self.session_store.load(session_id)
+        if messages is None:
+            return False
+        self.chat_history[session_id] = SessionHistory.from_list(messages)
+        registry.increment("sessions.rehydrate_events")
+        return True
+    
+    def evict_idle_sessions(self, max_idle):
+        """
+        Memindahkan riwayat sesi yang tidak dipakai selama max_idle detik ke disk
+        
+        Args:
+            max_idle (float): Lama tidak aktif dalam detik
+            
+        Returns:
+            int: Jumlah sesi yang dipindahkan
+        """
+        if self.session_store is None:
+            return 0
+        
+        evicted = 0
+        now = time.monotonic()
+        with self._history_lock:
+            for session_id, last_used in list(self.session_access.items()):
+                if now - last_used < max_idle or session_id not in self.chat_history:
+                    continue
+                if self.session_store.save(session_id, self.chat_history[session_id].to_list()):
+                    del self.chat_history[session_id]
+                    del self.session_access[session_id]
+                    evicted += 1
+        
+        if evicted:
+            registry.increment("sessions.spill_events", evicted)
+        return evicted
+    
+    def build_messages(self, session_id, message, system_prompt=None):
+        """
+        Menyusun pesan untuk permintaan (riwayat sesi + pesan baru) tanpa mengubah riwayat
+        
+        Args:
+            session_id (str): ID sesi
+            message (str): Pesan pengguna
+            system_prompt (str, optional): Prompt sistem jika sesi belum ada
+            
+        Returns:
+            MessagesView: Daftar pesan {"role", "content"} baca-saja
+        """
+        with self._history_lock:
+            self._ensure_session(session_id, system_prompt)
+            return self.chat_history[session_id].view(message)
+    
+    def history_fingerprint(self, session_id):
+        """
+        Sidik jari ringan dari riwayat sesi, berubah setiap kali ada pesan baru
+        
+        Sesi yang sudah dipindahkan ke disk (evict_idle_sessions) dimuat kembali lebih dulu,
+        sehingga pertanyaan lanjutan di sesi yang lama diam tidak dianggap giliran pertama.
+        
+        Args:
+            session_id (str): ID sesi
+            
+        Returns:
+            tuple: Jumlah pesan pengguna/asisten dan hash pesan terakhir; (0, None) sebelum giliran pertama
+        """
+        with self._history_lock:
+            if session_id not in self.chat_history and self._rehydrate_session(session_id):
+                self.session_access[session_id] = time.monotonic()
+            history = self.chat_history.get(session_id)
+            if history is None or not history.turns:
+                return (0, None)
+            return (len(history.turns), hash(history.turns[-1].content))
+    
+    def current_model(self):
+        """Mengembalikan nama model yang sedang digunakan"""
+        return getattr(self, "model", None)
+    
+    def set_model(self, model_name):
+        """
+        Mengganti model tanpa validasi ke API (model sudah diketahui dari katalog)
+        
+        Args:
+            model_name (str): Nama model
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        self.model = model_name
+        return True
+    
+    def list_models(self):
+        """
+        Mengambil daftar model dari provider (dipanggil oleh katalog model di latar belakang)
+        
+        Returns:
+            list: Daftar ModelInfo
+        """
+        raise NotImplementedError
+    
+    def complete(self, messages, profile=None):
+        """
+        Mengirim daftar pesan ke provider tanpa menyentuh riwayat
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+            
+        Returns:
+            str: Konten respons
+            
+        Raises:
+            Exception: Jika permintaan gagal
+        """
+        raise NotImplementedError
+    
+    def complete_stream(self, messages, on_delta=None, profile=None):
+        """
+        Mengirim pesan dan meneruskan jawaban per potongan selagi diterima
+        
+        Provider tanpa dukungan streaming mengirim seluruh jawaban sebagai satu potongan.
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            on_delta (callable, optional): Dipanggil dengan setiap potongan teks. Defaults to None.
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+            
+        Returns:
+            str: Jawaban lengkap
+        """
+        content = self.complete(messages, profile)
+        if on_delta and content:
+            on_delta(content)
+        return content
+    
+    def complete_with_tools(self, messages, tools, profile=None, tool_choice=None):
+        """
+        Mengirim pesan beserta definisi alat; model dapat menjawab atau meminta alat dipanggil
+        
+        Args:
+            messages (list): Daftar pesan, termasuk pesan asisten/tool dari giliran sebelumnya
+            tools (list): Definisi alat format OpenAI (lihat ProbeRunner.tool_specs)
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+            tool_choice (str, optional): "none" untuk meminta jawaban tanpa alat. Defaults to None.
+        
+        Returns:
+            dict: Pesan asisten {"role", "content", "tool_calls"} (lihat _tool_reply)
+        """
+        raise NotImplementedError
+    
+    def complete_candidates(self, messages, n, profile=None):
+        """
+        Meminta beberapa jawaban alternatif untuk daftar pesan yang sama
+        
+        Provider tanpa dukungan banyak jawaban per permintaan menjalankan
+        n panggilan complete secara bersamaan.
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            n (int): Jumlah kandidat
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+        
+        Returns:
+            list: Konten respons yang berhasil (bisa kurang dari n)
+        
+        Raises:
+            Exception: Kesalahan pertama jika semua permintaan gagal
+        """
+        if n <= 1:
+            return [self.complete(messages, profile)]
+        
+        results = []
+        errors = []
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            futures = [executor.submit(self.complete, messages, profile) for _ in range(n)]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        
+        if not results and errors:
+            raise errors[0]
+        return results
+    
+    def _model_for(self, profile):
+        """Model untuk satu panggilan: model pilihan profil, atau model aktif provider"""
+        return (profile and profile.model) or self.model
+    
+    def format_error(self, error):
+        """
+        Mengubah kesalahan menjadi pesan yang ditampilkan kepada pengguna
+        
+        Args:
+            error (Exception): Kesalahan yang terjadi
+            
+        Returns:
+            str: Pesan kesalahan
+        """
+        return f"Terjadi kesalahan: {str(error)}"
+    
+    def get_response(self, message, session_id="default", system_prompt=None):
+        """
+        Mendapatkan respons untuk pesan tertentu dan mencatatnya ke riwayat sesi
+        
+        Args:
+            message (str): Pesan yang dikirim ke AI
+            session_id (str): ID sesi untuk melacak riwayat chat
+            system_prompt (str): Prompt sistem khusus untuk sesi ini
+            
+        Returns:
+            str: Respons dari AI, atau pesan kesalahan
+        """
+        messages = self.build_messages(session_id, message, system_prompt)
+        
+        try:
+            content = self.complete(messages)
+        except Exception as e:
+            logger.error("Error saat berkomunikasi dengan API %s: %s", self.name, e)
+            return self.format_error(e)
+        
+        # Tambahkan pesan pengguna dan respons asisten ke riwayat
+        self.record_exchange(session_id, message, content, system_prompt)
+        return content
+    
+    @stage("history.record")
+    def record_exchange(self, session_id, message, content, system_prompt=None):
+        """
+        Mencatat pasangan pesan/jawaban ke riwayat sesi
+        
+        Juga digunakan saat jawaban diambil dari cache agar konteks percakapan tetap utuh.
+        
+        Args:
+            session_id (str): ID sesi
+            message (str): Pesan pengguna
+            content (str): Jawaban asisten
+            system_prompt (str, optional): Prompt sistem jika sesi belum ada
+        """
+        with self._history_lock:
+            self._ensure_session(session_id, system_prompt)
+            # Ring buffer membatasi panjang riwayat (untuk menghemat token)
+            self.chat_history[session_id].append("user", message)
+            self.chat_history[session_id].append("assistant", content)
     
     def clear_history(self, session_id="default"):
         """
@@ -25,16 +534,21 @@ class BaseAPI:
         Args:
             session_id (str, optional): ID sesi. Defaults to "default".
         """
-        if session_id in self.chat_history:
-            # Simpan prompt sistem jika ada
-            system_prompts = [msg for msg in self.chat_history[session_id] if msg["role"] == "system"]
+        with self._history_lock:
+            if session_id not in self.chat_history and not self._rehydrate_session(session_id):
+                return
             
             # Reset riwayat dengan hanya menyimpan prompt sistem
-            self.chat_history[session_id] = system_prompts
+            self.chat_history[session_id].clear()
 
 class OpenAIAPI(BaseAPI):
     """Kelas untuk berkomunikasi dengan API OpenAI"""
     
+    name = "OpenAI"
+    
+    probe_url = "https://api.openai.com"
+    supports_tools = True
+    
     def __init__(self, api_key):
         """Inisialisasi API dengan API key"""
         super().__init__(api_key)
@@ -55,68 +569,152 @@ class OpenAIAPI(BaseAPI):
         # Model yang digunakan (default: gpt-3.5-turbo)
         self.model = "gpt-3.5-turbo"
     
-    def get_response(self, message, session_id="default", system_prompt=None):
+    def warm_up(self):
+        """Membuka koneksi pool klien OpenAI dengan permintaan metadata model yang ringan"""
+        try:
+            self.client.with_options(timeout=5, max_retries=0).models.retrieve(self.model)
+        except Exception as e:
+            logger.warning("Gagal menghangatkan koneksi %s: %s", self.name, e)
+    
+    def complete(self, messages, profile=None):
         """
-        Mendapatkan respons dari ChatGPT untuk pesan tertentu
+        Mengirim pesan ke ChatGPT tanpa menyentuh riwayat
         
         Args:
-            message (str): Pesan yang dikirim ke ChatGPT
-            session_id (str): ID sesi untuk melacak riwayat chat
-            system_prompt (str): Prompt sistem khusus untuk sesi ini
+            messages (list): Daftar pesan {"role", "content"}
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
             
         Returns:
             str: Respons dari ChatGPT
         """
-        # Pastikan sesi ada
-        if session_id not in self.chat_history:
-            self.chat_history[session_id] = []
-            
-            # Jika disediakan prompt sistem, tambahkan sebagai pesan pertama
-            if system_prompt:
-                self.chat_history[session_id].append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-        
-        # Tambahkan pesan pengguna ke riwayat
-        self.chat_history[session_id].append({
-            "role": "user",
-            "content": message
-        })
+        profile = profile or DEFAULT_PROFILE
         
-        try:
-            # Kirim pesan ke API OpenAI
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.chat_history[session_id],
-                temperature=0.7,
-                max_tokens=1000,
-                n=1,
-                stop=None
-            )
-            
-            # Dapatkan konten respons
-            content = response.choices[0].message.content
-            
-            # Tambahkan respons asisten ke riwayat
-            self.chat_history[session_id].append({
-                "role": "assistant",
-                "content": content
-            })
-            
-            # Batasi panjang riwayat (untuk menghemat token)
-            if len(self.chat_history[session_id]) > 10:
-                # Simpan prompt sistem jika ada
-                system_prompts = [msg for msg in self.chat_history[session_id] if msg["role"] == "system"]
-                
-                # Potong riwayat, simpan 6 pesan terakhir
-                self.chat_history[session_id] = system_prompts + self.chat_history[session_id][-6:]
+        # Kirim pesan ke API OpenAI
+        response = self.client.chat.completions.create(
+            model=self._model_for(profile),
+            messages=as_payload(messages),
+            temperature=profile.temperature,
+            max_tokens=profile.max_tokens,
+            n=1,
+            stop=list(profile.stop) or None
+        )
+        
+        # Dapatkan konten respons
+        content = response.choices[0].message.content
+        usage = getattr(response, "usage", None)
+        self._report_usage(
+            messages, [content],
+            getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+        )
+        return content
+    
+    def complete_stream(self, messages, on_delta=None, profile=None):
+        """
+        Mengirim pesan ke OpenAI dengan stream=True
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            on_delta (callable, optional): Dipanggil dengan setiap potongan teks. Defaults to None.
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
             
-            return content
+        Returns:
+            str: Jawaban lengkap
+        """
+        profile = profile or DEFAULT_PROFILE
+        stream = self.client.chat.completions.create(
+            model=self._model_for(profile),
+            messages=as_payload(messages),
+            temperature=profile.temperature,
+            max_tokens=profile.max_tokens,
+            stop=list(profile.stop) or None,
+            stream=True,
+            # Lewat extra_body: SDK versi lama (requirements.txt) belum mengenal argumen stream_options
+            extra_body={"stream_options": {"include_usage": True}}
+        )
         
-        except Exception as e:
-            print(f"Error saat berkomunikasi dengan API OpenAI: {e}")
-            return f"Terjadi kesalahan: {str(e)}"
+        parts = []
+        usage = None
+        for chunk in stream:
+            # SDK lama menyimpan field yang belum dikenalnya sebagai dict
+            usage = _as_attrs(getattr(chunk, "usage", None)) or usage
+            for choice in chunk.choices:
+                delta = choice.delta.content
+                if delta:
+                    parts.append(delta)
+                    if on_delta:
+                        on_delta(delta)
+        
+        content = "".join(parts)
+        self._report_usage(
+            messages, [content],
+            getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+        )
+        return content
+    
+    def complete_with_tools(self, messages, tools, profile=None, tool_choice=None):
+        """Mengirim pesan ke OpenAI dengan definisi alat (lihat BaseAPI.complete_with_tools)"""
+        profile = profile or DEFAULT_PROFILE
+        response = self.client.chat.completions.create(
+            model=self._model_for(profile),
+            messages=as_payload(messages),
+            temperature=profile.temperature,
+            max_tokens=profile.max_tokens,
+            stop=list(profile.stop) or None,
+            tools=tools,
+            tool_choice=tool_choice or "auto"
+        )
+        
+        message = response.choices[0].message
+        reply = _tool_reply({
+            "content": message.content,
+            "tool_calls": [
+                {"id": call.id, "function": {"name": call.function.name, "arguments": call.function.arguments}}
+                for call in message.tool_calls or []
+            ],
+        })
+        usage = getattr(response, "usage", None)
+        self._report_usage(
+            messages, [reply["content"]],
+            getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+        )
+        return reply
+    
+    def complete_candidates(self, messages, n, profile=None):
+        """
+        Meminta beberapa jawaban alternatif dalam satu permintaan (parameter n)
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            n (int): Jumlah kandidat
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+        
+        Returns:
+            list: Konten setiap pilihan jawaban
+        """
+        profile = profile or DEFAULT_PROFILE
+        response = self.client.chat.completions.create(
+            model=self._model_for(profile),
+            messages=as_payload(messages),
+            temperature=profile.temperature,
+            max_tokens=profile.max_tokens,
+            n=max(1, n),
+            stop=list(profile.stop) or None
+        )
+        contents = [choice.message.content for choice in response.choices if choice.message.content]
+        usage = getattr(response, "usage", None)
+        self._report_usage(
+            messages, contents,
+            getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+        )
+        return contents
+    
+    def list_models(self):
+        """Mengambil daftar model chat dari OpenAI"""
+        chat_prefixes = ("gpt-", "chatgpt-", "o1", "o3", "o4")
+        return [
+            ModelInfo(model.id, None) for model in self.client.models.list()
+            if model.id.startswith(chat_prefixes) and "realtime" not in model.id and "audio" not in model.id
+        ]
     
     def change_model(self, model_name):
         """
@@ -136,12 +734,16 @@ class OpenAIAPI(BaseAPI):
             self.model = model_name
             return True
         except Exception as e:
-            print(f"Error saat mengubah model: {e}")
+            logger.error("Error saat mengubah model: %s", e)
             return False
 
 class DeepSeekAPI(BaseAPI):
     """Kelas untuk berkomunikasi dengan API DeepSeek"""
     
+    name = "DeepSeek"
+    warm_url = "https://api.deepseek.com"
+    supports_tools = True
+    
     def __init__(self, api_key):
         """Inisialisasi API dengan API key"""
         super().__init__(api_key)
@@ -154,100 +756,156 @@ class DeepSeekAPI(BaseAPI):
         # Model yang digunakan (default: deepseek-chat)
         self.model = "deepseek-chat"
     
-    def get_response(self, message, session_id="default", system_prompt=None):
+    def complete(self, messages, profile=None):
         """
-        Mendapatkan respons dari DeepSeek untuk pesan tertentu
+        Mengirim pesan ke DeepSeek tanpa menyentuh riwayat
         
         Args:
-            message (str): Pesan yang dikirim ke DeepSeek
-            session_id (str): ID sesi untuk melacak riwayat chat
-            system_prompt (str): Prompt sistem khusus untuk sesi ini
+            messages (list): Daftar pesan {"role", "content"}
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
             
         Returns:
             str: Respons dari DeepSeek
+            
+        Raises:
+            APIError: Jika API mengembalikan kode status selain 200
         """
-        # Pastikan sesi ada
-        if session_id not in self.chat_history:
-            self.chat_history[session_id] = []
-            
-            # Jika disediakan prompt sistem, tambahkan sebagai pesan pertama
-            if system_prompt:
-                self.chat_history[session_id].append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-        
-        # Tambahkan pesan pengguna ke riwayat
-        self.chat_history[session_id].append({
-            "role": "user",
-            "content": message
-        })
+        # Siapkan payload untuk API DeepSeek
+        payload = self._payload(messages, profile)
         
-        try:
-            # Siapkan payload untuk API DeepSeek
-            payload = {
-                "model": self.model,
-                "messages": self.chat_history[session_id],
-                "temperature": 0.7,
-                "max_tokens": 1000
-            }
-            
-            # Kirim pesan ke API DeepSeek
-            response = requests.post(self.api_url, headers=self.headers, json=payload)
-            
-            if response.status_code == 200:
-                # Parse respons
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
-                
-                # Tambahkan respons asisten ke riwayat
-                self.chat_history[session_id].append({
-                    "role": "assistant",
-                    "content": content
-                })
-                
-                # Batasi panjang riwayat (untuk menghemat token)
-                if len(self.chat_history[session_id]) > 10:
-                    # Simpan prompt sistem jika ada
-                    system_prompts = [msg for msg in self.chat_history[session_id] if msg["role"] == "system"]
-                    
-                    # Potong riwayat, simpan 6 pesan terakhir
-                    self.chat_history[session_id] = system_prompts + self.chat_history[session_id][-6:]
-                
-                return content
-            else:
-                error_message = f"Error code: {response.status_code} - {response.text}"
-                print(error_message)
-                return f"Terjadi kesalahan: {error_message}"
+        # Kirim pesan ke API DeepSeek
+        response = self.http.post(self.api_url, headers=self.headers, json=payload)
         
-        except Exception as e:
-            print(f"Error saat berkomunikasi dengan API DeepSeek: {e}")
-            return f"Terjadi kesalahan: {str(e)}"
+        if response.status_code != 200:
+            raise APIError(f"Error code: {response.status_code} - {response.text}", response.status_code)
+        
+        # Parse respons
+        result = response.json()
+        content = result["choices"][0]["message"]["content"]
+        usage = result.get("usage") or {}
+        self._report_usage(messages, [content], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return content
     
-    def change_model(self, model_name):
+    def complete_stream(self, messages, on_delta=None, profile=None):
         """
-        Mengubah model DeepSeek yang digunakan
+        Mengirim pesan ke DeepSeek dan menerima jawaban sebagai stream SSE
         
         Args:
-            model_name (str): Nama model DeepSeek
+            messages (list): Daftar pesan {"role", "content"}
+            on_delta (callable, optional): Dipanggil dengan setiap potongan teks. Defaults to None.
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
             
         Returns:
-            bool: True jika berhasil, False jika gagal
+            str: Jawaban lengkap
+            
+        Raises:
+            APIError: Jika API mengembalikan kode status selain 200
+        """
+        payload = self._payload(messages, profile)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        
+        with self.http.post(self.api_url, headers=self.headers, json=payload, stream=True) as response:
+            if response.status_code != 200:
+                raise APIError(f"Error code: {response.status_code} - {response.text}", response.status_code)
+            content, usage = _read_sse(response, on_delta)
+        
+        self._report_usage(messages, [content], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return content
+    
+    def complete_with_tools(self, messages, tools, profile=None, tool_choice=None):
+        """
+        Mengirim pesan ke DeepSeek dengan definisi alat (lihat BaseAPI.complete_with_tools)
+        
+        Raises:
+            APIError: Jika API mengembalikan kode status selain 200
+        """
+        payload = self._payload(messages, profile)
+        payload["tools"] = tools
+        payload["tool_choice"] = tool_choice or "auto"
+        
+        response = self.http.post(self.api_url, headers=self.headers, json=payload)
+        if response.status_code != 200:
+            raise APIError(f"Error code: {response.status_code} - {response.text}", response.status_code)
+        
+        result = response.json()
+        reply = _tool_reply(result["choices"][0]["message"])
+        usage = result.get("usage") or {}
+        self._report_usage(messages, [reply["content"]], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return reply
+    
+    def _payload(self, messages, profile):
+        """Payload chat completion sesuai profil generasi"""
+        profile = profile or DEFAULT_PROFILE
+        payload = {
+            "model": self._model_for(profile),
+            "messages": as_payload(messages),
+            "temperature": profile.temperature,
+            "max_tokens": profile.max_tokens
+        }
+        if profile.stop:
+            payload["stop"] = list(profile.stop)
+        return payload
+    
+    def list_models(self):
+        """
+        Mengambil daftar model dari DeepSeek
+        
+        Raises:
+            APIError: Jika API mengembalikan kode status selain 200
+        """
+        response = self.http.get("https://api.deepseek.com/models", headers=self.headers, timeout=10)
+        if response.status_code != 200:
+            raise APIError(f"Error code: {response.status_code} - {response.text}", response.status_code)
+        return [ModelInfo(model["id"], None) for model in response.json().get("data", [])]
+    
+    def change_model(self, model_name):
+        """
+        Mengubah model DeepSeek yang digunakan
+        
+        Args:
+            model_name (str): Nama model DeepSeek
+            
+        Returns:
+            bool: True jika berhasil, False jika gagal
         """
         # Untuk saat ini, kita asumsikan model valid tanpa pengecekan
         self.model = model_name
         return True
 
+# Pesan untuk kuota Gemini yang terlampaui
+GEMINI_QUOTA_MESSAGE = (
+    "Maaf, kuota Google Gemini API Anda telah terlampaui. Ini umum terjadi dengan akun gratis.\n\n"
+    "Beberapa solusi:\n"
+    "1. Tunggu hingga kuota disetel ulang (biasanya 24 jam)\n"
+    "2. Berlangganan paket berbayar di Google AI Studio\n"
+    "3. Gunakan provider AI lain (OpenAI atau DeepSeek)\n\n"
+    "Anda dapat logout dan memilih provider lain di menu File > Logout."
+)
+
 class GeminiAPI(BaseAPI):
     """Kelas untuk berkomunikasi dengan Google Gemini API"""
     
-    def __init__(self, api_key):
-        """Inisialisasi API dengan API key"""
+    name = "Gemini"
+    warm_url = "https://generativelanguage.googleapis.com"
+    
+    def __init__(self, api_key, available_models=None):
+        """
+        Inisialisasi API dengan API key
+        
+        Args:
+            api_key (str): API key Gemini
+            available_models (list, optional): Nama model dari katalog model yang tersimpan,
+                digunakan untuk memilih model tanpa memanggil list_models saat startup. Defaults to None.
+        """
         super().__init__(api_key)
         self.api_key = api_key
         
         # Flag untuk mode fallback ke REST API
         self.use_rest_api = False
+        
+        # Objek model SDK untuk model pilihan profil generasi (lihat _sdk_model)
+        self._profile_models = {}
         self.rest_api_url = "https://generativelanguage.googleapis.com/v1beta/models"
         
         # System prompt default untuk mencegah respons generic
@@ -271,14 +929,11 @@ class GeminiAPI(BaseAPI):
             preferred_models = ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"]
             
             try:
-                # Coba mendapatkan model yang tersedia
-                models = self.genai.list_models()
-                available_models = [model.name.split("/")[-1] for model in models]
-                
-                # Pilih model yang tersedia berdasarkan preferensi
+                # Pilih model yang tersedia berdasarkan preferensi, dari katalog model
+                # yang tersimpan (tanpa permintaan jaringan saat startup)
                 self.model_name = None
                 for model in preferred_models:
-                    if any(model in m for m in available_models):
+                    if any(model in m for m in available_models or []):
                         self.model_name = model
                         break
                 
@@ -297,218 +952,1083 @@ class GeminiAPI(BaseAPI):
                     model_name=self.model_name,
                     generation_config=model_config
                 )
-                print(f"Menggunakan model Gemini: {self.model_name}")
+                logger.info("Menggunakan model Gemini: %s", self.model_name)
             except Exception as e:
-                print(f"Error saat mendapatkan model: {e}")
+                logger.error("Error saat menyiapkan model: %s", e)
                 # Gunakan default jika gagal mendapatkan daftar model
                 self.model_name = "gemini-2.0-flash"
                 self.model = self.genai.GenerativeModel(self.model_name)
                 
         except Exception as e:
-            print(f"Error saat inisialisasi Gemini SDK: {e}")
+            logger.error("Error saat inisialisasi Gemini SDK: %s", e)
             # Jika SDK tidak bisa diinisialisasi, gunakan REST API langsung
             self.use_rest_api = True
             self.model_name = "gemini-2.0-flash"
-            print("Menggunakan REST API fallback untuk Gemini")
+            logger.info("Menggunakan REST API fallback untuk Gemini")
+    
+    def complete(self, messages, profile=None):
+        """
+        Mengirim pesan ke Google Gemini tanpa menyentuh riwayat
+        
+        Gemini menerima prompt gabungan dari prompt sistem dan pesan pengguna terakhir.
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+            
+        Returns:
+            str: Respons dari Gemini
+            
+        Raises:
+            APIError: Jika REST API mengembalikan kode status selain 200
+        """
+        system_text, message, combined_prompt = self._prompt_parts(messages)
+        profile = profile or DEFAULT_PROFILE
+        
+        # Coba gunakan SDK terlebih dahulu jika tidak dalam mode fallback
+        if not self.use_rest_api:
+            try:
+                # Kirim pesan ke Gemini API via SDK
+                response = self._sdk_model(profile).generate_content(
+                    combined_prompt, generation_config=self._generation_config(profile)
+                )
+                
+                # Dapatkan respons
+                content = response.text if hasattr(response, 'text') else str(response)
+                usage = getattr(response, "usage_metadata", None)
+                self._report_usage(
+                    messages, [content],
+                    getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+                )
+                return content
+            except Exception as e:
+                logger.warning("SDK error: %s, mencoba REST API", e)
+                self.use_rest_api = True
+        
+        # Gunakan REST API jika SDK gagal atau sudah dalam mode fallback
+        payload = {
+            "contents": [{
+                "parts":[
+                    {"text": "system: " + system_text},
+                    {"text": "user: " + message}
+                ]
+            }],
+            "generationConfig": {
+                "temperature": profile.temperature,
+                "maxOutputTokens": profile.max_tokens,
+                "topK": 40,
+                "topP": 0.9
+            }
+        }
+        if profile.stop:
+            payload["generationConfig"]["stopSequences"] = list(profile.stop)
+        
+        # Buat URL untuk request
+        url = f"{self.rest_api_url}/{profile.model or self.model_name}:generateContent?key={self.api_key}"
+        
+        # Kirim request
+        response = self.http.post(
+            url,
+            headers={"Content-Type": "application/json"},
+            json=payload
+        )
+        
+        if response.status_code != 200:
+            logger.error("REST API error: %s", response.text)
+            raise APIError(response.text, response.status_code)
+        
+        # Parse respons
+        try:
+            result = response.json()
+            content = result["candidates"][0]["content"]["parts"][0]["text"]
+        except Exception as e:
+            logger.error("Error parsing REST API response: %s", e)
+            raise APIError("Error memproses respons dari API")
+        
+        usage = result.get("usageMetadata") or {}
+        self._report_usage(messages, [content], usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+        return content
+    
+    def complete_stream(self, messages, on_delta=None, profile=None):
+        """
+        Mengirim pesan ke Gemini dan meneruskan jawaban per potongan (SDK, stream=True)
+        
+        Mode REST mengirim seluruh jawaban sebagai satu potongan.
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            on_delta (callable, optional): Dipanggil dengan setiap potongan teks. Defaults to None.
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+            
+        Returns:
+            str: Jawaban lengkap
+        """
+        if self.use_rest_api:
+            return super().complete_stream(messages, on_delta, profile)
+        
+        _, _, combined_prompt = self._prompt_parts(messages)
+        profile = profile or DEFAULT_PROFILE
+        parts = []
+        usage = None
+        try:
+            model = self._sdk_model(profile)
+            config = self._generation_config(profile)
+            for chunk in model.generate_content(combined_prompt, generation_config=config, stream=True):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                delta = getattr(chunk, "text", "")
+                if delta:
+                    parts.append(delta)
+                    if on_delta:
+                        on_delta(delta)
+        except Exception as e:
+            # Belum ada yang diterima: ulangi tanpa streaming (dengan fallback REST di complete)
+            if parts:
+                raise
+            logger.warning("SDK streaming error: %s, mencoba tanpa streaming", e)
+            return super().complete_stream(messages, on_delta, profile)
+        
+        content = "".join(parts)
+        self._report_usage(
+            messages, [content],
+            getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+        )
+        return content
+    
+    def _sdk_model(self, profile):
+        """Objek model SDK untuk profil; model pilihan profil dibuat sekali lalu dipakai ulang"""
+        if not profile.model or profile.model == self.model_name:
+            return self.model
+        model = self._profile_models.get(profile.model)
+        if model is None:
+            model = self.genai.GenerativeModel(profile.model)
+            self._profile_models[profile.model] = model
+        return model
+    
+    def _generation_config(self, profile):
+        """Konfigurasi generasi SDK sesuai profil"""
+        config = {
+            "temperature": profile.temperature,
+            "max_output_tokens": profile.max_tokens,
+            "top_p": 0.9,
+            "top_k": 40
+        }
+        if profile.stop:
+            config["stop_sequences"] = list(profile.stop)
+        return config
+    
+    def _prompt_parts(self, messages):
+        """
+        Prompt sistem, pesan pengguna terakhir, dan prompt gabungan untuk Gemini
+        
+        Returns:
+            tuple: (prompt sistem, pesan pengguna, prompt gabungan)
+        """
+        # Ambil prompt sistem dan pesan pengguna terakhir dari daftar pesan
+        system_text = next((msg["content"] for msg in messages if msg["role"] == "system"), self.default_system_prompt)
+        message = next((msg["content"] for msg in reversed(messages) if msg["role"] == "user"), "")
+        
+        # Buat prompt dengan system prompt
+        combined_prompt = f"{system_text}\n\nPertanyaan pengguna: {message}\n\nBerikan jawaban yang relevan dan bermanfaat:"
+        return system_text, message, combined_prompt
+    
+    def current_model(self):
+        """Mengembalikan nama model Gemini yang sedang digunakan"""
+        return self.model_name
+    
+    def set_model(self, model_name):
+        """Mengganti model Gemini (model sudah diketahui dari katalog)"""
+        if self.use_rest_api:
+            self.model_name = model_name
+            return True
+        return self.change_model(model_name)
+    
+    def list_models(self):
+        """
+        Mengambil daftar model Gemini yang mendukung generateContent beserta batas token input
+        
+        Raises:
+            APIError: Jika REST API mengembalikan kode status selain 200
+        """
+        if not self.use_rest_api:
+            return [
+                ModelInfo(model.name.split("/")[-1], getattr(model, "input_token_limit", None))
+                for model in self.genai.list_models()
+                if "generateContent" in getattr(model, "supported_generation_methods", [])
+            ]
+        
+        response = self.http.get(f"{self.rest_api_url}?key={self.api_key}", timeout=10)
+        if response.status_code != 200:
+            raise APIError(response.text, response.status_code)
+        return [
+            ModelInfo(model["name"].split("/")[-1], model.get("inputTokenLimit"))
+            for model in response.json().get("models", [])
+            if "generateContent" in model.get("supportedGenerationMethods", [])
+        ]
+    
+    def format_error(self, error):
+        """
+        Mengubah kesalahan Gemini menjadi pesan untuk pengguna
+        
+        Args:
+            error (Exception): Kesalahan yang terjadi
+            
+        Returns:
+            str: Pesan kesalahan, dengan pesan khusus untuk kuota yang terlampaui
+        """
+        error_message = str(error)
+        status_code = getattr(error, "status_code", None)
+        
+        # Pesan khusus untuk error quota exceeded
+        if status_code == 429 or "429" in error_message or "quota" in error_message.lower() or "exceeded" in error_message.lower():
+            return GEMINI_QUOTA_MESSAGE
+        
+        if status_code is not None:
+            return f"Error dari API ({status_code}): {error_message}"
+        
+        return f"Terjadi kesalahan: {error_message}"
+    
+    def change_model(self, model_name):
+        """
+        Mengubah model Gemini yang digunakan
+        
+        Args:
+            model_name (str): Nama model Gemini (misalnya "gemini-pro", "gemini-pro-vision")
+            
+        Returns:
+            bool: True jika berhasil, False jika gagal
+        """
+        try:
+            # Perbarui model
+            self.model_name = model_name
+            self.model = self.genai.GenerativeModel(model_name)
+            return True
+        except Exception as e:
+            logger.error("Error saat mengubah model Gemini: %s", e)
+            return False
+
+class CompatibleAPI(BaseAPI):
+    """
+    Kelas untuk server apa pun yang menyediakan endpoint /v1/chat/completions ala OpenAI
+    
+    Misalnya server inferensi lokal di jaringan lab (vLLM, llama.cpp, Ollama, LM Studio)
+    atau proxy cache lokal. API key bersifat opsional.
+    """
+    
+    name = "OpenAI-kompatibel"
+    
+    def __init__(self, api_key, base_url=DEFAULT_COMPATIBLE_URL, model=None, stream=True,
+                 pool_size=DEFAULT_COMPATIBLE_POOL_SIZE, timeout=DEFAULT_COMPATIBLE_TIMEOUT, tools=False):
+        """
+        Inisialisasi klien server OpenAI-kompatibel
+        
+        Args:
+            api_key (str): API key, atau NO_API_KEY jika server tidak memakai otentikasi
+            base_url (str, optional): URL dasar, misalnya "http://192.168.1.10:8000/v1".
+                Defaults to DEFAULT_COMPATIBLE_URL.
+            model (str, optional): Nama model. Defaults to None (model pertama dari server).
+            stream (bool, optional): Terima jawaban sebagai stream SSE. Defaults to True.
+            pool_size (int, optional): Jumlah koneksi yang dipakai ulang. Defaults to DEFAULT_COMPATIBLE_POOL_SIZE.
+            timeout (int, optional): Batas waktu baca per potongan jawaban (detik). Defaults to DEFAULT_COMPATIBLE_TIMEOUT.
+            tools (bool, optional): Server dan modelnya mendukung tool calling. Defaults to False,
+                karena banyak model lokal kecil tidak mendukungnya.
+        """
+        super().__init__(api_key)
+        self.base_url = normalize_base_url(base_url)
+        self.warm_url = self.base_url + "/models"
+        self.model = model
+        self.stream = stream
+        self.timeout = timeout
+        self.supports_tools = tools
+        
+        self.headers = {"Content-Type": "application/json"}
+        if api_key and api_key != NO_API_KEY:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        
+        # Pool koneksi sebesar jumlah permintaan bersamaan (pool pekerja, potongan kode besar)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+    
+    def complete(self, messages, profile=None):
+        """
+        Mengirim pesan ke server dan mengembalikan jawaban lengkap
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+            
+        Returns:
+            str: Respons dari server
+        """
+        if self.stream:
+            return self.complete_stream(messages, profile=profile)
+        
+        response = self._post(messages, stream=False, profile=profile)
+        result = response.json()
+        content = result["choices"][0]["message"]["content"]
+        usage = result.get("usage") or {}
+        self._report_usage(messages, [content], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return content
+    
+    def complete_stream(self, messages, on_delta=None, profile=None):
+        """
+        Mengirim pesan dan menerima jawaban sebagai stream Server-Sent Events
+        
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            on_delta (callable, optional): Dipanggil dengan setiap potongan teks yang diterima.
+                Defaults to None.
+            profile (GenerationProfile, optional): Profil generasi tugas. Defaults to DEFAULT_PROFILE.
+                
+        Returns:
+            str: Jawaban lengkap
+        """
+        with self._post(messages, stream=True, profile=profile) as response:
+            content, usage = _read_sse(response, on_delta)
+        self._report_usage(messages, [content], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return content
+    
+    def complete_with_tools(self, messages, tools, profile=None, tool_choice=None):
+        """Mengirim pesan ke server dengan definisi alat (lihat BaseAPI.complete_with_tools)"""
+        response = self._post(messages, stream=False, profile=profile, tools=tools, tool_choice=tool_choice)
+        result = response.json()
+        reply = _tool_reply(result["choices"][0]["message"])
+        usage = result.get("usage") or {}
+        self._report_usage(messages, [reply["content"]], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        return reply
+    
+    def _post(self, messages, stream, profile=None, tools=None, tool_choice=None):
+        """
+        Mengirim permintaan chat completion
+        
+        Raises:
+            APIError: Jika server mengembalikan kode status selain 200
+        """
+        if not self.model:
+            self.model = self._first_model()
+        
+        profile = profile or DEFAULT_PROFILE
+        payload = {
+            "model": self._model_for(profile),
+            "messages": as_payload(messages),
+            "temperature": profile.temperature,
+            "max_tokens": profile.max_tokens
+        }
+        if profile.stop:
+            payload["stop"] = list(profile.stop)
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = tool_choice or "auto"
+        if stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        
+        response = self.http.post(
+            self.base_url + "/chat/completions",
+            headers=self.headers,
+            json=payload,
+            stream=stream,
+            timeout=(10, self.timeout)
+        )
+        if response.status_code != 200:
+            text = response.text
+            response.close()
+            raise APIError(f"Error code: {response.status_code} - {text}", response.status_code)
+        return response
+    
+    def _first_model(self):
+        """Nama model pertama yang disediakan server, untuk server yang hanya memuat satu model"""
+        models = self.list_models()
+        if not models:
+            raise APIError("Server tidak menyediakan model apa pun")
+        return models[0].name
+    
+    def current_model(self):
+        """Mengembalikan nama model yang sedang digunakan"""
+        return self.model or ""
+    
+    def list_models(self):
+        """
+        Mengambil daftar model dari server
+        
+        Raises:
+            APIError: Jika server mengembalikan kode status selain 200
+        """
+        response = self.http.get(self.base_url + "/models", headers=self.headers, timeout=10)
+        if response.status_code != 200:
+            raise APIError(f"Error code: {response.status_code} - {response.text}", response.status_code)
+        return [ModelInfo(model["id"], model.get("context_length")) for model in response.json().get("data", [])]
+    
+    def change_model(self, model_name):
+        """
+        Mengubah model yang digunakan jika disediakan oleh server
+        
+        Args:
+            model_name (str): Nama model
+            
+        Returns:
+            bool: True jika berhasil, False jika gagal
+        """
+        try:
+            if any(model.name == model_name for model in self.list_models()):
+                self.model = model_name
+                return True
+            return False
+        except Exception as e:
+            logger.error("Error saat mengubah model: %s", e)
+            return False
+
+# Kelas API untuk setiap provider
+PROVIDER_CLASSES = {
+    "openai": OpenAIAPI,
+    "deepseek": DeepSeekAPI,
+    "gemini": GeminiAPI,
+    "compatible": CompatibleAPI,
+}
+
+class ChatGPTAPI:
+    """Kelas untuk mengelola dan menyediakan akses ke berbagai API AI"""
+    
+    def __init__(self, api_key, provider="openai", config=None, api_keys=None):
+        """
+        Inisialisasi ChatGPT API dengan provider yang dipilih
+        
+        Args:
+            api_key (str): API key untuk provider yang dipilih
+            provider (str): Provider AI ("openai", "deepseek", "gemini", atau "compatible")
+            config (dict, optional): Konfigurasi aplikasi dari config.json. Defaults to None.
+            api_keys (dict, optional): API key provider lain yang tersimpan, untuk
+                berpindah provider tanpa restart. Defaults to None.
+        """
+        self.api_key = api_key
+        self.provider = provider
+        # Dict yang sama dengan AuthManager.config agar pilihan model ikut tersimpan
+        self.config = config if config is not None else {}
+        
+        # Klien per provider dibuat saat pertama dibutuhkan lalu dipakai ulang,
+        # sehingga riwayat sesi dan koneksi tiap provider tetap hidup saat berpindah
+        self.api_keys = dict(api_keys or {})
+        self.api_keys[provider] = api_key
+        self.clients = {}
+        self._clients_lock = threading.Lock()
+        
+        # Katalog model tersimpan; dibaca dari berkas, diperbarui di latar belakang
+        catalog_config = self.config.get("model_catalog", {})
+        self.catalog = ModelCatalog(ttl=catalog_config.get("ttl", DEFAULT_TTL))
+        
+        # Pemakaian per provider/key dan kontrol kuota sebelum permintaan dikirim
+        self.usage = UsageTracker(self.config.get("usage"))
+        
+        # Indeks pencarian lokal atas semua percakapan
+        self.index = ConversationIndex() if self.config.get("search_index", True) else None
+        
+        # Cache semantik untuk pertanyaan yang hampir sama dalam tab yang sama
+        self.cache = SemanticCache(self.config.get("semantic_cache"))
+        
+        # Cache bersama hanya baca yang diterbitkan komputer guru untuk seluruh lab
+        self.shared_cache = SharedCache(self.config.get("shared_cache"))
+        
+        # Prefetch spekulatif untuk input yang sedang diketik
+        self.prefetcher = SpeculativePrefetcher(self.config.get("prefetch"))
+        
+        # Penggabungan permintaan identik yang berjalan bersamaan
+        self.flight = SingleFlight("coalesce")
+        
+        # Profil generasi per tugas (panjang jawaban, temperature, model pilihan, stop sequence)
+        self.profiles = load_profiles(self.config.get("profiles"))
+        
+        # Penjelasan per bagian kode, agar kode yang diedit hanya dijelaskan ulang bagian yang berubah
+        self.sections = SectionCache(self.config.get("code_sections"))
+        
+        # Pertanyaan yang gagal karena koneksi terputus disimpan dan dikirim ulang otomatis;
+        # thread pengiriman dimulai oleh pemakai setelah on_delivered dipasang (outbox.start)
+        self.outbox = Outbox(self.config.get("outbox"))
+        self.outbox.send = self._send_queued
+        self.outbox.probe = lambda: self.api.is_reachable()
+        
+        # Pemeriksaan sistem lokal baca-saja yang dapat dipanggil model (tool calling)
+        self.probes = ProbeRunner(self.config.get("system_probe"))
+        
+        registry.register_source("sessions", self.session_stats)
+        
+        # Inisialisasi API yang sesuai
+        self.api = self.get_client(provider)
+    
+    def get_client(self, provider):
+        """
+        Mengambil klien untuk provider tertentu, membuatnya jika belum ada
+        
+        Args:
+            provider (str): Provider AI
+            
+        Returns:
+            BaseAPI: Klien provider
+            
+        Raises:
+            KeyError: Jika belum ada API key untuk provider tersebut
+        """
+        with self._clients_lock:
+            client = self.clients.get(provider)
+            if client is None:
+                if provider == "gemini":
+                    names = [model.name for model in self.catalog.models(provider)]
+                    client = GeminiAPI(self.api_keys[provider], available_models=names)
+                elif provider == "compatible":
+                    settings = self.config.get("compatible", {})
+                    client = CompatibleAPI(
+                        self.api_keys[provider],
+                        base_url=settings.get("base_url", DEFAULT_COMPATIBLE_URL),
+                        stream=settings.get("stream", True),
+                        pool_size=settings.get("pool_size", DEFAULT_COMPATIBLE_POOL_SIZE),
+                        timeout=settings.get("timeout", DEFAULT_COMPATIBLE_TIMEOUT),
+                        tools=settings.get("tools", False)
+                    )
+                else:
+                    client = PROVIDER_CLASSES[provider](self.api_keys[provider])
+                
+                # Pakai model yang terakhir dipilih pengguna untuk provider ini
+                saved_model = self.config.get("models", {}).get(provider)
+                if saved_model:
+                    client.set_model(saved_model)
+                
+                # Riwayat sesi yang tidak aktif dipindahkan ke ~/.edubot/sessions/<provider>
+                client.session_store = SessionStore(provider)
+                
+                # Token dari setiap respons dicatat untuk provider dan key klien ini
+                client.usage_callback = (
+                    lambda prompt, completion, estimated, provider=provider, key=client.api_key:
+                    self.usage.record(provider, key, prompt, completion, estimated)
+                )
+                
+                self.clients[provider] = client
+            return client
+    
+    def usage_remaining(self, provider=None):
+        """
+        Mengembalikan pemakaian hari ini dan sisa kuota provider
+        
+        Args:
+            provider (str, optional): Provider AI. Defaults to provider aktif.
+            
+        Returns:
+            dict: Lihat UsageTracker.remaining
+        """
+        provider = provider or self.provider
+        return self.usage.remaining(provider, self.api_keys.get(provider))
+    
+    @stage("provider.call")
+    def _guarded(self, api, provider, messages, request, count=1, wait=True):
+        """
+        Menjalankan panggilan ke provider setelah lolos kontrol kuota
+        
+        Args:
+            api (BaseAPI): Klien provider
+            provider (str): Provider AI
+            messages (list): Pesan yang dikirim, untuk memperkirakan token
+            request (callable): Fungsi tanpa argumen yang memanggil provider
+            count (int, optional): Jumlah permintaan yang dikirim request. Defaults to 1.
+            wait (bool, optional): False untuk menolak daripada menunggu. Defaults to True.
+            
+        Raises:
+            QuotaExceeded: Jika kuota habis atau harus menunggu terlalu lama
+        """
+        tokens = estimate_tokens("".join(msg["content"] or "" for msg in messages)) * count
+        self.usage.admit(provider, api.api_key, tokens, count=count, wait=wait)
+        try:
+            return request()
+        except Exception as e:
+            # Provider menolak walaupun sudah diatur lajunya; tahan permintaan berikutnya sebentar
+            if _is_rate_limited(e):
+                self.usage.note_rate_limited(provider, api.api_key)
+            raise
+    
+    def profile(self, session_id, provider=None):
+        """
+        Profil generasi untuk tugas/tab dan provider tertentu
+        
+        Args:
+            session_id (str): ID sesi/tab
+            provider (str, optional): Provider yang dipanggil. Defaults to provider aktif.
+            
+        Returns:
+            GenerationProfile: Profil dengan model pilihan untuk provider tersebut
+        """
+        return resolve(self.profiles, session_id, provider or self.provider)
+    
+    def _route(self, api, provider, message):
+        """
+        Memilih klien untuk permintaan; beralih ke provider lain jika kuota provider ini habis
+        
+        Args:
+            api (BaseAPI): Klien provider aktif
+            provider (str): Provider aktif
+            message (str): Pesan yang akan dikirim
+            
+        Returns:
+            tuple: (klien, provider) yang digunakan
+        """
+        tokens = estimate_tokens(message)
+        if not self.usage.reroute or self.usage.delay(provider, api.api_key, tokens) <= self.usage.max_wait:
+            return api, provider
+        
+        for other in self.available_providers():
+            if other == provider:
+                continue
+            try:
+                client = self.get_client(other)
+            except Exception as e:
+                logger.error("Error saat menyiapkan klien %s: %s", other, e)
+                continue
+            if self.usage.delay(other, client.api_key, tokens) == 0:
+                logger.info("Kuota %s penuh, permintaan dialihkan ke %s", provider, other)
+                registry.increment("usage.rerouted_events")
+                return client, other
+        return api, provider
+    
+    @stage("history.evict")
+    def evict_idle_sessions(self, max_idle):
+        """
+        Memindahkan riwayat sesi yang tidak aktif di semua provider ke disk
+        
+        Args:
+            max_idle (float): Lama tidak aktif dalam detik
+            
+        Returns:
+            int: Jumlah sesi yang dipindahkan
+        """
+        with self._clients_lock:
+            clients = list(self.clients.values())
+        return sum(client.evict_idle_sessions(max_idle) for client in clients)
+    
+    def session_stats(self):
+        """
+        Mengembalikan statistik sesi untuk diagnostik
+        
+        Returns:
+            dict: Jumlah sesi di memori dan di disk
+        """
+        with self._clients_lock:
+            clients = list(self.clients.values())
+        in_memory = sum(len(client.chat_history) for client in clients)
+        on_disk = sum(client.session_store.count() for client in clients if client.session_store)
+        return {"in_memory": in_memory, "on_disk": on_disk}
+    
+    def available_providers(self):
+        """Mengembalikan daftar provider yang memiliki API key"""
+        return [provider for provider in PROVIDER_CLASSES if provider in self.api_keys]
+    
+    def add_provider(self, provider, api_key):
+        """
+        Menambahkan atau memperbarui API key provider
+        
+        Args:
+            provider (str): Provider AI
+            api_key (str): API key baru
+        """
+        with self._clients_lock:
+            self.api_keys[provider] = api_key
+            # Klien lama memakai key lama, buat ulang saat dibutuhkan
+            if provider != self.provider:
+                self.clients.pop(provider, None)
+    
+    def switch_provider(self, provider):
+        """
+        Mengganti provider aktif; berlaku untuk pesan berikutnya
+        
+        Permintaan yang sedang berjalan tetap selesai dengan provider lama.
+        Riwayat sesi setiap provider disimpan di kliennya masing-masing.
+        
+        Args:
+            provider (str): Provider AI
+        """
+        client = self.get_client(provider)
+        self.cancel_speculation()
+        self.provider = provider
+        self.api_key = self.api_keys[provider]
+        self.api = client
+    
+    def warm_up(self, providers=None):
+        """
+        Membuat klien dan membuka koneksi di thread latar belakang
+        
+        Args:
+            providers (list, optional): Provider yang dihangatkan. Defaults to semua yang memiliki key.
+        """
+        providers = providers or self.available_providers()
+        
+        def run():
+            for provider in providers:
+                try:
+                    client = self.get_client(provider)
+                    client.warm_up()
+                    # Perbarui katalog model yang sudah kedaluwarsa memakai koneksi yang sama
+                    if self.catalog.is_stale(provider):
+                        self.catalog.refresh_now(provider, client.list_models)
+                except Exception as e:
+                    logger.error("Error saat menyiapkan klien %s: %s", provider, e)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def models(self, provider=None):
+        """
+        Mengembalikan daftar model dari katalog tersimpan (tidak menunggu jaringan)
+        
+        Args:
+            provider (str, optional): Provider AI. Defaults to provider aktif.
+            
+        Returns:
+            list: Daftar ModelInfo
+        """
+        return self.catalog.models(provider or self.provider)
     
-    def get_response(self, message, session_id="default", system_prompt=None):
+    def refresh_models(self, provider=None, force=False):
+        """
+        Memperbarui katalog model provider di latar belakang jika sudah kedaluwarsa
+        
+        Args:
+            provider (str, optional): Provider AI. Defaults to provider aktif.
+            force (bool, optional): Ambil ulang walaupun belum kedaluwarsa. Defaults to False.
+            
+        Returns:
+            bool: True jika pembaruan dimulai
         """
-        Mendapatkan respons dari Google Gemini untuk pesan tertentu
+        provider = provider or self.provider
+        return self.catalog.refresh(provider, lambda: self.get_client(provider).list_models(), force=force)
+    
+    def context_limit(self):
+        """Mengembalikan batas konteks (token) model aktif, atau None jika tidak diketahui"""
+        return self.catalog.context_limit(self.provider, self.api.current_model())
+    
+    @stage("request.total")
+    def get_response(self, message, session_id="default", system_prompt=None, index_text=None, use_cache=True,
+                     on_delta=None, queue_offline=False, raise_errors=False):
+        """
+        Mendapatkan respons dari AI untuk pesan tertentu
         
         Args:
-            message (str): Pesan yang dikirim ke Gemini
+            message (str): Pesan yang dikirim ke AI
             session_id (str): ID sesi untuk melacak riwayat chat
             system_prompt (str): Prompt sistem khusus untuk sesi ini
+            index_text (str, optional): Teks pertanyaan yang disimpan di indeks pencarian,
+                jika berbeda dari pesan lengkap yang dikirim. Defaults to None.
+            use_cache (bool, optional): False untuk selalu meminta jawaban baru. Defaults to True.
+            on_delta (callable, optional): Jika diberikan, jawaban diminta sebagai stream dan setiap
+                potongan diteruskan ke fungsi ini. Jawaban dari cache atau kesalahan dikirim
+                sebagai satu potongan. Defaults to None.
+            queue_offline (bool, optional): True untuk menyimpan pertanyaan di outbox jika koneksi
+                terputus, alih-alih mengembalikan pesan kesalahan. Defaults to False.
+            raise_errors (bool, optional): True untuk melempar kegagalan provider (termasuk kuota
+                habis) sebagai APIError, alih-alih mengembalikan pesan kesalahan sebagai jawaban.
+                Defaults to False.
             
         Returns:
-            str: Respons dari Gemini
+            str: Respons dari AI
+            
+        Raises:
+            Offline: Jika queue_offline dan koneksi terputus; item berisi entri outbox
+                (None jika outbox nonaktif atau penuh)
+            APIError: Jika raise_errors dan permintaan ke provider gagal
         """
-        # Pastikan sesi ada
-        if session_id not in self.chat_history:
-            self.chat_history[session_id] = []
-            
-            # Inisialisasi chat
-            if system_prompt:
-                # Jika sistem prompt disediakan, gunakan sebagai awal chat
-                self.chat_history[session_id].append({
-                    "role": "system",
-                    "content": system_prompt
-                })
-            else:
-                # Jika tidak ada system prompt, gunakan default
-                self.chat_history[session_id].append({
-                    "role": "system",
-                    "content": self.default_system_prompt
-                })
-        
-        # Tambahkan pesan pengguna ke riwayat lokal
-        self.chat_history[session_id].append({
-            "role": "user",
-            "content": message
-        })
-        
-        # Buat prompt dengan system prompt
-        prompt = message
-        system_text = system_prompt if system_prompt else self.default_system_prompt
-        combined_prompt = f"{system_text}\n\nPertanyaan pengguna: {message}\n\nBerikan jawaban yang relevan dan bermanfaat:"
-        
         try:
-            content = ""
-            
-            # Coba gunakan SDK terlebih dahulu jika tidak dalam mode fallback
-            if not self.use_rest_api:
-                try:
-                    # Kirim pesan ke Gemini API via SDK
-                    response = self.model.generate_content(combined_prompt)
-                    
-                    # Dapatkan respons
-                    if hasattr(response, 'text'):
-                        content = response.text
-                    else:
-                        content = str(response)
-                except Exception as e:
-                    print(f"SDK error: {e}, mencoba REST API")
-                    self.use_rest_api = True
-            
-            # Gunakan REST API jika SDK gagal atau sudah dalam mode fallback
-            if self.use_rest_api:
-                # Buat payload untuk REST API
-                payload = {
-                    "contents": [{
-                        "parts":[
-                            {"text": "system: " + system_text},
-                            {"text": "user: " + message}
-                        ]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.7,
-                        "topK": 40,
-                        "topP": 0.9
-                    }
-                }
+            if on_delta is not None:
+                streamed = []
                 
-                # Buat URL untuk request
-                url = f"{self.rest_api_url}/{self.model_name}:generateContent?key={self.api_key}"
+                def forward(delta):
+                    streamed.append(True)
+                    on_delta(delta)
                 
-                # Kirim request
-                response = requests.post(
-                    url,
-                    headers={"Content-Type": "application/json"},
-                    json=payload
+                response = self._get_response(
+                    message, session_id, system_prompt, index_text, use_cache, forward, queue_offline, raise_errors
                 )
-                
-                # Parse respons
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        content = result["candidates"][0]["content"]["parts"][0]["text"]
-                    except Exception as e:
-                        print(f"Error parsing REST API response: {e}")
-                        content = "Error memproses respons dari API"
+                if not streamed and response:
+                    on_delta(response)
+                return response
+            return self._get_response(
+                message, session_id, system_prompt, index_text, use_cache, None, queue_offline, raise_errors
+            )
+        except Offline as e:
+            e.item = self.outbox.add(session_id, message, system_prompt, index_text)
+            raise
+    
+    def _send_queued(self, item):
+        """Mengirim ulang permintaan dari outbox; melempar Offline jika koneksi masih terputus"""
+        return self._get_response(
+            item.message, item.session_id, item.system_prompt, item.index_text, True, None, True
+        )
+    
+    @request_scope()
+    def _get_response(self, message, session_id, system_prompt, index_text, use_cache, on_delta,
+                      raise_offline=False, raise_errors=False):
+        """
+        Implementasi get_response; on_delta hanya dipanggil untuk jawaban yang di-stream
+        
+        Jika raise_offline, kesalahan koneksi dilempar sebagai Offline alih-alih dikembalikan sebagai pesan.
+        Jika raise_errors, kegagalan provider lainnya dilempar sebagai APIError.
+        Setiap panggilan mendapat ID permintaan sendiri yang ikut tercatat di semua log-nya.
+        """
+        started = time.perf_counter()
+        question = index_text or message
+        
+        # Ambil klien sekarang agar pergantian provider di tengah permintaan tidak tercampur
+        api = self.api
+        provider = self.provider
+        
+        # Jawaban yang memakai pemeriksaan sistem bergantung pada keadaan saat ini, jadi tidak dicache
+        if self._tools_for(api, session_id):
+            use_cache = False
+        
+        # Riwayat sebelum pertanyaan ini: pertanyaan lanjutan ("contohnya?") hanya boleh
+        # memakai jawaban yang diberikan setelah percakapan yang sama
+        history = api.history_fingerprint(session_id)
+        
+        # Jawaban untuk pertanyaan yang cukup mirip dalam konteks yang sama langsung diberikan
+        cached = self.cache.lookup(session_id, system_prompt, question, history) if use_cache else None
+        source = "cache"
+        if cached is None and use_cache and not history[0]:
+            # Setelah cache lokal, sebelum provider: jawaban yang sudah diterbitkan untuk lab
+            # (hanya berisi giliran pertama, lihat publish_shared_cache)
+            cached = self.shared_cache.lookup(session_id, system_prompt, question)
+            source = "shared_cache"
+            if cached is not None:
+                self.cache.store(session_id, system_prompt, question, cached, history)
+        if cached is not None:
+            api.record_exchange(session_id, message, cached, system_prompt)
+            self._log_request(source, api, provider, session_id, started)
+            return cached
+        
+        # Gunakan hasil prefetch spekulatif jika pertanyaan sama dengan yang sudah diambil
+        response = None
+        key = self._prefetch_key(session_id, system_prompt, question)
+        future = self.prefetcher.take(key) if key else None
+        if future is not None:
+            try:
+                response = future.result()
+                source = "prefetch"
+            except Exception as e:
+                logger.warning("Prefetch gagal, mengirim ulang permintaan: %s", e)
+        
+        model = None
+        tools = None
+        if response is None:
+            # Kuota provider aktif habis: gunakan provider lain yang masih tersedia
+            api, provider = self._route(api, provider, message)
+            messages = api.build_messages(session_id, message, system_prompt)
+            profile = self.profile(session_id, provider)
+            model = profile.model
+            
+            # Permintaan identik (klik ganda, beberapa klien) ikut menunggu satu panggilan yang sama
+            # dan menerima potongan jawabannya selagi di-stream
+            flight_key = (
+                provider, profile.model or api.current_model(), session_id, system_prompt,
+                api.history_fingerprint(session_id), message
+            )
+            tools = self._tools_for(api, session_id)
+            try:
+                if tools:
+                    # Setiap giliran tool calling melewati kontrol kuota sendiri
+                    call = lambda emit: self._complete_with_tools(api, provider, messages, tools, profile)
+                elif on_delta is None:
+                    call = lambda emit: self._guarded(api, provider, messages, lambda: api.complete(messages, profile))
                 else:
-                    error_message = response.text
-                    print(f"REST API error: {error_message}")
-                    
-                    # Jika error adalah kuota, beri pesan khusus
-                    if "429" in str(response.status_code) or "quota" in error_message.lower():
-                        content = (
-                            "Maaf, kuota Google Gemini API Anda telah terlampaui. Ini umum terjadi dengan akun gratis.\n\n"
-                            "Beberapa solusi:\n"
-                            "1. Tunggu hingga kuota disetel ulang (biasanya 24 jam)\n"
-                            "2. Berlangganan paket berbayar di Google AI Studio\n"
-                            "3. Gunakan provider AI lain (OpenAI atau DeepSeek)\n\n"
-                            "Anda dapat logout dan memilih provider lain di menu File > Logout."
-                        )
-                    else:
-                        content = f"Error dari API ({response.status_code}): {error_message}"
-            
-            # Tambahkan respons asisten ke riwayat lokal
-            self.chat_history[session_id].append({
-                "role": "assistant",
-                "content": content
-            })
-            
-            # Batasi panjang riwayat (untuk menghemat token)
-            if len(self.chat_history[session_id]) > 10:
-                # Simpan prompt sistem jika ada
-                system_prompts = [msg for msg in self.chat_history[session_id] if msg["role"] == "system"]
-                
-                # Potong riwayat, simpan 6 pesan terakhir
-                self.chat_history[session_id] = system_prompts + self.chat_history[session_id][-6:]
+                    call = lambda emit: self._guarded(
+                        api, provider, messages, lambda: api.complete_stream(messages, emit, profile)
+                    )
+                response, shared = self.flight.do(flight_key, call, on_delta)
+            except QuotaExceeded as e:
+                logger.warning("Kuota habis: %s", e, extra=self._log_fields("quota", api, provider, session_id, started))
+                if raise_errors:
+                    raise APIError(str(e), 429) from e
+                return f"Terjadi kesalahan: {str(e)}"
+            except Exception as e:
+                logger.error(
+                    "Error saat berkomunikasi dengan API %s: %s", api.name, e,
+                    extra=self._log_fields("provider", api, provider, session_id, started, model)
+                )
+                if raise_offline and is_connectivity_error(e):
+                    raise Offline(api.format_error(e)) from e
+                if raise_errors:
+                    raise APIError(api.format_error(e), getattr(e, "status_code", None)) from e
+                return api.format_error(e)
             
-            return content
+            # Hanya pemanggil pertama yang mencatat riwayat, indeks, dan cache
+            if shared:
+                self._log_request("singleflight", api, provider, session_id, started, model)
+                return response
+            source = "provider"
         
-        except Exception as e:
-            error_message = str(e)
-            print(f"Error saat berkomunikasi dengan API Gemini: {e}")
-            
-            # Pesan khusus untuk error quota exceeded
-            if "429" in error_message or "quota" in error_message.lower() or "exceeded" in error_message.lower():
-                return (
-                    "Maaf, kuota Google Gemini API Anda telah terlampaui. Ini umum terjadi dengan akun gratis.\n\n"
-                    "Beberapa solusi:\n"
-                    "1. Tunggu hingga kuota disetel ulang (biasanya 24 jam)\n"
-                    "2. Berlangganan paket berbayar di Google AI Studio\n"
-                    "3. Gunakan provider AI lain (OpenAI atau DeepSeek)\n\n"
-                    "Anda dapat logout dan memilih provider lain di menu File > Logout."
-                )
+        api.record_exchange(session_id, message, response, system_prompt)
+        
+        # Perbarui indeks pencarian secara inkremental setelah respons selesai
+        if self.index:
+            self.index.add_exchange(provider, session_id, question, response)
+        if not tools:
+            self.cache.store(session_id, system_prompt, question, response, history)
+        
+        self._log_request(source, api, provider, session_id, started, model)
+        return response
+    
+    def _tools_for(self, api, session_id):
+        """Definisi alat pemeriksaan sistem jika sesi ini dan provider-nya mendukung tool calling"""
+        if api.supports_tools and self.probes.enabled_for(session_id):
+            return self.probes.tool_specs()
+        return None
+    
+    def _complete_with_tools(self, api, provider, messages, tools, profile):
+        """
+        Meminta jawaban dengan tool calling, menjalankan pemeriksaan yang diminta model
+        
+        Semua panggilan alat dari satu giliran model dijalankan bersamaan, lalu hasilnya
+        dikirim kembali dalam giliran berikutnya. Setelah MAX_TOOL_ROUNDS giliran, jawaban
+        akhir diminta tanpa alat. Pesan alat tidak disimpan ke riwayat sesi.
+        
+        Returns:
+            str: Jawaban akhir model
+        """
+        messages = list(as_payload(messages))
+        position = 1 if messages and messages[0]["role"] == "system" else 0
+        messages.insert(position, {"role": "system", "content": TOOLS_SYSTEM_PROMPT})
+        
+        for round_index in range(MAX_TOOL_ROUNDS + 1):
+            # Giliran terakhir memaksa jawaban teks agar percakapan tidak berputar terus
+            tool_choice = "none" if round_index == MAX_TOOL_ROUNDS else None
+            reply = self._guarded(
+                api, provider, messages, lambda: api.complete_with_tools(messages, tools, profile, tool_choice)
+            )
+            calls = reply["tool_calls"]
+            if not calls or tool_choice:
+                return reply["content"]
             
-            return f"Terjadi kesalahan: {error_message}"
+            registry.increment("tools.rounds")
+            registry.increment("tools.calls", len(calls))
+            results = self.probes.run_all(
+                [(call["function"]["name"], call["function"]["arguments"]) for call in calls]
+            )
+            messages.append(reply)
+            for call, result in zip(calls, results):
+                messages.append({"role": "tool", "tool_call_id": call["id"], "content": result})
     
-    def change_model(self, model_name):
+    def _log_fields(self, source, api, provider, session_id, started, model=None):
+        """Field terstruktur untuk log satu permintaan (lihat app_logging.CONTEXT_FIELDS)"""
+        return {
+            "source": source,
+            "provider": provider,
+            "session": session_id,
+            "model": model or api.current_model(),
+            "elapsed_ms": elapsed_ms(started),
+        }
+    
+    def _log_request(self, source, api, provider, session_id, started, model=None):
+        """Mencatat satu permintaan yang selesai beserta asal jawabannya"""
+        fields = self._log_fields(source, api, provider, session_id, started, model)
+        logger.info("Jawaban %s dari %s dalam %s ms", session_id, source, fields["elapsed_ms"], extra=fields)
+    
+    def speculate(self, message, session_id="default", system_prompt=None, index_text=None):
         """
-        Mengubah model Gemini yang digunakan
+        Memulai prefetch latar belakang untuk pertanyaan yang masih diketik
+        
+        Hasilnya disimpan sebentar dan dipakai oleh get_response jika pengguna
+        mengirim pertanyaan yang sama dalam konteks riwayat yang sama.
         
         Args:
-            model_name (str): Nama model Gemini (misalnya "gemini-pro", "gemini-pro-vision")
+            message (str): Pesan lengkap yang akan dikirim
+            session_id (str): ID sesi
+            system_prompt (str, optional): Prompt sistem khusus untuk sesi ini
+            index_text (str, optional): Teks yang diketik pengguna. Defaults to None.
             
         Returns:
-            bool: True jika berhasil, False jika gagal
+            bool: True jika prefetch baru dimulai
         """
-        try:
-            # Perbarui model
-            self.model_name = model_name
-            self.model = self.genai.GenerativeModel(model_name)
-            return True
-        except Exception as e:
-            print(f"Error saat mengubah model Gemini: {e}")
+        question = index_text or message
+        if len(question.strip()) < self.prefetcher.min_chars:
             return False
-
-class ChatGPTAPI:
-    """Kelas untuk mengelola dan menyediakan akses ke berbagai API AI"""
+        
+        key = self._prefetch_key(session_id, system_prompt, question)
+        if key is None:
+            return False
+        
+        # Jawaban dengan pemeriksaan sistem tidak ditebak lebih dulu; keadaan sistem bisa berubah
+        if self._tools_for(self.api, session_id):
+            return False
+        
+        # Jawaban yang sudah ada di cache tidak perlu diambil lagi
+        history = self.api.history_fingerprint(session_id)
+        if self.cache.contains(session_id, system_prompt, question, history):
+            return False
+        if not history[0] and self.shared_cache.contains(session_id, system_prompt, question):
+            return False
+        
+        # Susun pesan sekarang agar thread latar tidak membaca riwayat yang sedang berubah
+        messages = self.api.build_messages(session_id, message, system_prompt)
+        api = self.api
+        provider = self.provider
+        profile = self.profile(session_id, provider)
+        
+        # Jangan menghabiskan kuota untuk tebakan jika provider sudah mendekati batasnya
+        if self.usage.delay(provider, api.api_key, estimate_tokens(message)) > 0:
+            return False
+        return self.prefetcher.speculate(
+            key, lambda: self._guarded(api, provider, messages, lambda: api.complete(messages, profile), wait=False)
+        )
+    
+    def cancel_speculation(self):
+        """Membatalkan prefetch spekulatif yang sedang berjalan"""
+        self.prefetcher.cancel()
     
-    def __init__(self, api_key, provider="openai"):
+    def _prefetch_key(self, session_id, system_prompt, question):
+        """Kunci prefetch: sesi, provider, prompt sistem, riwayat, dan token perintah"""
+        tokens = command_key(question)
+        if tokens is None:
+            return None
+        return (self.provider, session_id, system_prompt, self.api.history_fingerprint(session_id), tokens)
+    
+    def publish_shared_cache(self, path):
         """
-        Inisialisasi ChatGPT API dengan provider yang dipilih
+        Menerbitkan jawaban di cache lokal sebagai berkas cache bersama untuk lab
+        
+        Entri dari berkas yang sudah ada di lokasi yang sama dipertahankan, sehingga
+        penerbitan berikutnya menambah jawaban baru tanpa menghapus yang lama.
         
         Args:
-            api_key (str): API key untuk provider yang dipilih
-            provider (str): Provider AI ("openai", "deepseek", atau "gemini")
+            path (str): Lokasi berkas, misalnya di share NFS/SMB atau direktori server HTTP
+            
+        Returns:
+            int: Jumlah entri yang diterbitkan
         """
-        self.api_key = api_key
-        self.provider = provider
+        entries = read_entries(path) if os.path.exists(path) else []
+        entries.extend(
+            (entry_key(context, text), answer) for context, text, answer in self.cache.entries(first_turn_only=True)
+        )
+        return publish(path, entries)
+    
+    def search_history(self, query, limit=20):
+        """
+        Mencari percakapan lama dari semua tab
         
-        # Inisialisasi API yang sesuai
-        if provider == "openai":
-            self.api = OpenAIAPI(api_key)
-        elif provider == "deepseek":
-            self.api = DeepSeekAPI(api_key)
-        else:  # gemini
-            self.api = GeminiAPI(api_key)
+        Args:
+            query (str): Teks pencarian
+            limit (int, optional): Jumlah hasil maksimum. Defaults to 20.
+            
+        Returns:
+            list: Daftar SearchResult, yang paling relevan lebih dulu
+        """
+        if not self.index:
+            return []
+        return self.index.search(query, limit=limit)
     
-    def get_response(self, message, session_id="default", system_prompt=None):
+    def suggest_answer(self, question, session_id=None):
         """
-        Mendapatkan respons dari AI untuk pesan tertentu
+        Mencari jawaban lama untuk pertanyaan yang hampir sama sebelum memanggil API
         
         Args:
-            message (str): Pesan yang dikirim ke AI
-            session_id (str): ID sesi untuk melacak riwayat chat
-            system_prompt (str): Prompt sistem khusus untuk sesi ini
+            question (str): Pertanyaan baru dari pengguna
+            session_id (str, optional): Batasi ke sesi tertentu. Defaults to None.
             
         Returns:
-            str: Respons dari AI
+            SearchResult: Jawaban lama yang cocok, atau None
         """
-        return self.api.get_response(message, session_id, system_prompt)
+        if not self.index:
+            return None
+        return self.index.suggest_answer(question, session_id=session_id)
     
     def get_terminal_help(self, command):
         """
@@ -534,23 +2054,301 @@ class ChatGPTAPI:
         Returns:
             str: Penjelasan tentang kode
         """
-        system_prompt = """
-        Anda adalah asisten yang ahli dalam menjelaskan kode.
+        message = f"Jelaskan kode berikut:\n\n```{language or ''}\n{code}\n```"
+        return self.get_response(message, session_id="code_explanation", system_prompt=EXPLAIN_CODE_SYSTEM_PROMPT)
+    
+    def is_large_code(self, code):
+        """
+        Memeriksa apakah kode perlu dijelaskan dengan mode file besar
         
-        Berikan penjelasan yang jelas dan terperinci tentang kode yang diberikan dengan mengikuti panduan berikut:
-        1. Jelaskan fungsi utama kode secara keseluruhan
-        2. Jelaskan cara kerjanya dengan detail
-        3. Identifikasi komponen dan alur penting
-        4. Gunakan bahasa yang sederhana dan mudah dipahami
-        5. Gunakan format paragraf yang baik dengan baris kosong antar paragraf
-        6. Gunakan teks biasa, hindari format bold atau italic
-        7. Gunakan `code` untuk nama fungsi, variabel, dan istilah teknis
-        8. Berikan konteks yang cukup untuk pemahaman
-        9. Hindari jargon teknis yang berlebihan
+        Args:
+            code (str): Kode yang ingin dijelaskan
+            
+        Returns:
+            bool: True jika perkiraan token melebihi ambang "large_code.threshold_tokens"
         """
+        threshold = self.config.get("large_code", {}).get("threshold_tokens", LARGE_CODE_TOKENS)
+        return estimate_tokens(code) > threshold
+    
+    def explains_by_section(self, code):
+        """
+        Memeriksa apakah kode dijelaskan per bagian (lihat explain_code_chunked)
         
-        message = f"Jelaskan kode berikut:\n\n```{language or ''}\n{code}\n```"
-        return self.get_response(message, session_id="code_explanation", system_prompt=system_prompt)
+        Kode besar selalu dijelaskan per bagian. Kode yang lebih kecil juga dijelaskan per
+        bagian jika berisi lebih dari satu fungsi/kelas, agar saat diedit dan dijelaskan
+        ulang hanya bagian yang berubah yang dikirim ke AI ("code_sections.enabled").
+        
+        Args:
+            code (str): Kode yang ingin dijelaskan
+            
+        Returns:
+            bool: True jika kode dijelaskan per bagian
+        """
+        if self.is_large_code(code):
+            return True
+        settings = self.config.get("code_sections", {})
+        if not settings.get("enabled", True):
+            return False
+        return len(self._split_sections(code)) > 1
+    
+    def _split_sections(self, code):
+        """Bagian kode untuk penjelasan per bagian sesuai config "large_code" dan "code_sections\""""
+        chunk_tokens = self.config.get("large_code", {}).get("chunk_tokens", DEFAULT_CHUNK_TOKENS)
+        min_tokens = self.config.get("code_sections", {}).get("min_tokens", MIN_SECTION_TOKENS)
+        return split_sections(code, max_tokens=chunk_tokens, min_tokens=min_tokens)
+    
+    def explain_code_chunked(self, code, on_progress=None, max_workers=None):
+        """
+        Menjelaskan kode per bagian (fungsi/kelas) beserta gambaran umumnya
+        
+        Kode dipecah menjadi bagian dengan batas yang stabil (split_sections). Penjelasan setiap
+        bagian disimpan berdasarkan isinya, sehingga saat kode diedit lalu dijelaskan ulang hanya
+        bagian yang berubah yang dikirim ke AI, secara bersamaan di pool pekerja terbatas.
+        Gambaran umum file hanya disusun ulang jika isi salah satu bagian berubah.
+        
+        Args:
+            code (str): Kode yang ingin dijelaskan
+            on_progress (callable, optional): Dipanggil dengan (indeks, total, bagian, penjelasan,
+                dipakai_ulang) setiap kali penjelasan satu bagian siap. Defaults to None.
+            max_workers (int, optional): Jumlah permintaan bersamaan. Defaults to config "large_code".
+            
+        Returns:
+            str: Gambaran umum diikuti penjelasan setiap bagian
+        """
+        max_workers = max_workers or self.config.get("large_code", {}).get("max_workers", DEFAULT_CHUNK_WORKERS)
+        
+        sections = self._split_sections(code)
+        total = len(sections)
+        api = self.api
+        provider = self.provider
+        profile = self.profile("code_explanation", provider)
+        model = profile.model or api.current_model()
+        keys = [section_key(section.text, provider, model) for section in sections]
+        explanations = [None] * total
+        
+        # Bagian yang isinya tidak berubah sejak penjelasan sebelumnya langsung ditampilkan
+        missing = []
+        for section in sections:
+            cached = self.sections.get(keys[section.index])
+            if cached is None:
+                missing.append(section)
+                continue
+            explanations[section.index] = cached
+            if on_progress:
+                on_progress(section.index, total, section, cached, True)
+        
+        def explain_section(section):
+            names = ", ".join(f"`{name}`" for name in section.names) or "bagian tingkat atas"
+            # Nomor baris tidak disertakan agar penjelasan tetap berlaku saat baris di atasnya berubah
+            message = (
+                f"Ini adalah satu bagian dari sebuah file kode (berisi {names}).\n"
+                "Jelaskan secara ringkas apa yang dilakukan bagian ini:\n\n"
+                f"```\n{section.text}\n```"
+            )
+            messages = [
+                {"role": "system", "content": EXPLAIN_CODE_SYSTEM_PROMPT},
+                {"role": "user", "content": message}
+            ]
+            return self._guarded(api, provider, messages, lambda: api.complete(messages, profile))
+        
+        # Hanya bagian yang berubah atau baru yang dijelaskan, secara bersamaan
+        failed = False
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                futures = {executor.submit(explain_section, section): section for section in missing}
+                for future in as_completed(futures):
+                    section = futures[future]
+                    try:
+                        explanations[section.index] = future.result()
+                        self.sections.put(keys[section.index], explanations[section.index])
+                    except Exception as e:
+                        logger.error("Error saat menjelaskan bagian %s: %s", section.index + 1, e)
+                        explanations[section.index] = f"(Bagian ini gagal dijelaskan: {api.format_error(e)})"
+                        failed = True
+                    if on_progress:
+                        on_progress(section.index, total, section, explanations[section.index], False)
+        
+        if total == 1:
+            result = explanations[0]
+        else:
+            overview = self._sections_overview(api, provider, profile, sections, keys, explanations, failed)
+            parts = [overview] if overview else []
+            for section in sections:
+                names = ", ".join(f"`{name}`" for name in section.names) or "bagian tingkat atas"
+                parts.append(f"Bagian {section.index + 1} ({names}):\n{explanations[section.index]}")
+            result = "\n\n".join(parts)
+        
+        request = f"Jelaskan kode berikut (per bagian, {len(missing)} dari {total} bagian dijelaskan ulang):\n\n{code[:200]}"
+        api.record_exchange("code_explanation", request, result)
+        if self.index:
+            self.index.add_exchange(provider, "code_explanation", code, result)
+        
+        return result
+    
+    def explains_lazily(self):
+        """
+        Memeriksa apakah penjelasan kode memakai mode dua tingkat
+        
+        Gambaran umum singkat diminta lebih dulu; rincian bagian diminta hanya saat dibuka
+        (lihat explain_code_overview dan explain_code_detail). "code_explanation.mode" bernilai
+        "full" (bawaan: penjelasan lengkap, per bagian untuk kode besar atau dengan beberapa
+        fungsi) atau "overview" untuk mode dua tingkat.
+        """
+        return self.config.get("code_explanation", {}).get("mode", "full") == "overview"
+    
+    def code_detail_targets(self, code):
+        """
+        Bagian kode yang dapat dijelaskan lebih lanjut satu per satu
+        
+        Kode dengan beberapa fungsi/kelas dipecah per fungsi/kelas (split_sections). Kode tanpa
+        fungsi/kelas dipecah per baris jika pendek, atau per blok DETAIL_BLOCK_LINES baris.
+        
+        Args:
+            code (str): Kode yang dijelaskan
+        
+        Returns:
+            list: Daftar CodeChunk
+        """
+        sections = self._split_sections(code)
+        if len(sections) > 1 or (sections and sections[0].names):
+            return sections
+        lines = sum(1 for line in code.splitlines() if line.strip())
+        return split_lines(code, 1 if lines <= DETAIL_BLOCK_LINES else DETAIL_BLOCK_LINES)
+    
+    def explain_code_overview(self, code):
+        """
+        Gambaran umum singkat sebuah kode, tingkat pertama mode dua tingkat
+        
+        Jawaban dibatasi profil "code_overview" sehingga cepat selesai, dan disimpan berdasarkan
+        hash kode. Kode besar diringkas menjadi kerangka (nama dan baris awal setiap bagian)
+        agar permintaan ini tidak ikut membesar bersama file.
+        
+        Args:
+            code (str): Kode yang dijelaskan
+        
+        Returns:
+            str: Gambaran umum (Markdown)
+        
+        Raises:
+            Exception: Jika permintaan ke provider gagal
+        """
+        api = self.api
+        provider = self.provider
+        profile = self.profile("code_overview", provider)
+        model = profile.model or api.current_model()
+        key = section_key(code, "brief", provider, model)
+        cached = self.sections.get(key)
+        if cached is not None:
+            return cached
+        
+        if self.is_large_code(code):
+            outline = "\n\n".join(
+                "\n".join(section.text.splitlines()[:OUTLINE_LINES]) + "\n..."
+                for section in self._split_sections(code)
+            )
+            body = f"Kerangka kode (baris awal setiap bagian):\n\n```\n{outline}\n```"
+        else:
+            body = f"```\n{code}\n```"
+        message = (
+            f"{body}\n\nTulis gambaran umum singkat kode ini dalam format Markdown: satu judul dan "
+            "paling banyak lima kalimat tentang fungsi dan alur utamanya. Jangan menjelaskan setiap "
+            "baris; siswa dapat meminta rincian setiap bagian secara terpisah."
+        )
+        messages = [
+            {"role": "system", "content": EXPLAIN_CODE_SYSTEM_PROMPT},
+            {"role": "user", "content": message}
+        ]
+        overview = self._guarded(api, provider, messages, lambda: api.complete(messages, profile))
+        self.sections.put(key, overview)
+        registry.increment("code_detail.overviews")
+        
+        api.record_exchange("code_explanation", f"Jelaskan kode berikut secara singkat:\n\n{code[:200]}", overview)
+        if self.index:
+            self.index.add_exchange(provider, "code_explanation", code, overview)
+        return overview
+    
+    def explain_code_detail(self, code, target):
+        """
+        Penjelasan rinci satu bagian kode, diminta hanya saat siswa membukanya
+        
+        Fungsi/kelas dijelaskan dari isinya sendiri, sehingga rinciannya tetap berlaku saat bagian
+        lain diedit. Baris atau blok tanpa nama dijelaskan dengan seluruh kode sebagai konteks
+        (jika kode tidak besar).
+        
+        Args:
+            code (str): Seluruh kode
+            target (CodeChunk): Bagian dari code_detail_targets
+        
+        Returns:
+            str: Penjelasan rinci (Markdown)
+        
+        Raises:
+            Exception: Jika permintaan ke provider gagal
+        """
+        api = self.api
+        provider = self.provider
+        profile = self.profile("code_detail", provider)
+        model = profile.model or api.current_model()
+        context = "" if target.names or self.is_large_code(code) else code
+        key = section_key(target.text, "detail", context, provider, model)
+        cached = self.sections.get(key)
+        if cached is not None:
+            return cached
+        
+        if target.names:
+            subject = f"bagian yang berisi {', '.join(f'`{name}`' for name in target.names)}"
+        elif target.start_line == target.end_line:
+            subject = "baris ini"
+        else:
+            subject = "baris-baris ini"
+        message = f"Jelaskan secara rinci {subject}, langkah demi langkah:\n\n```\n{target.text}\n```"
+        if context:
+            message += f"\n\nSebagai konteks, ini seluruh kodenya:\n\n```\n{context}\n```"
+        messages = [
+            {"role": "system", "content": EXPLAIN_CODE_SYSTEM_PROMPT},
+            {"role": "user", "content": message}
+        ]
+        detail = self._guarded(api, provider, messages, lambda: api.complete(messages, profile))
+        self.sections.put(key, detail)
+        registry.increment("code_detail.expansions")
+        return detail
+    
+    def _sections_overview(self, api, provider, profile, sections, keys, explanations, failed=False):
+        """
+        Gambaran umum file dari penjelasan per bagian; dipakai ulang selama isi semua bagian sama
+        
+        keys adalah kunci isi setiap bagian (sudah mencakup provider dan model), sehingga file lain
+        dengan nama fungsi yang sama atau isi fungsi yang diedit mendapat gambaran umum baru.
+        """
+        key = section_key("\n".join(keys), "overview")
+        cached = self.sections.get(key)
+        if cached is not None:
+            return cached
+        
+        # Cuplikan pendek per bagian agar panggilan ini tidak ikut membesar bersama file
+        summary = "\n\n".join(
+            f"Bagian {section.index + 1} ({', '.join(section.names) or 'tingkat atas'}):\n"
+            f"{explanations[section.index][:OVERVIEW_EXCERPT_CHARS]}"
+            for section in sections
+        )
+        message = (
+            f"Berikut cuplikan penjelasan {len(sections)} bagian dari satu file kode.\n\n{summary}\n\n"
+            "Tulis gambaran umum file ini dalam format Markdown: judul singkat, fungsi file secara "
+            "keseluruhan, dan alur kerja antar bagian. Jangan mengulang penjelasan setiap bagian."
+        )
+        messages = [
+            {"role": "system", "content": EXPLAIN_CODE_SYSTEM_PROMPT},
+            {"role": "user", "content": message}
+        ]
+        try:
+            overview = self._guarded(api, provider, messages, lambda: api.complete(messages, profile))
+        except Exception as e:
+            logger.error("Error saat menyusun gambaran umum kode: %s", e)
+            return None
+        # Gambaran dari penjelasan yang sebagian gagal tidak disimpan
+        if not failed:
+            self.sections.put(key, overview)
+        return overview
     
     def generate_script(self, description, script_type="bash"):
         """
@@ -563,10 +2361,142 @@ class ChatGPTAPI:
         Returns:
             str: Skrip yang dihasilkan
         """
-        system_prompt = f"Anda adalah asisten yang ahli dalam membuat skrip {script_type} untuk Linux. Berikan skrip yang berfungsi dengan baik, efisien, dan disertai komentar yang menjelaskan setiap bagian."
-        message = f"Buat skrip {script_type} berdasarkan deskripsi berikut:\n\n{description}\n\nHanya berikan skrip lengkap yang siap dijalankan di Linux tanpa penjelasan tambahan."
+        system_prompt, message = self._script_prompts(description, script_type)
         return self.get_response(message, session_id="script_generation", system_prompt=system_prompt)
     
+    def generate_script_candidates(self, description, script_type="bash", n=None):
+        """
+        Membuat beberapa kandidat skrip sekaligus dan memvalidasinya secara lokal
+        
+        Kandidat diminta bersamaan (parameter n di OpenAI, panggilan paralel di provider lain),
+        lalu sintaksnya diperiksa di pool proses. Kandidat valid pertama dicatat ke riwayat sesi.
+        
+        Args:
+            description (str): Deskripsi skrip yang ingin dibuat
+            script_type (str, optional): Jenis skrip (bash, python, dll). Defaults to "bash".
+            n (int, optional): Jumlah kandidat. Defaults to DEFAULT_SCRIPT_CANDIDATES.
+            
+        Returns:
+            list: Daftar ValidationResult, kandidat valid lebih dulu
+            
+        Raises:
+            APIError: Jika provider tidak mengembalikan satu pun kandidat yang berisi
+            Exception: Jika semua permintaan ke provider gagal
+        """
+        n = n or DEFAULT_SCRIPT_CANDIDATES
+        system_prompt, message = self._script_prompts(description, script_type)
+        
+        api = self.api
+        provider = self.provider
+        messages = api.build_messages("script_generation", message, system_prompt)
+        profile = self.profile("script_generation", provider)
+        responses = self._guarded(
+            api, provider, messages, lambda: api.complete_candidates(messages, n, profile), count=n
+        )
+        
+        # Buang kandidat kosong dan yang isinya sama persis agar alternatif benar-benar berbeda
+        scripts = list(dict.fromkeys(filter(None, (extract_script(response or "") for response in responses))))
+        if not scripts:
+            raise APIError(f"{api.name} tidak mengembalikan kandidat skrip")
+        results = validate_candidates(scripts, script_type)
+        
+        # Urutan stabil: kandidat valid lebih dulu, sisanya sesuai urutan datang
+        results.sort(key=lambda result: not result.valid)
+        
+        best = results[0].script
+        api.record_exchange("script_generation", message, f"```{script_type}\n{best}\n```", system_prompt)
+        if self.index:
+            self.index.add_exchange(provider, "script_generation", description, best)
+        
+        return results
+    
+    def _script_prompts(self, description, script_type):
+        """Prompt sistem dan pesan untuk pembuatan skrip"""
+        system_prompt = f"Anda adalah asisten yang ahli dalam membuat skrip {script_type} untuk Linux. Berikan skrip yang berfungsi dengan baik, efisien, dan disertai komentar yang menjelaskan setiap bagian."
+        message = f"""Buat skrip {script_type} berdasarkan deskripsi berikut:
+
+{description}
+
+Skrip harus:
+1. Berfungsi dengan baik di sistem Linux
+2. Memiliki komentar yang jelas untuk setiap bagian
+3. Memiliki error handling yang baik
+4. Mengikuti best practices untuk {script_type}
+5. Siap dijalankan tanpa modifikasi
+
+Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelasan tambahan.
+"""
+        return system_prompt, message
+    
+    def comparison_prompt(self, session_id, text):
+        """
+        Prompt sistem dan pesan untuk perbandingan provider, sesuai tab asal pertanyaan
+        
+        Args:
+            session_id (str): ID sesi/tab ("chat", "terminal", "code_explanation", "script_generation")
+            text (str): Pertanyaan, kode, atau deskripsi skrip
+            
+        Returns:
+            tuple: (prompt sistem atau None untuk prompt bawaan provider, pesan)
+        """
+        if session_id == "terminal":
+            return None, TERMINAL_CONTEXT + text
+        if session_id == "code_explanation":
+            return EXPLAIN_CODE_SYSTEM_PROMPT, f"Jelaskan kode berikut:\n\n```\n{text}\n```"
+        if session_id == "script_generation":
+            return self._script_prompts(text, "bash")
+        return None, text
+    
+    def compare_one(self, provider, message, system_prompt=None, on_delta=None, session_id="chat"):
+        """
+        Mengirim satu pertanyaan ke satu provider untuk mode perbandingan
+        
+        Permintaan tidak memakai cache dan tidak dicatat ke riwayat sesi mana pun,
+        sehingga semua provider menjawab pertanyaan yang sama dari keadaan yang sama.
+        
+        Args:
+            provider (str): Provider AI
+            message (str): Pesan pengguna
+            system_prompt (str, optional): Prompt sistem. Defaults to prompt bawaan provider.
+            on_delta (callable, optional): Dipanggil dengan setiap potongan jawaban. Defaults to None.
+            session_id (str, optional): Tab asal, menentukan profil generasi. Defaults to "chat".
+            
+        Returns:
+            dict: provider, model, content, ttft_s, latency_s, prompt_tokens, completion_tokens, estimated
+        """
+        api = self.get_client(provider)
+        profile = self.profile(session_id, provider)
+        messages = []
+        prompt = system_prompt or api.default_system_prompt
+        if prompt:
+            messages.append({"role": "system", "content": prompt})
+        messages.append({"role": "user", "content": message})
+        
+        started = time.monotonic()
+        first = []
+        
+        def handle_delta(delta):
+            if not first:
+                first.append(time.monotonic() - started)
+            if on_delta:
+                on_delta(delta)
+        
+        content = self._guarded(api, provider, messages, lambda: api.complete_stream(messages, handle_delta, profile))
+        latency = time.monotonic() - started
+        registry.increment("compare.requests")
+        
+        usage = api.last_usage() or (None, None, True)
+        return {
+            "provider": provider,
+            "model": profile.model or api.current_model(),
+            "content": content,
+            "ttft_s": round(first[0] if first else latency, 3),
+            "latency_s": round(latency, 3),
+            "prompt_tokens": usage[0],
+            "completion_tokens": usage[1],
+            "estimated": usage[2],
+        }
+    
     def get_system_help(self, question, system_info):
         """
         Mendapatkan bantuan terkait sistem
@@ -592,7 +2522,15 @@ class ChatGPTAPI:
         Returns:
             bool: True jika berhasil, False jika gagal
         """
-        return self.api.change_model(model_name)
+        # Model yang sudah ada di katalog tidak perlu divalidasi ulang ke API
+        if self.catalog.has_model(self.provider, model_name):
+            changed = self.api.set_model(model_name)
+        else:
+            changed = self.api.change_model(model_name)
+        
+        if changed:
+            self.config.setdefault("models", {})[self.provider] = model_name
+        return changed
     
     def clear_history(self, session_id="default"):
         """
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Klien terminal untuk EduBot
+    edubot ask "pertanyaan"
+    perintah 2>&1 | edubot explain
+
+Klien hanya mengirim pertanyaan ke proses EduBot yang sedang berjalan lewat socket
+instance, lalu menulis jawaban yang di-stream ke stdout. Klien tidak memuat PyQt
+maupun SDK provider; klien, cache, dan riwayat sesi milik proses residen yang dipakai.
+"""
+import sys
+import argparse
+
+from single_instance import request
+
+# ID sesi untuk pertanyaan dari terminal, terpisah dari tab di jendela
+CLI_SESSION = "cli"
+
+CLI_SYSTEM_PROMPT = (
+    "Anda adalah asisten yang ahli dalam Linux dan pemrograman, menjawab langsung di terminal. "
+    "Jawab dalam teks biasa tanpa HTML. Tulis contoh perintah atau kode dalam blok kode Markdown (```). "
+    "Jawaban ringkas dan langsung ke inti."
+)
+
+# Batas teks dari stdin agar keluaran perintah yang sangat panjang tidak menghabiskan token
+MAX_INPUT_CHARS = 12000
+
+EXPLAIN_PROMPT = """Jelaskan keluaran perintah terminal berikut. Jika ada pesan error, jelaskan penyebabnya dan cara memperbaikinya.
+
+```
+{output}
+```
+"""
+
+def serve_request(api, payload, send):
+    """
+    Melayani permintaan klien terminal di proses residen (dipanggil dari thread socket)
+
+    Args:
+        api (ChatGPTAPI): API milik jendela utama
+        payload (dict): {"op": "ask"|"explain", "text": str, "question": str, "new": bool, "use_cache": bool}
+        send (callable): Mengirim satu event ke klien
+    """
+    op = payload.get("op")
+    text = (payload.get("text") or "").strip()
+    if op not in ("ask", "explain"):
+        send({"error": f"Perintah tidak dikenal: {op}"})
+        return
+    if not text:
+        send({"error": "Tidak ada teks yang dikirim"})
+        return
+
+    if payload.get("new"):
+        api.clear_history(CLI_SESSION)
+
+    if op == "explain":
+        message = EXPLAIN_PROMPT.format(output=text[-MAX_INPUT_CHARS:])
+        question = (payload.get("question") or "").strip()
+        if question:
+            message += f"\n{question}"
+    else:
+        message = text
+
+    response = api.get_response(
+        message,
+        session_id=CLI_SESSION,
+        system_prompt=CLI_SYSTEM_PROMPT,
+        index_text=text if op == "ask" else None,
+        use_cache=payload.get("use_cache", True),
+        on_delta=lambda delta: send({"delta": delta}),
+        # Kegagalan provider dikirim sebagai {"error": ...} (lihat InstanceServer) agar klien keluar dengan kode 1
+        raise_errors=True
+    )
+    send({"done": True, "provider": api.provider, "length": len(response or "")})
+
+def run(argv):
+    """
+    Menjalankan klien terminal
+
+    Args:
+        argv (list): Argumen setelah nama program, misalnya ["ask", "apa itu grep?"]
+
+    Returns:
+        int: Kode keluar
+    """
+    parser = argparse.ArgumentParser(prog="edubot", description="Bertanya ke EduBot yang sedang berjalan dari terminal")
+    subparsers = parser.add_subparsers(dest="op", required=True)
+
+    ask_parser = subparsers.add_parser("ask", help="Ajukan pertanyaan (teks dari argumen atau stdin)")
+    ask_parser.add_argument("text", nargs="*", help="Pertanyaan")
+
+    explain_parser = subparsers.add_parser("explain", help="Jelaskan keluaran perintah dari stdin")
+    explain_parser.add_argument("question", nargs="*", help="Pertanyaan tambahan tentang keluaran")
+
+    for sub in (ask_parser, explain_parser):
+        sub.add_argument("--new", action="store_true", help="Mulai percakapan terminal baru")
+        sub.add_argument("--no-cache", action="store_true", help="Selalu minta jawaban baru dari provider")
+
+    args = parser.parse_args(argv)
+
+    piped = "" if sys.stdin.isatty() else sys.stdin.read()
+    payload = {"op": args.op, "new": args.new, "use_cache": not args.no_cache}
+    if args.op == "ask":
+        payload["text"] = " ".join(args.text) or piped
+    else:
+        payload["text"] = piped
+        payload["question"] = " ".join(args.question)
+
+    if not payload["text"].strip():
+        if args.op == "explain":
+            print("Kirim keluaran perintah lewat pipe, misalnya: make 2>&1 | edubot explain", file=sys.stderr)
+        else:
+            print("Tuliskan pertanyaan, misalnya: edubot ask \"apa itu chmod?\"", file=sys.stderr)
+        return 2
+
+    def on_event(event):
+        if "delta" in event:
+            sys.stdout.write(event["delta"])
+            sys.stdout.flush()
+
+    try:
+        result = request(payload, on_event)
+    except ConnectionError:
+        print("EduBot belum berjalan. Buka EduBot terlebih dahulu, lalu coba lagi.", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
+
+    if "error" in result:
+        print(f"Error: {result['error']}", file=sys.stderr)
+        return 1
+    sys.stdout.write("\n")
+    return 0
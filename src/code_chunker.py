@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul pemecah kode untuk EduBot
+Memecah kode menjadi unit sintaksis (fungsi/kelas) dan bagian yang dibatasi jumlah token
+"""
+import re
+import ast
+from collections import namedtuple
+
+# Perkiraan kasar: satu token kira-kira empat karakter
+CHARS_PER_TOKEN = 4
+
+# Satu unit sintaksis dalam kode
+CodeUnit = namedtuple("CodeUnit", ["name", "kind", "start_line", "end_line", "text"])
+
+# Satu bagian kode yang dijelaskan dalam satu permintaan
+CodeChunk = namedtuple("CodeChunk", ["index", "start_line", "end_line", "names", "text"])
+
+_PYTHON_HINT_RE = re.compile(r"^\s*(def |class |import |from \S+ import |if __name__)", re.MULTILINE)
+_NAMED_BLOCK_RE = re.compile(
+    r"^\s*(?:export\s+)?(?:public\s+|private\s+|protected\s+|static\s+|async\s+)*"
+    r"(?:function\s+(?P<func>\w+)|class\s+(?P<cls>\w+)|(?P<sh>[\w.-]+)\s*\(\s*\)\s*\{?|"
+    r"(?:[\w<>\[\],*&:]+\s+)+(?P<c>\w+)\s*\([^;]*\)\s*(?:const\s*)?\{?\s*$)"
+)
+
+# Kode tingkat modul tanpa nama yang lebih kecil dari ini (import, konstanta) digabung
+# dengan unit sesudahnya di split_sections
+MIN_SECTION_TOKENS = 40
+
+# Kata penutup blok di kolom pertama yang masih bagian dari blok sebelumnya (shell, Ruby, Lua)
+_BLOCK_CLOSERS = frozenset(["done", "fi", "esac", "end", "}", "};", "else", "elif", "elsif", "then", "do"])
+
+def estimate_tokens(text):
+    """
+    Memperkirakan jumlah token dari panjang teks
+
+    Args:
+        text (str): Teks yang diperkirakan
+
+    Returns:
+        int: Perkiraan jumlah token
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def detect_language(code):
+    """
+    Menebak bahasa kode untuk memilih strategi pemecahan
+
+    Args:
+        code (str): Kode sumber
+
+    Returns:
+        str: "python", "brace" (C, Java, JS, shell dengan kurung kurawal), atau "indent"
+    """
+    if _PYTHON_HINT_RE.search(code):
+        try:
+            ast.parse(code)
+            return "python"
+        except SyntaxError:
+            pass
+    if code.count("{") and abs(code.count("{") - code.count("}")) <= max(2, code.count("{") // 10):
+        return "brace"
+    return "indent"
+
+def split_units(code, language=None):
+    """
+    Memecah kode menjadi unit sintaksis tingkat atas
+
+    Args:
+        code (str): Kode sumber
+        language (str, optional): Hasil detect_language. Defaults to None (dideteksi otomatis).
+
+    Returns:
+        list: Daftar CodeUnit berurutan yang mencakup seluruh baris kode
+    """
+    language = language or detect_language(code)
+    lines = code.splitlines()
+    if not lines:
+        return []
+
+    if language == "python":
+        spans = _python_spans(code)
+    elif language == "brace":
+        spans = _brace_spans(lines)
+    else:
+        spans = _indent_spans(lines)
+
+    return _fill_gaps(spans, lines)
+
+def split_sections(code, max_tokens=1500, min_tokens=MIN_SECTION_TOKENS, language=None):
+    """
+    Memecah kode menjadi bagian yang batasnya tetap stabil saat kode diedit
+
+    Setiap bagian berisi satu unit sintaksis (dipecah jika melebihi max_tokens) beserta
+    kode tingkat modul kecil tepat sebelumnya. Batas bagian tidak bergantung pada ukuran unit
+    lain, sehingga mengedit satu fungsi hanya mengubah bagian fungsi itu.
+
+    Args:
+        code (str): Kode sumber
+        max_tokens (int, optional): Batas token per bagian. Defaults to 1500.
+        min_tokens (int, optional): Unit tanpa nama yang lebih kecil digabung dengan unit sesudahnya.
+            Defaults to MIN_SECTION_TOKENS.
+        language (str, optional): Bahasa kode. Defaults to None (dideteksi otomatis).
+
+    Returns:
+        list: Daftar CodeChunk berurutan
+    """
+    sections = []
+    pending = []
+    for unit in split_units(code, language):
+        for piece in _split_oversized(unit, max_tokens):
+            pending.append(piece)
+            if piece.name or estimate_tokens(piece.text) >= min_tokens:
+                sections.append(_make_chunk(len(sections), pending))
+                pending = []
+    if pending:
+        sections.append(_make_chunk(len(sections), pending))
+    return sections
+
+def split_lines(code, lines_per_block=1):
+    """
+    Memecah kode menjadi blok beberapa baris, untuk kode tanpa fungsi/kelas
+
+    Baris kosong tidak menjadi blok sendiri. Blok diakhiri lebih awal di baris kosong jika sudah
+    berisi setidaknya separuh lines_per_block baris, agar potongan mengikuti paragraf kode.
+
+    Args:
+        code (str): Kode sumber
+        lines_per_block (int, optional): Jumlah baris maksimum per blok. Defaults to 1.
+
+    Returns:
+        list: Daftar CodeChunk berurutan (names kosong)
+    """
+    blocks = []
+    current = []
+    for number, line in enumerate(code.splitlines(), start=1):
+        if not line.strip():
+            if current and len(current) * 2 >= lines_per_block:
+                blocks.append(current)
+                current = []
+            continue
+        current.append((number, line))
+        if len(current) >= lines_per_block:
+            blocks.append(current)
+            current = []
+    if current:
+        blocks.append(current)
+
+    return [
+        CodeChunk(index, block[0][0], block[-1][0], [], "\n".join(line for _, line in block))
+        for index, block in enumerate(blocks)
+    ]
+
+def _make_chunk(index, units):
+    """Menggabungkan unit berurutan menjadi satu CodeChunk"""
+    return CodeChunk(
+        index,
+        units[0].start_line,
+        units[-1].end_line,
+        [unit.name for unit in units if unit.name],
+        "\n".join(unit.text for unit in units)
+    )
+
+def _python_spans(code):
+    """Rentang baris (1-based) untuk fungsi dan kelas tingkat atas di kode Python"""
+    spans = []
+    for node in ast.parse(code).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # Sertakan dekorator sebagai bagian dari unit
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            kind = "class" if isinstance(node, ast.ClassDef) else "function"
+            spans.append((node.name, kind, start, node.end_lineno))
+    return spans
+
+def _brace_spans(lines):
+    """Rentang baris untuk blok bernama dengan kurung kurawal (heuristik)"""
+    spans = []
+    depth = 0
+    start = None
+    name = None
+
+    for number, line in enumerate(lines, start=1):
+        stripped = _strip_strings(line)
+        if depth == 0 and start is None:
+            match = _NAMED_BLOCK_RE.match(line)
+            if match and (("{" in stripped) or (number < len(lines) and lines[number].strip().startswith("{"))):
+                start = number
+                name = next(group for group in match.groups() if group)
+
+        depth += stripped.count("{") - stripped.count("}")
+        depth = max(depth, 0)
+
+        if start is not None and depth == 0 and "}" in stripped:
+            spans.append((name, "block", start, number))
+            start = None
+            name = None
+
+    return spans
+
+def _indent_spans(lines):
+    """Rentang baris untuk blok yang dimulai di kolom pertama dan diikuti baris menjorok"""
+    spans = []
+    start = None
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        if not line[0].isspace() and line.split()[0] not in _BLOCK_CLOSERS:
+            if start is not None and number - 1 > start:
+                spans.append((None, "block", start, _last_nonblank(lines, start, number - 1)))
+            start = number
+    if start is not None:
+        spans.append((None, "block", start, _last_nonblank(lines, start, len(lines))))
+
+    return spans
+
+def _last_nonblank(lines, start, end):
+    """Nomor baris terakhir yang tidak kosong dalam rentang [start, end]"""
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return end
+
+def _fill_gaps(spans, lines):
+    """Mengubah rentang menjadi unit dan mengisi baris di antaranya sebagai unit modul"""
+    units = []
+    cursor = 1
+
+    def add(name, kind, start, end):
+        text = "\n".join(lines[start - 1:end])
+        if text.strip():
+            units.append(CodeUnit(name, kind, start, end, text))
+
+    for name, kind, start, end in sorted(spans, key=lambda span: span[2]):
+        if start < cursor:
+            continue
+        if start > cursor:
+            add(None, "module", cursor, start - 1)
+        add(name, kind, start, end)
+        cursor = end + 1
+
+    if cursor <= len(lines):
+        add(None, "module", cursor, len(lines))
+
+    return units
+
+def _split_oversized(unit, max_tokens):
+    """Memecah unit yang lebih besar dari batas token berdasarkan baris"""
+    if estimate_tokens(unit.text) <= max_tokens:
+        return [unit]
+
+    pieces = []
+    lines = unit.text.splitlines()
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    buffer = []
+    size = 0
+    start = unit.start_line
+
+    for line in lines:
+        if buffer and size + len(line) + 1 > max_chars:
+            end = start + len(buffer) - 1
+            pieces.append(CodeUnit(unit.name, unit.kind, start, end, "\n".join(buffer)))
+            start = end + 1
+            buffer = []
+            size = 0
+        buffer.append(line)
+        size += len(line) + 1
+
+    if buffer:
+        pieces.append(CodeUnit(unit.name, unit.kind, start, start + len(buffer) - 1, "\n".join(buffer)))
+
+    return pieces
+
+def _strip_strings(line):
+    """Menghapus isi string dan komentar satu baris agar kurung di dalamnya tidak dihitung"""
+    line = re.sub(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', '""', line)
+    return re.sub(r"//.*$|#.*$", "", line)
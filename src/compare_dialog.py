@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dialog Perbandingan Provider untuk EduBot
+Mengirim pertanyaan yang sama ke semua provider sekaligus dan menampilkan jawabannya
+berdampingan beserta waktu token pertama (TTFT), latensi total, dan jumlah token
+"""
+import os
+import json
+from datetime import datetime
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTextEdit, QPushButton, QLabel,
+    QComboBox, QSplitter, QWidget, QMessageBox, QFileDialog
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QTextCursor
+
+from app_config import CONFIG_DIR
+from auth_manager import PROVIDER_NAMES
+
+COMPARISONS_DIR = os.path.join(CONFIG_DIR, "comparisons")
+
+# Tab yang dapat dipakai sebagai konteks perbandingan (ID sesi -> label)
+COMPARE_MODES = {
+    "chat": "Bantuan Umum",
+    "terminal": "Bantuan Terminal",
+    "code_explanation": "Penjelasan Kode",
+    "script_generation": "Pembuatan Skrip",
+}
+
+class _Pane:
+    """Widget jawaban satu provider"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.widget = QWidget()
+        layout = QVBoxLayout(self.widget)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        self.header = QLabel(f"<b>{PROVIDER_NAMES.get(provider, provider)}</b>")
+        layout.addWidget(self.header)
+
+        self.text = QTextEdit()
+        self.text.setReadOnly(True)
+        layout.addWidget(self.text)
+
+        self.metrics = QLabel("")
+        self.metrics.setWordWrap(True)
+        layout.addWidget(self.metrics)
+
+    def append(self, delta):
+        """Menambahkan potongan jawaban di akhir teks"""
+        cursor = self.text.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(delta)
+        self.text.setTextCursor(cursor)
+
+    def show_result(self, result):
+        """Menampilkan jawaban lengkap dan metriknya"""
+        model = result.get("model")
+        name = PROVIDER_NAMES.get(self.provider, self.provider)
+        self.header.setText(f"<b>{name}</b>" + (f" ({model})" if model else ""))
+        self.text.setPlainText(result.get("content") or "")
+
+        if result.get("error"):
+            self.metrics.setText(f"<span style='color:#D32F2F'>{result['error']}</span>")
+            return
+        tokens = f"{result.get('prompt_tokens')} masuk / {result.get('completion_tokens')} keluar"
+        if result.get("estimated"):
+            tokens += " (perkiraan)"
+        self.metrics.setText(
+            f"TTFT: {result['ttft_s']:.2f} s | Total: {result['latency_s']:.2f} s | Token: {tokens}"
+        )
+
+class CompareDialog(QDialog):
+    """Dialog yang membandingkan jawaban semua provider untuk pertanyaan yang sama"""
+
+    def __init__(self, api, workers, session_id="chat", parent=None):
+        """
+        Inisialisasi dialog perbandingan
+
+        Args:
+            api (ChatGPTAPI): API yang menyimpan klien semua provider
+            workers (WorkerPool): Pool pekerja untuk menjalankan permintaan
+            session_id (str, optional): Tab asal, menentukan prompt sistem. Defaults to "chat".
+            parent (QWidget, optional): Jendela induk. Defaults to None.
+        """
+        super().__init__(parent)
+        self.api = api
+        self.workers = workers
+        self.setWindowTitle("EduBot - Bandingkan Provider")
+        self.resize(1100, 680)
+
+        self.panes = {}
+        self.results = {}
+        self.request = None
+        # Jawaban dari perbandingan sebelumnya yang masih berjalan diabaikan
+        self._run = 0
+
+        layout = QVBoxLayout(self)
+
+        # Konteks dan pertanyaan
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Konteks:"))
+        self.mode_combo = QComboBox()
+        for mode, label in COMPARE_MODES.items():
+            self.mode_combo.addItem(label, mode)
+        self.mode_combo.setCurrentIndex(max(0, self.mode_combo.findData(session_id)))
+        mode_layout.addWidget(self.mode_combo)
+        mode_layout.addStretch()
+        layout.addLayout(mode_layout)
+
+        self.prompt_input = QTextEdit()
+        self.prompt_input.setPlaceholderText("Ketik pertanyaan yang akan dikirim ke semua provider...")
+        self.prompt_input.setMaximumHeight(100)
+        layout.addWidget(self.prompt_input)
+
+        # Jawaban berdampingan
+        self.splitter = QSplitter(Qt.Horizontal)
+        layout.addWidget(self.splitter, 1)
+
+        # Tombol
+        button_layout = QHBoxLayout()
+
+        self.compare_btn = QPushButton("Bandingkan")
+        self.compare_btn.clicked.connect(self._start)
+        button_layout.addWidget(self.compare_btn)
+
+        button_layout.addStretch()
+
+        self.save_btn = QPushButton("Simpan Perbandingan")
+        self.save_btn.setEnabled(False)
+        self.save_btn.clicked.connect(self._save)
+        button_layout.addWidget(self.save_btn)
+
+        load_btn = QPushButton("Buka...")
+        load_btn.clicked.connect(self._load)
+        button_layout.addWidget(load_btn)
+
+        close_btn = QPushButton("Tutup")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+
+        self._build_panes(self.api.available_providers())
+
+    def done(self, result):
+        """Mengabaikan jawaban yang masih berjalan setelah dialog ditutup"""
+        self._run += 1
+        super().done(result)
+
+    def _build_panes(self, providers):
+        """Membuat ulang satu panel untuk setiap provider"""
+        for pane in self.panes.values():
+            pane.widget.setParent(None)
+            pane.widget.deleteLater()
+        self.panes = {}
+        for provider in providers:
+            pane = _Pane(provider)
+            self.panes[provider] = pane
+            self.splitter.addWidget(pane.widget)
+
+    def _start(self):
+        """Mengirim pertanyaan ke semua provider secara bersamaan"""
+        text = self.prompt_input.toPlainText().strip()
+        if not text:
+            QMessageBox.warning(self, "Input Kosong", "Masukkan pertanyaan yang ingin dibandingkan terlebih dahulu")
+            return
+
+        providers = self.api.available_providers()
+        if not providers:
+            QMessageBox.warning(self, "Tidak Ada Provider", "Belum ada provider dengan API key")
+            return
+
+        session_id = self.mode_combo.currentData()
+        system_prompt, message = self.api.comparison_prompt(session_id, text)
+        self.request = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "session_id": session_id,
+            "question": text,
+            "system_prompt": system_prompt,
+            "message": message,
+        }
+        self.results = {}
+        self._run += 1
+        run = self._run
+
+        self._build_panes(providers)
+        self.save_btn.setEnabled(False)
+        self.compare_btn.setEnabled(False)
+
+        api = self.api
+        for provider in providers:
+            self.panes[provider].metrics.setText("Menunggu jawaban...")
+            # provider diikat sebagai argumen bawaan agar setiap lambda memakai provider-nya sendiri
+            task = self.workers.submit(
+                lambda task, provider=provider: api.compare_one(
+                    provider, message, system_prompt, on_delta=task.report, session_id=session_id
+                ),
+                lambda result, provider=provider: self._finish(run, provider, result),
+                on_error=lambda error, provider=provider: self._fail(run, provider, error),
+                on_progress=lambda delta, provider=provider: self._stream(run, provider, delta)
+            )
+            if task is None:
+                self._fail(run, provider, RuntimeError("Antrean pekerja penuh"))
+
+    def _stream(self, run, provider, delta):
+        """Menampilkan potongan jawaban yang baru diterima"""
+        if run == self._run:
+            self.panes[provider].append(delta)
+
+    def _finish(self, run, provider, result):
+        """Menampilkan jawaban lengkap dan metrik satu provider"""
+        if run != self._run:
+            return
+        self.results[provider] = result
+        self.panes[provider].show_result(result)
+        self._check_done()
+
+    def _fail(self, run, provider, error):
+        """Menampilkan kesalahan satu provider"""
+        if run != self._run:
+            return
+        try:
+            message = self.api.get_client(provider).format_error(error)
+        except Exception:
+            message = f"Terjadi kesalahan: {str(error)}"
+        result = {"provider": provider, "content": "", "error": message}
+        self.results[provider] = result
+        self.panes[provider].show_result(result)
+        self._check_done()
+
+    def _check_done(self):
+        """Mengaktifkan tombol kembali setelah semua provider selesai"""
+        if len(self.results) == len(self.panes):
+            self.compare_btn.setEnabled(True)
+            self.save_btn.setEnabled(True)
+
+    def _save(self):
+        """Menyimpan perbandingan sebagai JSON di direktori perbandingan"""
+        if not self.request or not self.results:
+            return
+        os.makedirs(COMPARISONS_DIR, exist_ok=True)
+        default_path = os.path.join(COMPARISONS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Simpan Perbandingan", default_path, "Perbandingan EduBot (*.json);;All Files (*)"
+        )
+        if not file_name:
+            return
+
+        data = dict(self.request)
+        data["results"] = [self.results[provider] for provider in self.panes if provider in self.results]
+        try:
+            with open(file_name, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan perbandingan: {str(e)}")
+
+    def _load(self):
+        """Membuka perbandingan yang pernah disimpan"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Buka Perbandingan", COMPARISONS_DIR, "Perbandingan EduBot (*.json);;All Files (*)"
+        )
+        if not file_name:
+            return
+        try:
+            with open(file_name, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            results = data["results"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            QMessageBox.critical(self, "Error", f"Gagal membuka perbandingan: {str(e)}")
+            return
+
+        # Perbandingan yang masih berjalan tidak lagi ditampilkan
+        self._run += 1
+        self.compare_btn.setEnabled(True)
+
+        self.request = {key: value for key, value in data.items() if key != "results"}
+        self.prompt_input.setPlainText(data.get("question", ""))
+        self.mode_combo.setCurrentIndex(max(0, self.mode_combo.findData(data.get("session_id"))))
+
+        self._build_panes([result.get("provider", "?") for result in results])
+        self.results = {}
+        for result in results:
+            provider = result.get("provider", "?")
+            self.results[provider] = result
+            self.panes[provider].show_result(result)
+        self.save_btn.setEnabled(True)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dialog Diagnostik untuk EduBot
+Menampilkan metrik internal (cache, antrean, prefetch, dll.) yang dikumpulkan di registri metrik
+"""
+import tracemalloc
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QHeaderView, QLineEdit
+)
+from PyQt5.QtCore import QTimer
+
+from metrics import registry
+from memory_budget import start_tracing
+
+class DiagnosticsDialog(QDialog):
+    """Dialog yang menampilkan snapshot metrik dan diperbarui secara berkala"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("EduBot - Diagnostik")
+        self.resize(560, 480)
+
+        layout = QVBoxLayout(self)
+
+        # Filter nama metrik
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter metrik (misalnya: cache)...")
+        self.filter_input.textChanged.connect(self._refresh)
+        layout.addWidget(self.filter_input)
+
+        # Tabel metrik
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Metrik", "Nilai"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        # Tombol
+        button_layout = QHBoxLayout()
+
+        # tracemalloc mati secara bawaan karena memperlambat setiap alokasi
+        self.trace_btn = QPushButton("Lacak Alokasi Python")
+        self.trace_btn.setToolTip("Menampilkan memori objek Python (memory.traced_mb) hingga aplikasi ditutup")
+        self.trace_btn.setEnabled(not tracemalloc.is_tracing())
+        self.trace_btn.clicked.connect(self._start_tracing)
+        button_layout.addWidget(self.trace_btn)
+
+        button_layout.addStretch()
+
+        refresh_btn = QPushButton("Segarkan")
+        refresh_btn.clicked.connect(self._refresh)
+        button_layout.addWidget(refresh_btn)
+
+        close_btn = QPushButton("Tutup")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+
+        # Segarkan otomatis setiap detik selama dialog terbuka
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self._refresh)
+        self.timer.start()
+
+        self._refresh()
+
+    def _start_tracing(self):
+        """Menyalakan tracemalloc dan menampilkan hasilnya di tabel"""
+        start_tracing()
+        self.trace_btn.setEnabled(False)
+        self._refresh()
+
+    def _refresh(self):
+        """Memperbarui isi tabel dari registri metrik"""
+        text_filter = self.filter_input.text().strip().lower()
+        rows = [
+            (name, value) for name, value in registry.snapshot().items()
+            if not text_filter or text_filter in name.lower()
+        ]
+
+        self.table.setRowCount(len(rows))
+        for row, (name, value) in enumerate(rows):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.setItem(row, 1, QTableWidgetItem(str(value)))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul profil generasi untuk EduBot
+Pengaturan generasi per tugas (panjang jawaban, temperature, model pilihan, stop sequence)
+agar tab berjawaban pendek selesai lebih cepat dan tab berjawaban panjang tidak terpotong
+"""
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# model: model untuk satu panggilan (diisi dari models sesuai provider); None = model aktif provider
+GenerationProfile = namedtuple(
+    "GenerationProfile", ["name", "max_tokens", "temperature", "stop", "models", "model"]
+)
+
+# Pengaturan lama untuk semua panggilan, dipakai untuk sesi tanpa profil
+DEFAULT_PROFILE = GenerationProfile("default", 1000, 0.7, (), {}, None)
+
+# Profil bawaan per ID sesi/tab; dapat diubah lewat bagian "profiles" di config.json, misalnya
+#   "profiles": {"terminal": {"max_tokens": 300, "models": {"openai": "gpt-4o-mini"}}}
+DEFAULT_PROFILES = {
+    "chat": {"max_tokens": 1000, "temperature": 0.7},
+    "terminal": {"max_tokens": 400, "temperature": 0.2},
+    "cli": {"max_tokens": 500, "temperature": 0.2},
+    "system_help": {"max_tokens": 1200, "temperature": 0.4},
+    "code_explanation": {"max_tokens": 2000, "temperature": 0.3},
+    # Mode penjelasan kode dua tingkat: gambaran umum singkat, lalu rincian per bagian saat diminta
+    "code_overview": {"max_tokens": 400, "temperature": 0.3},
+    "code_detail": {"max_tokens": 800, "temperature": 0.3},
+    "script_generation": {"max_tokens": 3000, "temperature": 0.2},
+}
+
+# Provider OpenAI menerima paling banyak empat stop sequence
+MAX_STOP_SEQUENCES = 4
+
+def load_profiles(config=None):
+    """
+    Membaca profil generasi dari bawaan dan bagian "profiles" di config.json
+
+    Args:
+        config (dict, optional): Bagian "profiles" dari config.json. Defaults to None.
+
+    Returns:
+        dict: Nama profil -> GenerationProfile
+    """
+    config = config or {}
+    profiles = {}
+    for name in set(DEFAULT_PROFILES) | set(config):
+        settings = dict(DEFAULT_PROFILES.get(name, {}))
+        if isinstance(config.get(name), dict):
+            settings.update(config[name])
+        try:
+            profiles[name] = GenerationProfile(
+                name,
+                int(settings.get("max_tokens", DEFAULT_PROFILE.max_tokens)),
+                float(settings.get("temperature", DEFAULT_PROFILE.temperature)),
+                tuple(settings.get("stop") or ())[:MAX_STOP_SEQUENCES],
+                dict(settings.get("models") or {}),
+                None,
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning("Profil generasi %s tidak valid, memakai pengaturan bawaan: %s", name, e)
+            profiles[name] = DEFAULT_PROFILE._replace(name=name)
+    return profiles
+
+def resolve(profiles, session_id, provider):
+    """
+    Profil untuk satu panggilan ke provider tertentu
+
+    Args:
+        profiles (dict): Hasil load_profiles
+        session_id (str): ID sesi/tab
+        provider (str): Provider yang akan dipanggil
+
+    Returns:
+        GenerationProfile: Profil dengan model pilihan untuk provider tersebut (atau None)
+    """
+    profile = profiles.get(session_id, DEFAULT_PROFILE)
+    return profile._replace(model=profile.models.get(provider))
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dialog Log untuk EduBot
+Menampilkan record log terakhir dari buffer memori app_logging, dapat difilter menurut
+level dan teks (misalnya ID permintaan, sesi, atau provider)
+"""
+import os
+import logging
+from datetime import datetime
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QHeaderView, QLineEdit, QComboBox, QLabel
+)
+from PyQt5.QtCore import QTimer, QUrl
+from PyQt5.QtGui import QColor, QDesktopServices
+
+from app_logging import LOGS_DIR, recent_records
+
+# Record yang ditampilkan paling banyak; yang lebih lama tetap ada di berkas log
+MAX_ROWS = 1000
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+LEVEL_COLORS = {
+    "WARNING": "#F57C00",
+    "ERROR": "#D32F2F",
+    "CRITICAL": "#D32F2F",
+}
+
+COLUMNS = ["Waktu", "Level", "Modul", "Permintaan", "Sesi", "Provider", "Pesan"]
+
+class LogViewerDialog(QDialog):
+    """Dialog yang menampilkan log aplikasi dan diperbarui secara berkala"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("EduBot - Log")
+        self.resize(980, 520)
+
+        self.records = []
+        self._last_seq = 0
+
+        layout = QVBoxLayout(self)
+
+        # Filter level dan teks
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Level minimum:"))
+        self.level_combo = QComboBox()
+        self.level_combo.addItems(LEVELS)
+        self.level_combo.setCurrentText("INFO")
+        self.level_combo.currentIndexChanged.connect(self._render)
+        filter_layout.addWidget(self.level_combo)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter pesan, modul, sesi, provider, atau ID permintaan...")
+        self.filter_input.textChanged.connect(self._render)
+        filter_layout.addWidget(self.filter_input, 1)
+        layout.addLayout(filter_layout)
+
+        # Tabel log
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        header = self.table.horizontalHeader()
+        for column in range(len(COLUMNS) - 1):
+            header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(len(COLUMNS) - 1, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setWordWrap(False)
+        layout.addWidget(self.table)
+
+        # Tombol
+        button_layout = QHBoxLayout()
+
+        folder_btn = QPushButton("Buka Folder Log")
+        folder_btn.clicked.connect(self._open_folder)
+        button_layout.addWidget(folder_btn)
+
+        button_layout.addStretch()
+
+        clear_btn = QPushButton("Bersihkan Tampilan")
+        clear_btn.clicked.connect(self._clear)
+        button_layout.addWidget(clear_btn)
+
+        close_btn = QPushButton("Tutup")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+
+        # Ambil record baru setiap detik selama dialog terbuka
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self._poll)
+        self.timer.start()
+
+        self._poll()
+
+    def _poll(self):
+        """Mengambil record yang masuk sejak pembaruan terakhir"""
+        new = recent_records(self._last_seq)
+        if not new:
+            return
+        self._last_seq = new[-1]["seq"]
+        self.records = (self.records + new)[-MAX_ROWS:]
+        self._render()
+
+    def _clear(self):
+        """Mengosongkan tabel; record berikutnya tetap ditampilkan"""
+        self.records = []
+        self._render()
+
+    def _render(self):
+        """Mengisi ulang tabel dari record yang lolos filter"""
+        min_level = logging.getLevelName(self.level_combo.currentText())
+        text_filter = self.filter_input.text().strip().lower()
+        rows = [
+            record for record in self.records
+            if logging.getLevelName(record["level"]) >= min_level
+            and (not text_filter or text_filter in _search_text(record))
+        ]
+
+        # Terbaru di atas
+        rows.reverse()
+        self.table.setRowCount(len(rows))
+        for row, record in enumerate(rows):
+            message = record["message"]
+            if record.get("elapsed_ms") is not None:
+                message += f" [{record['elapsed_ms']} ms]"
+            values = [
+                datetime.fromtimestamp(record["time"]).strftime("%H:%M:%S"),
+                record["level"],
+                record["logger"],
+                record.get("request_id") or "",
+                record.get("session") or "",
+                record.get("provider") or "",
+                message.splitlines()[0] if message else "",
+            ]
+            color = LEVEL_COLORS.get(record["level"])
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if color:
+                    item.setForeground(QColor(color))
+                if column == len(values) - 1:
+                    # Pesan lengkap (termasuk traceback) sebagai tooltip
+                    item.setToolTip("\n".join(filter(None, [message, record.get("exc")])))
+                self.table.setItem(row, column, item)
+
+    def _open_folder(self):
+        """Membuka direktori berkas log di pengelola berkas"""
+        os.makedirs(LOGS_DIR, exist_ok=True)
+        QDesktopServices.openUrl(QUrl.fromLocalFile(LOGS_DIR))
+
+def _search_text(record):
+    """Teks gabungan record yang dicocokkan dengan filter"""
+    return " ".join(
+        str(record.get(key) or "") for key in ("message", "logger", "request_id", "session", "provider", "model")
+    ).lower()
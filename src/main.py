@@ -5,15 +5,56 @@ EduBot - Aplikasi AI Desktop untuk Linux Edulite
 """
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QCoreApplication
+import multiprocessing
 
-# Mengimpor komponen aplikasi
-from auth_manager import AuthManager
-from main_window import MainWindow
+# Hanya modul ringan yang diimpor di sini; PyQt dan SDK provider baru dimuat setelah
+# dipastikan belum ada instance EduBot yang berjalan
+from app_config import load_config
+from single_instance import InstanceServer, notify_running
+from app_logging import setup_logging
+import profiling
+
+# Subperintah klien terminal (lihat cli.py)
+CLI_COMMANDS = ("ask", "explain")
 
 def main():
     """Fungsi utama yang menjalankan aplikasi EduBot"""
+    # Diperlukan agar pool proses validasi skrip berjalan di build PyInstaller
+    multiprocessing.freeze_support()
+    
+    # Klien terminal: kirim pertanyaan ke proses yang berjalan tanpa memuat PyQt
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        from cli import run
+        sys.exit(run(sys.argv[1:]))
+    
+    # Mode instance tunggal: jika EduBot sudah berjalan, cukup minta jendelanya ditampilkan
+    config = load_config()
+    instance = None
+    pending_commands = []
+    if config.get("single_instance", {}).get("enabled", True) and "--new-instance" not in sys.argv:
+        if notify_running():
+            return
+        instance = InstanceServer(pending_commands.append)
+        if not instance.start():
+            # Peluncuran lain lebih dulu membuka socket
+            notify_running()
+            return
+    
+    # Log ke ~/.edubot/logs; dipasang setelah pemeriksaan instance agar peluncuran yang hanya
+    # membangunkan jendela lama tidak membuka berkas log yang sama
+    setup_logging(config.get("logging"))
+    
+    # Profiling opsional (EDUBOT_PROFILE); tidak melakukan apa pun jika tidak diaktifkan
+    profiling.start()
+    
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QCoreApplication
+    
+    # Mengimpor komponen aplikasi
+    from auth_manager import AuthManager
+    from main_window import MainWindow
+    from watchdog import StallWatchdog
+    
     # Mengatur informasi aplikasi
     QCoreApplication.setApplicationName("EduBot")
     QCoreApplication.setOrganizationName("Edulite")
@@ -22,6 +63,10 @@ def main():
     # Membuat instance aplikasi PyQt
     app = QApplication(sys.argv)
     
+    # Watchdog event loop, dimulai sebelum verifikasi API key yang bisa memblokir jendela
+    watchdog = StallWatchdog(config.get("watchdog"), parent=app)
+    watchdog.start()
+    
     # Inisialisasi manajer otentikasi
     auth_manager = AuthManager()
     
@@ -36,8 +81,14 @@ def main():
             window = MainWindow(auth_manager)
             window.show()
         else:
+            if instance:
+                instance.stop()
             sys.exit(1)  # Keluar jika autentikasi gagal
     
+    # Jendela menjadi proses residen yang menerima perintah dari peluncuran berikutnya
+    if instance:
+        window.attach_instance(instance, pending_commands)
+    
     # Menjalankan event loop aplikasi
     sys.exit(app.exec_())
 
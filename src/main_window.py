@@ -3,40 +3,101 @@
 """
 Main Window untuk aplikasi EduBot
 """
+import logging
 import os
+import gc
 import sys
 import json
 import platform
 import subprocess
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QTextEdit, QLineEdit, QPushButton, QTabWidget, 
+    QTextEdit, QTextBrowser, QLineEdit, QPushButton, QTabWidget, 
     QLabel, QMessageBox, QAction, QMenu, QToolBar,
-    QSplitter, QListWidget, QListWidgetItem, QFrame, QComboBox
+    QSplitter, QListWidget, QListWidgetItem, QFrame, QComboBox,
+    QApplication, QSystemTrayIcon
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QTimer
 from PyQt5.QtGui import QIcon, QFont, QTextCursor, QColor
 
-from chatgpt_api import ChatGPTAPI
+from chatgpt_api import ChatGPTAPI, TERMINAL_CONTEXT
+from auth_manager import PROVIDER_NAMES
+from script_validator import extract_script
+from diagnostics import DiagnosticsDialog
+from log_viewer import LogViewerDialog
+from compare_dialog import CompareDialog
+from worker_pool import WorkerPool, INTERACTIVE, BACKGROUND
+from memory_budget import MemoryBudget, TranscriptBuffer
+from single_instance import COMMAND_SHOW
+from cli import CLI_SESSION, serve_request
+from profiling import stage
+from outbox import Offline
+from system_probe import system_info_text
+
+logger = logging.getLogger(__name__)
+
+# Ditampilkan di tab saat pertanyaan disimpan di outbox karena koneksi terputus
+OFFLINE_NOTICE = (
+    "Koneksi ke server AI terputus. Pertanyaan ini disimpan dan akan dikirim otomatis "
+    "saat koneksi kembali; jawabannya akan muncul di tab ini."
+)
+
+# Label tab untuk setiap ID sesi, digunakan pada hasil pencarian riwayat
+SESSION_LABELS = {
+    "chat": "Bantuan Umum",
+    "terminal": "Bantuan Terminal",
+    "code_explanation": "Penjelasan Kode",
+    "script_generation": "Pembuatan Skrip",
+    "system_help": "Info Sistem",
+    CLI_SESSION: "Terminal (edubot ask)",
+}
+
+# Saat memori melewati anggaran, sesi yang tidak aktif selama ini (detik) ikut dipindahkan ke disk
+OVER_BUDGET_IDLE_SECONDS = 60
 
 class MainWindow(QMainWindow):
     """Jendela utama aplikasi EduBot"""
     
+    # Sinyal saat katalog model suatu provider diperbarui (dipancarkan dari thread latar)
+    models_updated = pyqtSignal(str)
+    
+    # Sinyal saat pemakaian token/kuota berubah (dipancarkan dari thread pekerja)
+    usage_updated = pyqtSignal()
+    
+    # Sinyal saat peluncuran lain mengirim perintah ke instance ini (dari thread socket)
+    instance_command = pyqtSignal(str)
+    
+    # Sinyal saat isi outbox berubah dan saat jawaban tertunda diterima (dari thread pekerja/outbox)
+    outbox_changed = pyqtSignal()
+    outbox_delivered = pyqtSignal(object, str)
+    
     def __init__(self, auth_manager):
         """Inisialisasi jendela utama"""
         super().__init__()
         
         self.auth_manager = auth_manager
-        self.api = ChatGPTAPI(auth_manager.get_api_key(), provider=auth_manager.get_provider())
+        self.api = ChatGPTAPI(
+            auth_manager.get_api_key(),
+            provider=auth_manager.get_provider(),
+            config=auth_manager.config,
+            api_keys=auth_manager.get_api_keys()
+        )
+        
+        # Pool pekerja terbatas untuk semua permintaan AI dari antarmuka
+        self.workers = WorkerPool(auth_manager.config.get("workers"), parent=self)
+        
+        # Anggaran memori: sesi tidak aktif dan pesan lama dipindahkan ke disk
+        self.memory = MemoryBudget(auth_manager.config.get("memory"))
+        self.transcripts = {}
+        self._pending_responses = {}
+        
+        # Instance residen dan ikon tray (lihat attach_instance)
+        self.instance = None
+        self.tray = None
+        self._quitting = False
         
         # Sesuaikan judul berdasarkan provider
-        self.provider_name = "OpenAI (ChatGPT)"
-        if auth_manager.get_provider() == "openai":
-            self.provider_name = "OpenAI (ChatGPT)"
-        elif auth_manager.get_provider() == "deepseek":
-            self.provider_name = "DeepSeek AI"
-        else:  # gemini
-            self.provider_name = "Google Gemini"
+        self.provider_name = PROVIDER_NAMES.get(auth_manager.get_provider(), "OpenAI (ChatGPT)")
         self.setWindowTitle(f"EduBot - Asisten AI untuk Linux dengan {self.provider_name}")
         self.setMinimumSize(900, 600)
         
@@ -47,10 +108,32 @@ class MainWindow(QMainWindow):
         
         # Membangun UI
         self._create_menu()
+        self._create_toolbar()
         self._create_ui()
+        self._create_status_bar()
         
         # Menampilkan pesan selamat datang
         self._display_welcome_message()
+        
+        # Siapkan klien, koneksi, dan katalog model semua provider di latar belakang
+        self.models_updated.connect(self._on_models_updated)
+        self.api.catalog.add_listener(self.models_updated.emit)
+        self.usage_updated.connect(self._update_usage_label)
+        self.api.usage.add_listener(self.usage_updated.emit)
+        self.api.warm_up()
+        
+        # Pertanyaan yang tertunda karena koneksi terputus dikirim ulang di latar belakang
+        self.outbox_changed.connect(self._update_outbox_button)
+        self.api.outbox.add_listener(self.outbox_changed.emit)
+        self.outbox_delivered.connect(self._deliver_queued_answer)
+        self.api.outbox.on_delivered = self.outbox_delivered.emit
+        self.api.outbox.start()
+        
+        # Periksa anggaran memori secara berkala
+        self.memory_timer = QTimer(self)
+        self.memory_timer.setInterval(int(self.memory.check_seconds * 1000))
+        self.memory_timer.timeout.connect(self._enforce_memory_budget)
+        self.memory_timer.start()
     
     def _create_menu(self):
         """Membuat menu aplikasi"""
@@ -66,11 +149,23 @@ class MainWindow(QMainWindow):
         logout_action.triggered.connect(self._logout)
         file_menu.addAction(logout_action)
         
+        # Terbitkan cache jawaban untuk komputer lain di lab
+        publish_cache_action = QAction("&Terbitkan Cache Bersama...", self)
+        publish_cache_action.setStatusTip("Simpan jawaban yang sudah ada sebagai cache bersama untuk lab")
+        publish_cache_action.triggered.connect(self._publish_shared_cache)
+        file_menu.addAction(publish_cache_action)
+        
+        # Bandingkan jawaban semua provider
+        compare_action = QAction("&Bandingkan Provider...", self)
+        compare_action.setStatusTip("Kirim pertanyaan yang sama ke semua provider dan bandingkan jawabannya")
+        compare_action.triggered.connect(self._show_compare)
+        file_menu.addAction(compare_action)
+        
         # Keluar
         exit_action = QAction("&Keluar", self)
         exit_action.setShortcut("Ctrl+Q")
         exit_action.setStatusTip("Keluar dari aplikasi")
-        exit_action.triggered.connect(self.close)
+        exit_action.triggered.connect(self._quit)
         file_menu.addAction(exit_action)
         
         # Menu Bantuan
@@ -87,6 +182,210 @@ class MainWindow(QMainWindow):
         help_action.setStatusTip("Cara menggunakan aplikasi")
         help_action.triggered.connect(self._show_help)
         help_menu.addAction(help_action)
+        
+        # Diagnostik
+        diagnostics_action = QAction("&Diagnostik", self)
+        diagnostics_action.setStatusTip("Lihat metrik internal aplikasi (cache, kinerja)")
+        diagnostics_action.triggered.connect(self._show_diagnostics)
+        help_menu.addAction(diagnostics_action)
+        
+        # Log aplikasi
+        log_action = QAction("&Log", self)
+        log_action.setStatusTip("Lihat log aplikasi (kesalahan, permintaan, waktu)")
+        log_action.triggered.connect(self._show_logs)
+        help_menu.addAction(log_action)
+    
+    def _create_toolbar(self):
+        """Membuat toolbar dengan pemilih provider"""
+        toolbar = QToolBar("Provider", self)
+        toolbar.setMovable(False)
+        self.addToolBar(toolbar)
+        
+        toolbar.addWidget(QLabel(" Provider: "))
+        
+        # Pemilih provider; perubahan berlaku untuk pesan berikutnya tanpa restart
+        self.provider_combo = QComboBox()
+        self.provider_combo.setToolTip("Ganti provider AI untuk pesan berikutnya")
+        self._populate_provider_combo()
+        self.provider_combo.currentIndexChanged.connect(self._switch_provider)
+        toolbar.addWidget(self.provider_combo)
+        
+        add_provider_action = QAction("Tambah Provider...", self)
+        add_provider_action.setStatusTip("Simpan API key untuk provider AI lain")
+        add_provider_action.triggered.connect(self._add_provider)
+        toolbar.addAction(add_provider_action)
+        
+        toolbar.addSeparator()
+        toolbar.addWidget(QLabel(" Model: "))
+        
+        # Pemilih model, diisi dari katalog model tersimpan
+        self.model_combo = QComboBox()
+        self.model_combo.setMinimumWidth(180)
+        self._populate_model_combo()
+        self.model_combo.currentIndexChanged.connect(self._change_model)
+        toolbar.addWidget(self.model_combo)
+        
+        refresh_models_action = QAction("Perbarui Model", self)
+        refresh_models_action.setStatusTip("Ambil ulang daftar model dari provider")
+        refresh_models_action.triggered.connect(lambda: self.api.refresh_models(force=True))
+        toolbar.addAction(refresh_models_action)
+        
+        toolbar.addSeparator()
+        
+        # Pemakaian hari ini dan sisa kuota untuk API key aktif
+        self.usage_label = QLabel()
+        self.usage_label.setToolTip("Pemakaian hari ini untuk API key provider aktif")
+        toolbar.addWidget(self.usage_label)
+        self._update_usage_label()
+    
+    def _update_usage_label(self):
+        """Menampilkan pemakaian hari ini dan sisa kuota provider aktif di toolbar"""
+        usage = self.api.usage_remaining()
+        tokens = usage["tokens"]
+        tokens_text = f"{tokens / 1000:.1f}rb" if tokens >= 1000 else str(tokens)
+        text = f" Hari ini: {usage['requests']} permintaan, {tokens_text} token"
+        
+        limits = []
+        if "rpd_left" in usage:
+            limits.append(f"sisa {usage['rpd_left']} hari ini")
+        if "rpm_left" in usage:
+            limits.append(f"{usage['rpm_left']}/menit")
+        if "blocked_s" in usage:
+            limits.append(f"ditahan {usage['blocked_s']} dtk")
+        if limits:
+            text += " (" + ", ".join(limits) + ")"
+        self.usage_label.setText(text + " ")
+    
+    def _create_status_bar(self):
+        """Membuat indikator antrean offline di status bar"""
+        self.outbox_button = QPushButton()
+        self.outbox_button.setFlat(True)
+        self.outbox_button.clicked.connect(self.api.outbox.retry_now)
+        self.statusBar().addPermanentWidget(self.outbox_button)
+        self._update_outbox_button()
+    
+    def _update_outbox_button(self):
+        """Menampilkan jumlah pertanyaan yang menunggu koneksi di status bar"""
+        pending = self.api.outbox.pending()
+        self.outbox_button.setVisible(bool(pending))
+        if not pending:
+            return
+        self.outbox_button.setText(f"Menunggu koneksi: {len(pending)} pertanyaan")
+        questions = "\n".join(
+            f"- {SESSION_LABELS.get(item.session_id, item.session_id)}: {item.question[:60]}" for item in pending[:5]
+        )
+        self.outbox_button.setToolTip(f"{questions}\n\nKlik untuk mencoba mengirim sekarang")
+    
+    def _deliver_queued_answer(self, item, response):
+        """Menampilkan jawaban untuk pertanyaan dari outbox di tab asalnya"""
+        label = SESSION_LABELS.get(item.session_id, item.session_id)
+        if item.session_id == "chat":
+            self._append_bot_message(self.chat_history, f"(Jawaban tertunda untuk: {item.question})\n\n{response}")
+        elif item.session_id == "terminal":
+            self._append_bot_message(self.terminal_history, f"(Jawaban tertunda untuk: {item.question})\n\n{response}")
+        elif item.session_id == "code_explanation":
+            self._format_code_explanation(response)
+        elif item.session_id == "script_generation":
+            self._process_script_result(response)
+        elif item.session_id == "system_help":
+            self._format_system_response(item.question, response)
+        else:
+            return
+        
+        self.statusBar().showMessage(f"Jawaban tertunda untuk tab {label} sudah diterima", 5000)
+        if self.tray is not None and not self.isVisible():
+            self.tray.showMessage("EduBot", f"Jawaban tertunda untuk tab {label} sudah diterima")
+    
+    def _populate_model_combo(self):
+        """Mengisi pemilih model dari katalog provider aktif"""
+        current = self.api.api.current_model()
+        models = self.api.models()
+        
+        self.model_combo.blockSignals(True)
+        self.model_combo.clear()
+        for model in models:
+            self.model_combo.addItem(model.name, model.name)
+            if model.context_limit:
+                self.model_combo.setItemData(
+                    self.model_combo.count() - 1,
+                    f"Batas konteks: {model.context_limit:,} token",
+                    Qt.ToolTipRole
+                )
+        
+        # Model aktif tetap ditampilkan walaupun tidak ada di katalog
+        if current and self.model_combo.findData(current) < 0:
+            self.model_combo.insertItem(0, current, current)
+        self.model_combo.setCurrentIndex(max(0, self.model_combo.findData(current)))
+        self.model_combo.blockSignals(False)
+    
+    def _on_models_updated(self, provider):
+        """Memperbarui pemilih model setelah katalog provider aktif diperbarui"""
+        if provider == self.api.provider:
+            self._populate_model_combo()
+    
+    def _change_model(self, index):
+        """Mengganti model provider aktif dari pemilih di toolbar"""
+        model_name = self.model_combo.itemData(index)
+        if not model_name or model_name == self.api.api.current_model():
+            return
+        
+        if self.api.change_model(model_name):
+            # Simpan pilihan model per provider di config.json
+            self.auth_manager.save_config()
+            self.statusBar().showMessage(f"Model diganti ke {model_name}", 3000)
+        else:
+            QMessageBox.warning(self, "Gagal Mengganti Model", f"Model {model_name} tidak dapat digunakan.")
+            self._populate_model_combo()
+    
+    def _populate_provider_combo(self):
+        """Mengisi pemilih provider dengan provider yang memiliki API key"""
+        self.provider_combo.blockSignals(True)
+        self.provider_combo.clear()
+        for provider in self.api.available_providers():
+            self.provider_combo.addItem(PROVIDER_NAMES[provider], provider)
+        self.provider_combo.setCurrentIndex(self.provider_combo.findData(self.api.provider))
+        self.provider_combo.blockSignals(False)
+    
+    def _switch_provider(self, index):
+        """Mengganti provider aktif dari pemilih di toolbar"""
+        provider = self.provider_combo.itemData(index)
+        if not provider or provider == self.api.provider:
+            return
+        
+        try:
+            self.api.switch_provider(provider)
+        except Exception as e:
+            QMessageBox.warning(self, "Gagal Mengganti Provider", f"Provider tidak dapat digunakan: {str(e)}")
+            self._populate_provider_combo()
+            return
+        
+        self.auth_manager.set_provider(provider, self.api.api_key)
+        self.provider_name = PROVIDER_NAMES[provider]
+        self.setWindowTitle(f"EduBot - Asisten AI untuk Linux dengan {self.provider_name}")
+        self.provider_label.setText("AI Provider: " + self.provider_name)
+        self._populate_model_combo()
+        self._update_usage_label()
+        self.api.refresh_models()
+        self.statusBar().showMessage(f"Provider diganti ke {self.provider_name}", 3000)
+    
+    def _add_provider(self):
+        """Menambahkan API key provider lain lalu langsung menyiapkan kliennya"""
+        provider = self.auth_manager.add_provider(self)
+        if not provider:
+            return
+        
+        api_key = self.auth_manager.get_api_keys().get(provider)
+        if not api_key:
+            return
+        
+        self.api.add_provider(provider, api_key)
+        self.api.warm_up([provider])
+        self._populate_provider_combo()
+        QMessageBox.information(
+            self,
+            "Provider Ditambahkan",
+            f"{PROVIDER_NAMES[provider]} siap digunakan. Pilih di toolbar untuk beralih."
+        )
     
     def _create_ui(self):
         """Membuat antarmuka pengguna utama"""
@@ -97,11 +396,38 @@ class MainWindow(QMainWindow):
         # Layout utama
         main_layout = QVBoxLayout(central_widget)
         
+        # Baris atas: informasi provider dan kotak pencarian riwayat
+        header_layout = QHBoxLayout()
+        
         # Tampilkan informasi tentang provider
         provider_info = "AI Provider: " + self.provider_name
-        provider_label = QLabel(provider_info)
-        provider_label.setStyleSheet("font-weight: bold; color: #4285F4;")
-        main_layout.addWidget(provider_label)
+        self.provider_label = QLabel(provider_info)
+        self.provider_label.setStyleSheet("font-weight: bold; color: #4285F4;")
+        header_layout.addWidget(self.provider_label)
+        header_layout.addStretch()
+        
+        # Kotak pencarian percakapan lama dari semua tab
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Cari percakapan sebelumnya...")
+        self.search_input.setMaximumWidth(300)
+        self.search_input.textChanged.connect(self._schedule_history_search)
+        header_layout.addWidget(self.search_input)
+        
+        main_layout.addLayout(header_layout)
+        
+        # Daftar hasil pencarian, hanya tampil saat ada kata kunci
+        self.search_results = QListWidget()
+        self.search_results.setMaximumHeight(180)
+        self.search_results.setVisible(False)
+        self.search_results.itemActivated.connect(self._show_search_result)
+        self.search_results.itemClicked.connect(self._show_search_result)
+        main_layout.addWidget(self.search_results)
+        
+        # Timer debounce agar pencarian tidak dijalankan di setiap ketukan tombol
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self._run_history_search)
         
         # Tab widget untuk berbagai fitur
         self.tab_widget = QTabWidget()
@@ -155,6 +481,7 @@ class MainWindow(QMainWindow):
                 font-family: 'Segoe UI', Arial, sans-serif;
             }
         """)
+        layout.addWidget(self._create_transcript("chat", self.chat_history))
         layout.addWidget(self.chat_history)
         
         # Area input dan tombol
@@ -193,6 +520,7 @@ class MainWindow(QMainWindow):
             .bot-msg { background-color: #E3F2FD; padding: 10px; border-radius: 10px; margin: 8px 0; border-left: 4px solid #2196F3; }
             pre { background-color: #272822; color: #F8F8F2; padding: 8px; border-radius: 4px; font-family: 'Consolas', 'Courier New', monospace; }
         """)
+        layout.addWidget(self._create_transcript("terminal", self.terminal_history))
         layout.addWidget(self.terminal_history)
         
         # Area input dan tombol
@@ -202,8 +530,15 @@ class MainWindow(QMainWindow):
         self.terminal_input = QLineEdit()
         self.terminal_input.setPlaceholderText("Tanyakan tentang perintah terminal Linux...")
         self.terminal_input.returnPressed.connect(self._send_terminal_question)
+        self.terminal_input.textEdited.connect(self._schedule_terminal_prefetch)
         input_layout.addWidget(self.terminal_input)
         
+        # Timer debounce untuk prefetch spekulatif saat perintah sudah stabil
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(self.api.prefetcher.debounce_ms)
+        self.prefetch_timer.timeout.connect(self._start_terminal_prefetch)
+        
         # Tombol kirim
         send_btn = QPushButton("Tanya")
         send_btn.clicked.connect(self._send_terminal_question)
@@ -228,9 +563,11 @@ class MainWindow(QMainWindow):
         self.code_input.setPlaceholderText("Tempel kode yang ingin dijelaskan di sini...")
         splitter.addWidget(self.code_input)
         
-        # Area penjelasan kode
-        self.code_explanation = QTextEdit()
+        # Area penjelasan kode; tautan "Jelaskan lebih lanjut" ditangani sendiri (lihat _toggle_code_detail)
+        self.code_explanation = QTextBrowser()
         self.code_explanation.setReadOnly(True)
+        self.code_explanation.setOpenLinks(False)
+        self.code_explanation.anchorClicked.connect(self._toggle_code_detail)
         self.code_explanation.setPlaceholderText("Penjelasan akan muncul di sini...")
         self.code_explanation.setAcceptRichText(True)
         self.code_explanation.document().setDefaultStyleSheet("""
@@ -250,6 +587,9 @@ class MainWindow(QMainWindow):
         """)
         splitter.addWidget(self.code_explanation)
         
+        # Keadaan mode penjelasan dua tingkat untuk kode yang terakhir dijelaskan
+        self.code_detail = None
+        
         # Mengatur ukuran relatif
         splitter.setSizes([400, 400])
         layout.addWidget(splitter)
@@ -310,6 +650,21 @@ class MainWindow(QMainWindow):
         """)
         result_layout.addWidget(self.script_result)
         
+        # Kandidat alternatif dan hasil validasi sintaks (mode kandidat)
+        alternatives_layout = QHBoxLayout()
+        
+        self.script_alternatives = QComboBox()
+        self.script_alternatives.currentIndexChanged.connect(self._show_script_candidate)
+        alternatives_layout.addWidget(self.script_alternatives, 1)
+        
+        self.script_validation_label = QLabel()
+        self.script_validation_label.setWordWrap(True)
+        alternatives_layout.addWidget(self.script_validation_label, 2)
+        
+        result_layout.addLayout(alternatives_layout)
+        self.script_candidates = []
+        self._set_script_candidates_visible(False)
+        
         splitter.addWidget(result_widget)
         
         # Mengatur ukuran relatif
@@ -326,6 +681,16 @@ class MainWindow(QMainWindow):
         self.script_type_combo.addItems(["bash", "python", "powershell"])
         button_layout.addWidget(self.script_type_combo)
         
+        # Jumlah kandidat; lebih dari satu mengaktifkan validasi dan alternatif
+        candidates_label = QLabel("Kandidat:")
+        button_layout.addWidget(candidates_label)
+        
+        self.script_candidates_combo = QComboBox()
+        self.script_candidates_combo.addItems(["1", "2", "3", "4", "5"])
+        self.script_candidates_combo.setCurrentText(str(self.auth_manager.config.get("script_candidates", 1)))
+        self.script_candidates_combo.setToolTip("Minta beberapa skrip sekaligus dan tampilkan yang lolos pemeriksaan sintaks")
+        button_layout.addWidget(self.script_candidates_combo)
+        
         button_layout.addStretch()
         
         generate_btn = QPushButton("Buat Skrip")
@@ -411,11 +776,13 @@ class MainWindow(QMainWindow):
         # Gunakan setHtml alih-alih append untuk reset konten sepenuhnya
         self.chat_history.clear()
         self.chat_history.document().setHtml(welcome_html)
+        self.transcripts[self.chat_history][0].clear()
+        self._track_message(self.chat_history, welcome_html)
     
     def _send_chat_message(self):
         """Mengirim pesan dari tab bantuan umum ke ChatGPT API"""
         message = self.chat_input.text().strip()
-        if not message:
+        if not message or self._question_pending(message, "chat"):
             return
         
         # Tampilkan pesan pengguna dengan jelas
@@ -425,7 +792,7 @@ class MainWindow(QMainWindow):
         self.chat_input.clear()
         
         # Kirim ke API ChatGPT dan tampilkan respons
-        self._get_ai_response(self.chat_history, message)
+        self._get_ai_response(self.chat_history, message, session_id="chat")
     
     def _send_terminal_question(self):
         """Mengirim pertanyaan terminal ke ChatGPT API"""
@@ -433,9 +800,13 @@ class MainWindow(QMainWindow):
         if not question:
             return
         
+        # Prefetch yang belum selesai tidak perlu ditunggu debounce lagi
+        self.prefetch_timer.stop()
+        
         # Tambahkan konteks Linux ke pertanyaan
-        context = "Berikan bantuan untuk perintah terminal Linux. Jawaban yang berisi contoh perintah harus diberikan dalam bentuk kode (menggunakan tag <pre> untuk format). "
-        full_question = context + question
+        full_question = self._terminal_prompt(question)
+        if self._question_pending(full_question, "terminal"):
+            return
         
         # Tampilkan pertanyaan pengguna
         self._append_user_message(self.terminal_history, question)
@@ -444,7 +815,25 @@ class MainWindow(QMainWindow):
         self.terminal_input.clear()
         
         # Kirim ke API ChatGPT dan tampilkan respons
-        self._get_ai_response(self.terminal_history, full_question)
+        self._get_ai_response(self.terminal_history, full_question, session_id="terminal", index_text=question)
+    
+    def _terminal_prompt(self, question):
+        """Menambahkan konteks Linux ke pertanyaan terminal"""
+        return TERMINAL_CONTEXT + question
+    
+    def _schedule_terminal_prefetch(self, text):
+        """Menjadwalkan prefetch setelah input terminal tidak berubah selama interval debounce"""
+        if not text.strip():
+            self.prefetch_timer.stop()
+            self.api.cancel_speculation()
+            return
+        self.prefetch_timer.start()
+    
+    def _start_terminal_prefetch(self):
+        """Memulai prefetch spekulatif untuk perintah yang sedang diketik"""
+        question = self.terminal_input.text().strip()
+        if question:
+            self.api.speculate(self._terminal_prompt(question), session_id="terminal", index_text=question)
     
     def _explain_code(self):
         """Meminta penjelasan kode dari ChatGPT API"""
@@ -470,16 +859,205 @@ Berikan penjelasan terstruktur dengan menggunakan format Markdown:
 7. Jangan gunakan format bold (**) dalam penjelasan, gunakan teks biasa
 """
         
+        self.code_detail = None
+        
+        # Gambaran umum singkat lebih dulu; rincian setiap bagian diminta saat dibuka
+        if self.api.explains_lazily():
+            self._explain_code_overview(code)
+            return
+        
+        # Kode besar atau berisi beberapa fungsi/kelas dijelaskan per bagian; saat kode diedit
+        # dan dijelaskan ulang, hanya bagian yang berubah yang diminta ke AI
+        if self.api.explains_by_section(code):
+            self._explain_code_sections(code)
+            return
+        
         # Tampilkan pesan loading
         self.code_explanation.setHtml("<p>Mendapatkan penjelasan...</p>")
         
-        # Mulai thread untuk mendapatkan respons dari API
-        self.api_thread = ChatGPTThread(self.api, question)
-        self.api_thread.response_received.connect(self._format_code_explanation)
-        self.api_thread.start()
+        # Jadwalkan permintaan di pool pekerja
+        self._request_response(question, self._format_code_explanation, session_id="code_explanation", index_text=code)
+    
+    def _explain_code_sections(self, code):
+        """Menjelaskan kode per bagian dan menampilkan progres per bagian"""
+        self.code_chunk_parts = {}
+        self.code_chunk_reused = 0
+        self.code_explanation.setHtml("<p>Memecah kode menjadi beberapa bagian...</p>")
+        
+        # Kode besar memakai prioritas latar agar pertanyaan di tab lain tidak menunggu semua bagian
+        api = self.api
+        self._submit_task(
+            lambda task: api.explain_code_chunked(
+                code,
+                on_progress=lambda index, total, chunk, text, reused: task.report(index, total, text, reused)
+            ),
+            self._format_code_explanation,
+            on_progress=self._show_code_chunk_progress,
+            priority=BACKGROUND if api.is_large_code(code) else INTERACTIVE,
+            key=("explain_sections", code)
+        )
+    
+    def _show_code_chunk_progress(self, index, total, explanation, reused=False):
+        """Menampilkan penjelasan bagian yang sudah selesai sambil menunggu bagian lain"""
+        self.code_chunk_parts[index] = explanation
+        if reused:
+            self.code_chunk_reused += 1
+        
+        sections = "".join(
+            f"<h3>Bagian {i + 1}</h3>{self._code_explanation_body(self.code_chunk_parts[i])}"
+            for i in sorted(self.code_chunk_parts)
+        )
+        done = len(self.code_chunk_parts)
+        status = (
+            f"{done} dari {total} bagian selesai dijelaskan..." if done < total
+            else "Semua bagian selesai, menyusun penjelasan akhir..."
+        )
+        if self.code_chunk_reused:
+            status += f" ({self.code_chunk_reused} bagian tidak berubah, memakai penjelasan sebelumnya)"
+        self.code_explanation.setHtml(f"<p><i>{status}</i></p>{sections}")
+    
+    def _explain_code_overview(self, code):
+        """Meminta gambaran umum singkat lalu menampilkan daftar bagian yang dapat dibuka"""
+        api = self.api
+        state = {
+            "code": code,
+            "overview": None,
+            "targets": api.code_detail_targets(code),
+            "details": {},
+            "errors": {},
+            "open": set(),
+        }
+        self.code_detail = state
+        self._render_code_details()
+        
+        self._submit_task(
+            lambda task: api.explain_code_overview(code),
+            lambda text: self._show_code_overview(state, text),
+            on_error=lambda error: self._show_code_overview(state, self._request_error_text(error)),
+            key=("code_overview", code)
+        )
+    
+    def _show_code_overview(self, state, text):
+        """Menampilkan gambaran umum jika kode yang sama masih ditampilkan"""
+        if state is not self.code_detail:
+            return
+        state["overview"] = text
+        self._render_code_details()
+    
+    def _toggle_code_detail(self, url):
+        """Membuka atau menutup rincian satu bagian; rincian diminta saat pertama kali dibuka"""
+        state = self.code_detail
+        if state is None or url.scheme() != "detail":
+            return
+        index = int(url.path())
+        
+        if index in state["open"] and index not in state["errors"]:
+            state["open"].discard(index)
+        else:
+            state["open"].add(index)
+            state["errors"].pop(index, None)
+            if index not in state["details"]:
+                api = self.api
+                code = state["code"]
+                target = state["targets"][index]
+                self._submit_task(
+                    lambda task: api.explain_code_detail(code, target),
+                    lambda text: self._show_code_detail(state, index, text),
+                    on_error=lambda error: self._show_code_detail(state, index, None, error),
+                    key=("code_detail", code, index)
+                )
+        self._render_code_details()
+    
+    def _show_code_detail(self, state, index, text, error=None):
+        """Menyimpan rincian satu bagian (atau kesalahannya) lalu menggambar ulang"""
+        if error is not None:
+            state["errors"][index] = self._request_error_text(error)
+        else:
+            state["details"][index] = text
+        if state is self.code_detail:
+            self._render_code_details()
+    
+    @stage("render.code_explanation")
+    def _render_code_details(self):
+        """Menampilkan gambaran umum dan tautan "Jelaskan lebih lanjut" untuk setiap bagian"""
+        state = self.code_detail
+        parts = []
+        if state["overview"] is None:
+            parts.append("<p><i>Mendapatkan gambaran umum...</i></p>")
+        else:
+            parts.append(self._code_explanation_body(state["overview"]))
+        
+        parts.append("<h3>Rincian per bagian</h3>")
+        for index, target in enumerate(state["targets"]):
+            if index in state["errors"]:
+                link = "Coba lagi"
+            elif index in state["open"]:
+                link = "Sembunyikan"
+            else:
+                link = "Jelaskan lebih lanjut"
+            parts.append(f'<p>{self._code_target_label(target)} &nbsp;<a href="detail:{index}">{link}</a></p>')
+            
+            if index in state["errors"]:
+                parts.append(f'<p style="color: #D32F2F;">{state["errors"][index]}</p>')
+            elif index in state["open"]:
+                detail = state["details"].get(index)
+                if detail is None:
+                    parts.append("<p><i>Memuat penjelasan...</i></p>")
+                else:
+                    parts.append(f'<div style="margin-left: 15px;">{self._code_explanation_body(detail)}</div>')
+        
+        # Posisi gulir dipertahankan agar bagian yang baru dibuka tetap terlihat
+        scroll = self.code_explanation.verticalScrollBar()
+        position = scroll.value()
+        self.code_explanation.setHtml(f'''
+        <html>
+        <body style="font-family: 'Segoe UI', Arial, sans-serif; font-size: 9pt; line-height: 1.3; color: #333333; font-weight: normal;">
+            <div style="padding: 10px;">
+                {"".join(parts)}
+            </div>
+        </body>
+        </html>
+        ''')
+        scroll.setValue(position)
+    
+    def _code_target_label(self, target):
+        """Label satu bagian: nama fungsi/kelas, atau nomor dan isi baris"""
+        if target.start_line == target.end_line:
+            lines = f"Baris {target.start_line}"
+        else:
+            lines = f"Baris {target.start_line}-{target.end_line}"
+        if target.names:
+            names = ", ".join(f"<code>{name}</code>" for name in target.names)
+            return f"<b>{names}</b> ({lines.lower()})"
+        first = target.text.strip().splitlines()[0][:80]
+        first = first.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return f"<b>{lines}</b>: <code>{first}</code>"
     
+    @stage("render.code_explanation")
     def _format_code_explanation(self, response):
         """Format dan tampilkan penjelasan kode dengan cara yang sangat sederhana"""
+        # Penjelasan lengkap menggantikan tampilan dua tingkat; rincian yang masih berjalan diabaikan
+        self.code_detail = None
+        
+        text = self._code_explanation_body(response)
+        
+        # Buat html sangat sederhana
+        html = f'''
+        <html>
+        <body style="font-family: 'Segoe UI', Arial, sans-serif; font-size: 9pt; line-height: 1.3; color: #333333; font-weight: normal;">
+            <div style="padding: 10px;">
+                {text}
+            </div>
+        </body>
+        </html>
+        '''
+        
+        # Tampilkan hasil
+        self.code_explanation.setHtml(html)
+    
+    @stage("markdown.code_explanation")
+    def _code_explanation_body(self, response):
+        """Mengubah penjelasan kode (Markdown sederhana) menjadi potongan HTML"""
         # Gunakan pendekatan yang lebih langsung dan sederhana
         # Hapus format markdown yang kompleks
         
@@ -514,19 +1092,7 @@ Berikan penjelasan terstruktur dengan menggunakan format Markdown:
         text = text.replace('**', '')  # Hapus semua bold markdown
         text = text.replace('*', '')   # Hapus semua italic markdown
         
-        # Buat html sangat sederhana
-        html = f'''
-        <html>
-        <body style="font-family: 'Segoe UI', Arial, sans-serif; font-size: 9pt; line-height: 1.3; color: #333333; font-weight: normal;">
-            <div style="padding: 10px;">
-                {text}
-            </div>
-        </body>
-        </html>
-        '''
-        
-        # Tampilkan hasil
-        self.code_explanation.setHtml(html)
+        return text
     
     def _generate_script(self):
         """Membuat skrip dari deskripsi menggunakan ChatGPT API"""
@@ -553,32 +1119,86 @@ Skrip harus:
 Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelasan tambahan.
 """
         
+        self.script_candidates = []
+        self._set_script_candidates_visible(False)
+        
+        # Mode kandidat: beberapa skrip diminta bersamaan lalu divalidasi secara lokal
+        candidate_count = int(self.script_candidates_combo.currentText())
+        if candidate_count > 1:
+            self.script_result.setHtml(f"<p>Membuat dan memvalidasi {candidate_count} kandidat skrip...</p>")
+            api = self.api
+            self._submit_task(
+                lambda task: api.generate_script_candidates(description, script_type, candidate_count),
+                self._show_script_candidates,
+                on_error=lambda error: self._process_script_result(f"Error: {str(error)}"),
+                key=("script_candidates", description, script_type, candidate_count)
+            )
+            return
+        
         # Tampilkan pesan loading
         self.script_result.setHtml("<p>Membuat skrip...</p>")
         
-        # Mulai thread untuk mendapatkan respons dari API
-        self.api_thread = ChatGPTThread(self.api, prompt)
-        self.api_thread.response_received.connect(self._process_script_result)
-        self.api_thread.start()
+        # Jadwalkan permintaan di pool pekerja
+        self._request_response(prompt, self._process_script_result, session_id="script_generation", index_text=description)
     
     def _process_script_result(self, response):
         """Memproses hasil pembuatan skrip dari API dengan pendekatan yang sangat sederhana"""
+        # Ambil blok kode pertama dari respons
+        self._show_script(extract_script(response))
+    
+    def _show_script_candidates(self, results):
+        """Menampilkan kandidat valid pertama dan menyimpan kandidat lain sebagai alternatif"""
+        self.script_candidates = results
+        
+        self.script_alternatives.blockSignals(True)
+        self.script_alternatives.clear()
+        for number, result in enumerate(results, start=1):
+            if not result.valid:
+                status = "sintaks error"
+            elif result.checked:
+                status = "valid"
+            else:
+                status = "tidak diperiksa"
+            self.script_alternatives.addItem(f"Kandidat {number} ({status})")
+        self.script_alternatives.blockSignals(False)
+        
+        self._set_script_candidates_visible(True)
+        self._show_script_candidate(0)
+    
+    def _show_script_candidate(self, index):
+        """Menampilkan kandidat skrip yang dipilih beserta pesan validasinya"""
+        if not 0 <= index < len(self.script_candidates):
+            return
+        
+        result = self.script_candidates[index]
+        if not result.valid:
+            label = "Semua kandidat gagal pemeriksaan sintaks:" if index == 0 else "Gagal pemeriksaan sintaks:"
+            color = "#C62828"
+        elif result.checked:
+            label = "Lolos pemeriksaan sintaks lokal."
+            color = "#2E7D32"
+        else:
+            label = "Sintaks belum diperiksa."
+            color = "#757575"
+        
+        details = "<br>".join(
+            message.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            for message in result.messages[:5]
+        )
+        self.script_validation_label.setText(f"<span style='color: {color};'>{label}</span><br><small>{details}</small>")
+        self.script_alternatives.setCurrentIndex(index)
+        self._show_script(result.script)
+    
+    def _set_script_candidates_visible(self, visible):
+        """Menampilkan atau menyembunyikan pilihan kandidat skrip"""
+        self.script_alternatives.setVisible(visible)
+        self.script_validation_label.setVisible(visible)
+    
+    def _show_script(self, script):
+        """Menampilkan skrip di area hasil"""
         try:
-            # Coba ekstrak kode dari respons
-            script = response.strip()
-            
-            # Cari kode dalam tanda ```
-            import re
-            code_blocks = re.findall(r'```(?:bash|sh|python|powershell)?\n(.*?)```', response, re.DOTALL)
-            
-            if code_blocks:
-                # Ambil blok kode pertama
-                script = code_blocks[0].strip()
-            
             # Format HTML langsung dan sederhana tanpa menggunakan regex kompleks
             # yang dapat menyebabkan masalah dalam rendering
-            script_type = self.script_type_combo.currentText()
-            
             # Escape karakter khusus HTML
             script_escaped = script.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
             
@@ -610,7 +1230,7 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
             
         except Exception as e:
             # Jika terjadi kesalahan formatting, tampilkan dengan cara sederhana
-            print(f"Error saat memformat skrip: {e}")
+            logger.error("Error saat memformat skrip: %s", e)
             self.script_result.setPlainText(script)
     
     def _save_script(self):
@@ -680,11 +1300,15 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         # Kosongkan input
         self.system_input.clear()
         
-        # Mulai thread untuk mendapatkan respons dari API
-        self.api_thread = ChatGPTThread(self.api, full_question)
-        self.api_thread.response_received.connect(lambda response: self._format_system_response(question, response))
-        self.api_thread.start()
+        # Jadwalkan permintaan di pool pekerja
+        self._request_response(
+            full_question,
+            lambda response: self._format_system_response(question, response),
+            session_id="system_help",
+            index_text=question
+        )
     
+    @stage("markdown.system_response")
     def _format_system_response(self, question, response):
         """Format respons sistem untuk tampilan yang lebih baik"""
         # Membersihkan output markdown dan mengubahnya menjadi HTML yang rapi
@@ -869,49 +1493,9 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
     
     def _get_system_info_text(self):
         """Mendapatkan informasi sistem dalam format teks biasa"""
-        info = []
-        
-        # Informasi dasar
-        info.append(f"Sistem Operasi: {platform.system()} {platform.release()}")
-        info.append(f"Versi OS: {platform.version()}")
-        info.append(f"Arsitektur: {platform.machine()}")
-        info.append(f"Nama Host: {platform.node()}")
-        
-        # Untuk informasi lebih lanjut yang specific untuk Linux
-        if platform.system() == "Linux":
-            try:
-                # Kernel version
-                kernel = subprocess.check_output("uname -r", shell=True).decode().strip()
-                info.append(f"Versi Kernel: {kernel}")
-                
-                # Distribution info if available
-                if os.path.exists("/etc/os-release"):
-                    with open("/etc/os-release", "r") as f:
-                        for line in f:
-                            if line.startswith("PRETTY_NAME="):
-                                distro = line.split("=")[1].strip().strip('"')
-                                info.append(f"Distribusi: {distro}")
-                                break
-                
-                # CPU info
-                cpu_info = subprocess.check_output("cat /proc/cpuinfo | grep 'model name' | head -n 1", shell=True).decode()
-                if cpu_info:
-                    cpu_model = cpu_info.split(":")[1].strip()
-                    info.append(f"CPU: {cpu_model}")
-                
-                # Memory info
-                mem_info = subprocess.check_output("free -h | grep Mem", shell=True).decode().strip()
-                if mem_info:
-                    mem_parts = mem_info.split()
-                    if len(mem_parts) >= 2:
-                        total_mem = mem_parts[1]
-                        info.append(f"Total RAM: {total_mem}")
-            except:
-                # Jika ada error, lewati
-                pass
-        
-        return "\n".join(info)
+        return system_info_text()
     
+    @stage("render.append")
     def _append_user_message(self, text_widget, message):
         """Menambahkan pesan pengguna ke widget teks"""
         # Pastikan pesan terlihat jelas dengan format yang mencolok
@@ -925,7 +1509,9 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         text_widget.append(html)
         # Pastikan scroll ke posisi terbawah
         text_widget.verticalScrollBar().setValue(text_widget.verticalScrollBar().maximum())
+        self._track_message(text_widget, html)
     
+    @stage("render.append")
     def _append_bot_message(self, text_widget, message):
         """Menambahkan pesan bot ke widget teks"""
         # Tentukan nama bot berdasarkan provider
@@ -935,6 +1521,9 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         elif self.auth_manager.get_provider() == "deepseek":
             bot_name = "DeepBot"
             color = "#7E57C2"  # Ungu untuk DeepSeek
+        elif self.auth_manager.get_provider() == "compatible":
+            bot_name = "EduBot (Lokal)"
+            color = "#FF7043"  # Oranye untuk server OpenAI-kompatibel
         else:  # gemini
             bot_name = "GeminiBot"
             color = "#26A69A"  # Teal untuk Gemini
@@ -950,14 +1539,101 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         text_widget.append(html)
         # Pastikan scroll ke posisi terbawah
         text_widget.verticalScrollBar().setValue(text_widget.verticalScrollBar().maximum())
+        self._track_message(text_widget, html)
+    
+    def _create_transcript(self, name, text_widget):
+        """
+        Mendaftarkan widget transkrip yang panjangnya dibatasi anggaran memori
+        
+        Returns:
+            QPushButton: Tombol (tersembunyi) untuk memuat pesan lama dari disk
+        """
+        buffer = TranscriptBuffer(name, self.memory.max_rendered)
+        button = QPushButton()
+        button.setVisible(False)
+        button.clicked.connect(lambda: self._load_older_messages(text_widget))
+        self.transcripts[text_widget] = (buffer, button)
+        return button
+    
+    def _track_message(self, text_widget, html):
+        """Mencatat pesan yang ditampilkan dan memangkas transkrip jika terlalu panjang"""
+        entry = self.transcripts.get(text_widget)
+        if entry is None:
+            return
+        buffer, _ = entry
+        # Jangan render ulang selagi indikator loading masih ditampilkan
+        if buffer.add(html) and not self._pending_responses.get(text_widget):
+            self._trim_transcript(text_widget)
+    
+    @stage("history.trim")
+    def _trim_transcript(self, text_widget):
+        """Memindahkan pesan tertua ke disk dan merender ulang transkrip"""
+        buffer, _ = self.transcripts[text_widget]
+        if buffer.trim():
+            self._render_transcript(text_widget)
+            text_widget.verticalScrollBar().setValue(text_widget.verticalScrollBar().maximum())
     
-    def _get_ai_response(self, text_widget, message):
+    def _load_older_messages(self, text_widget):
+        """Memuat kembali pesan lama dari disk ke awal transkrip"""
+        buffer, _ = self.transcripts[text_widget]
+        if buffer.restore():
+            self._render_transcript(text_widget)
+            text_widget.verticalScrollBar().setValue(0)
+    
+    @stage("render.set_html")
+    def _render_transcript(self, text_widget):
+        """Menampilkan ulang pesan transkrip yang ada di memori"""
+        buffer, button = self.transcripts[text_widget]
+        text_widget.setUpdatesEnabled(False)
+        text_widget.setHtml(buffer.render())
+        text_widget.setUpdatesEnabled(True)
+        
+        button.setText(f"Tampilkan pesan sebelumnya ({buffer.spilled} tersimpan)")
+        button.setVisible(buffer.spilled > 0)
+    
+    def _enforce_memory_budget(self):
+        """Memindahkan sesi tidak aktif ke disk dan membebaskan memori jika melewati anggaran"""
+        evicted = self.api.evict_idle_sessions(self.memory.idle_seconds)
+        
+        if self.memory.over_budget():
+            evicted += self.api.evict_idle_sessions(OVER_BUDGET_IDLE_SECONDS)
+            for text_widget in self.transcripts:
+                if not self._pending_responses.get(text_widget):
+                    self._trim_transcript(text_widget)
+            gc.collect()
+        
+        if evicted:
+            self.statusBar().showMessage(f"{evicted} sesi tidak aktif dipindahkan ke disk", 3000)
+    
+    def _get_ai_response(self, text_widget, message, session_id="default", index_text=None):
         """Mendapatkan respons dari API ChatGPT dan menampilkannya"""
+        use_cache = True
+        
+        # Tawarkan jawaban lama jika pertanyaan yang hampir sama pernah dijawab
+        if self.auth_manager.config.get("suggest_previous_answers", True):
+            suggestion = self.api.suggest_answer(index_text or message, session_id=session_id)
+            if suggestion:
+                reply = QMessageBox.question(
+                    self,
+                    "Jawaban Serupa Ditemukan",
+                    f"Pertanyaan serupa pernah dijawab sebelumnya:\n\n\"{suggestion.question}\"\n\n"
+                    "Tampilkan jawaban tersebut tanpa menghubungi AI?",
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.Yes
+                )
+                if reply == QMessageBox.Yes:
+                    self._append_bot_message(text_widget, suggestion.answer)
+                    return
+                # Pengguna meminta jawaban baru, jangan gunakan cache
+                use_cache = False
+        
         # Tambahkan indikator loading
         if self.auth_manager.get_provider() == "openai":
             bot_name = "EduBot (OpenAI)"
         elif self.auth_manager.get_provider() == "deepseek":
             bot_name = "DeepBot"
+        elif self.auth_manager.get_provider() == "compatible":
+            bot_name = "EduBot (Lokal)"
         else:  # gemini
             bot_name = "GeminiBot"
             
@@ -966,14 +1642,77 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         loading_html = f'<div id="{loading_id}" style="font-style: italic; margin: 5px 0;">{bot_name} sedang mengetik...</div>'
         text_widget.append(loading_html)
         text_widget.verticalScrollBar().setValue(text_widget.verticalScrollBar().maximum())
+        self._pending_responses[text_widget] = self._pending_responses.get(text_widget, 0) + 1
+        
+        # Jadwalkan permintaan di pool pekerja
+        self._request_response(
+            message,
+            lambda response: self._process_api_response(text_widget, response),
+            session_id=session_id,
+            index_text=index_text,
+            use_cache=use_cache
+        )
+    
+    def _request_response(self, message, on_done, session_id="default", index_text=None, use_cache=True):
+        """
+        Menjadwalkan ChatGPTAPI.get_response di pool pekerja
+        
+        Pesan identik untuk sesi yang sama yang masih antre atau berjalan digabung,
+        sehingga klik beruntun tidak menambah permintaan baru. Pertanyaan yang gagal karena
+        koneksi terputus disimpan di outbox dan jawabannya dikirim ke tab ini belakangan.
+        """
+        api = self.api
+        self._submit_task(
+            lambda task: api.get_response(
+                message, session_id=session_id, index_text=index_text, use_cache=use_cache, queue_offline=True
+            ),
+            on_done,
+            on_error=lambda error: on_done(self._request_error_text(error)),
+            key=self._response_key(message, session_id, use_cache)
+        )
+    
+    def _response_key(self, message, session_id, use_cache):
+        """Kunci penggabungan permintaan get_response di pool pekerja"""
+        return ("response", session_id, message, use_cache)
+    
+    def _question_pending(self, message, session_id):
+        """
+        Memeriksa apakah pertanyaan yang sama masih diproses, sebelum pesan pengguna ditampilkan
         
-        # Mulai thread untuk mendapatkan respons dari API
-        self.api_thread = ChatGPTThread(self.api, message)
-        self.api_thread.response_received.connect(lambda response: self._process_api_response(text_widget, response))
-        self.api_thread.start()
+        Jawabannya cukup ditampilkan sekali, jadi pertanyaan ulang tidak menambah gelembung
+        pesan maupun indikator loading, dan teks di kotak input tidak dihapus.
+        """
+        if not any(self.workers.pending(self._response_key(message, session_id, use_cache)) for use_cache in (True, False)):
+            return False
+        self.statusBar().showMessage("Pertanyaan yang sama sedang diproses", 3000)
+        return True
+    
+    def _request_error_text(self, error):
+        """Teks untuk tab saat permintaan gagal; pertanyaan yang masuk outbox diberi keterangan"""
+        if isinstance(error, Offline):
+            if error.item is not None:
+                return OFFLINE_NOTICE
+            return str(error)
+        return f"Error: {str(error)}"
+    
+    def _submit_task(self, fn, on_done, on_error=None, on_progress=None, priority=INTERACTIVE, key=None):
+        """Menjadwalkan tugas di pool pekerja dan memberi tahu pengguna jika antrean penuh"""
+        task = self.workers.submit(fn, on_done, on_error=on_error, on_progress=on_progress, priority=priority, key=key)
+        if task is not None:
+            return
         
+        message = "Terlalu banyak permintaan sedang diproses. Coba lagi sebentar lagi."
+        self.statusBar().showMessage(message, 5000)
+        if on_error is not None:
+            on_error(RuntimeError(message))
+        else:
+            on_done(f"Error: {message}")
+    
+    @stage("render.response")
     def _process_api_response(self, text_widget, response):
         """Memproses dan menampilkan respons dari API"""
+        self._pending_responses[text_widget] = max(0, self._pending_responses.get(text_widget, 0) - 1)
+        
         # Sembunyikan dokumen sementara untuk menghindari refresh berkali-kali
         text_widget.setUpdatesEnabled(False)
         
@@ -995,9 +1734,66 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         # Aktifkan kembali pembaruan UI
         text_widget.setUpdatesEnabled(True)
     
+    def _schedule_history_search(self, text):
+        """Menjadwalkan pencarian riwayat setelah pengguna berhenti mengetik sejenak"""
+        if not text.strip():
+            self.search_timer.stop()
+            self.search_results.clear()
+            self.search_results.setVisible(False)
+            return
+        self.search_timer.start()
+    
+    def _run_history_search(self):
+        """Menjalankan pencarian di indeks lokal dan menampilkan hasilnya"""
+        results = self.api.search_history(self.search_input.text().strip())
+        
+        self.search_results.clear()
+        for result in results:
+            label = SESSION_LABELS.get(result.session_id, result.session_id)
+            question = result.question.replace("\n", " ")
+            if len(question) > 80:
+                question = question[:80] + "..."
+            item = QListWidgetItem(f"[{label}] {question}")
+            item.setData(Qt.UserRole, result)
+            item.setToolTip(result.snippet)
+            self.search_results.addItem(item)
+        
+        if not results:
+            self.search_results.addItem("Tidak ada percakapan yang cocok")
+        self.search_results.setVisible(True)
+    
+    def _show_search_result(self, item):
+        """Menampilkan pertanyaan dan jawaban lengkap dari hasil pencarian"""
+        result = item.data(Qt.UserRole)
+        if result is None:
+            return
+        
+        from PyQt5.QtWidgets import QDialog
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Riwayat - {SESSION_LABELS.get(result.session_id, result.session_id)}")
+        dialog.resize(600, 400)
+        layout = QVBoxLayout(dialog)
+        
+        question = result.question.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        answer = result.answer.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        text = QTextEdit()
+        text.setReadOnly(True)
+        text.setHtml(
+            f"<h3>Pertanyaan:</h3><p>{question.replace(chr(10), '<br>')}</p>"
+            f"<h3>Jawaban:</h3><p>{answer.replace(chr(10), '<br>')}</p>"
+        )
+        layout.addWidget(text)
+        
+        close_btn = QPushButton("Tutup")
+        close_btn.clicked.connect(dialog.accept)
+        layout.addWidget(close_btn)
+        
+        dialog.exec_()
+    
     def _logout(self):
         """Melakukan logout dari aplikasi"""
-        provider_name = "OpenAI" if self.auth_manager.get_provider() == "openai" else "DeepSeek"
+        provider_name = PROVIDER_NAMES.get(self.auth_manager.get_provider(), "OpenAI")
         
         reply = QMessageBox.question(
             self, 
@@ -1010,10 +1806,89 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         if reply == QMessageBox.Yes:
             if self.auth_manager.logout():
                 QMessageBox.information(self, "Logout Berhasil", "Anda telah berhasil logout dari akun Anda.")
-                self.close()
+                self._quit()
             else:
                 QMessageBox.warning(self, "Logout Gagal", "Terjadi kesalahan saat melakukan logout.")
     
+    def attach_instance(self, server, pending_commands=None):
+        """
+        Menjadikan jendela ini instance residen yang diaktifkan oleh peluncuran berikutnya
+        
+        Args:
+            server (InstanceServer): Server socket yang sudah berjalan
+            pending_commands (list, optional): Perintah yang diterima sebelum jendela siap
+        """
+        self.instance = server
+        self.instance_command.connect(self._handle_instance_command)
+        server.on_command = self.instance_command.emit
+        # Pertanyaan dari "edubot ask"/"edubot explain" dijawab langsung di thread socket
+        server.on_request = lambda payload, send: serve_request(self.api, payload, send)
+        for command in list(pending_commands or []):
+            self.instance_command.emit(command)
+        
+        # Ikon tray: menutup jendela hanya menyembunyikannya, proses tetap berjalan
+        tray_enabled = self.auth_manager.config.get("single_instance", {}).get("tray", True)
+        if not tray_enabled or not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        
+        self.tray = QSystemTrayIcon(self.windowIcon(), self)
+        self.tray.setToolTip("EduBot")
+        tray_menu = QMenu(self)
+        show_action = tray_menu.addAction("Tampilkan EduBot")
+        show_action.triggered.connect(self._show_window)
+        quit_action = tray_menu.addAction("Keluar")
+        quit_action.triggered.connect(self._quit)
+        self.tray.setContextMenu(tray_menu)
+        self.tray.activated.connect(self._on_tray_activated)
+        self.tray.show()
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+    
+    def _handle_instance_command(self, command):
+        """Menjalankan perintah dari peluncuran lain"""
+        if command == COMMAND_SHOW:
+            self._show_window()
+    
+    def _on_tray_activated(self, reason):
+        """Klik pada ikon tray menampilkan atau menyembunyikan jendela"""
+        if reason != QSystemTrayIcon.Trigger:
+            return
+        if self.isVisible() and not self.isMinimized():
+            self.hide()
+        else:
+            self._show_window()
+    
+    def _show_window(self):
+        """Menampilkan jendela di depan, termasuk jika sedang disembunyikan atau diminimalkan"""
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+    
+    def _quit(self):
+        """Keluar dari aplikasi, termasuk saat berjalan di tray"""
+        self._quitting = True
+        self.close()
+        QApplication.instance().quit()
+    
+    def closeEvent(self, event):
+        """Saat ada ikon tray jendela hanya disembunyikan; selain itu aplikasi ditutup"""
+        if self.tray is not None and not self._quitting:
+            event.ignore()
+            self.hide()
+            # Jendela tersembunyi tidak perlu menahan riwayat sesi di memori
+            self.api.evict_idle_sessions(OVER_BUDGET_IDLE_SECONDS)
+            gc.collect()
+            return
+        
+        if self.tray is not None:
+            self.tray.hide()
+        if self.instance is not None:
+            self.instance.stop()
+        # Pertanyaan yang belum terkirim tetap di jurnal dan dicoba lagi saat EduBot dibuka
+        self.api.outbox.stop()
+        event.accept()
+    
     def _show_about(self):
         """Menampilkan informasi tentang aplikasi"""
         about_text = f"""
@@ -1027,6 +1902,49 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         
         QMessageBox.about(self, "Tentang EduBot", about_text)
     
+    def _publish_shared_cache(self):
+        """Menerbitkan cache jawaban ke share atau direktori server LAN"""
+        from PyQt5.QtWidgets import QFileDialog
+        
+        default_path = self.auth_manager.config.get("shared_cache", {}).get("source", "")
+        if not default_path or default_path.startswith(("http://", "https://")):
+            default_path = os.path.expanduser("~/edubot_shared_cache.bin")
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Terbitkan Cache Bersama", default_path,
+            "Cache EduBot (*.bin);;All Files (*)"
+        )
+        if not file_name:
+            return
+        
+        try:
+            count = self.api.publish_shared_cache(file_name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal menerbitkan cache bersama: {str(e)}")
+            return
+        
+        QMessageBox.information(
+            self,
+            "Cache Bersama Diterbitkan",
+            f"{count} jawaban diterbitkan ke {file_name}.\n\n"
+            "Atur \"shared_cache\": {\"source\": ...} di config.json komputer siswa "
+            "ke path share atau alamat HTTP berkas ini."
+        )
+    
+    def _show_compare(self):
+        """Menampilkan dialog perbandingan provider"""
+        # Urutan tab sama dengan urutan SESSION_LABELS
+        session_id = list(SESSION_LABELS)[self.tab_widget.currentIndex()]
+        CompareDialog(self.api, self.workers, session_id=session_id, parent=self).exec_()
+    
+    def _show_diagnostics(self):
+        """Menampilkan dialog diagnostik"""
+        DiagnosticsDialog(self).exec_()
+    
+    def _show_logs(self):
+        """Menampilkan dialog log aplikasi"""
+        LogViewerDialog(self).exec_()
+    
     def _show_help(self):
         """Menampilkan bantuan penggunaan aplikasi"""
         help_text = """
@@ -1049,23 +1967,3 @@ Berikan HANYA skrip dalam format kode dengan tanda backtick (```) tanpa penjelas
         """
         
         QMessageBox.information(self, "Bantuan Penggunaan", help_text)
-
-class ChatGPTThread(QThread):
-    """Thread terpisah untuk berkomunikasi dengan API ChatGPT"""
-    
-    # Sinyal yang akan dipancarkan saat respons diterima
-    response_received = pyqtSignal(str)
-    
-    def __init__(self, api, message):
-        """Inisialisasi thread"""
-        super().__init__()
-        self.api = api
-        self.message = message
-    
-    def run(self):
-        """Menjalankan thread"""
-        try:
-            response = self.api.get_response(self.message)
-            self.response_received.emit(response)
-        except Exception as e:
-            self.response_received.emit(f"Error: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul anggaran memori untuk EduBot
+Mengukur pemakaian memori (RSS proses) dan menyimpan transkrip lama ke disk
+"""
+import os
+import json
+import shutil
+import tracemalloc
+from collections import deque
+
+from app_config import CONFIG_DIR
+from metrics import registry
+
+TRANSCRIPTS_DIR = os.path.join(CONFIG_DIR, "transcripts")
+
+# Nilai bawaan yang dapat diubah melalui bagian "memory" di config.json
+DEFAULT_BUDGET_MB = 150
+DEFAULT_IDLE_MINUTES = 15
+DEFAULT_MAX_RENDERED = 100
+DEFAULT_CHECK_SECONDS = 30
+
+# Satu frame per alokasi sudah cukup untuk total dan menekan overhead tracemalloc
+TRACEMALLOC_FRAMES = 1
+
+_MB = 1024 * 1024
+
+def start_tracing():
+    """
+    Menyalakan tracemalloc untuk melihat memori objek Python di Diagnostik
+
+    Mati secara bawaan: tracemalloc menambah memori dan waktu untuk setiap alokasi.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+class MemoryBudget:
+    """Anggaran memori aplikasi berdasarkan RSS proses"""
+
+    def __init__(self, config=None):
+        """
+        Inisialisasi anggaran memori
+
+        Args:
+            config (dict, optional): Bagian "memory" dari config.json. Defaults to None.
+        """
+        config = config or {}
+        self.budget_mb = config.get("budget_mb", DEFAULT_BUDGET_MB)
+        self.idle_seconds = config.get("idle_minutes", DEFAULT_IDLE_MINUTES) * 60
+        self.max_rendered = config.get("max_rendered_messages", DEFAULT_MAX_RENDERED)
+        self.check_seconds = config.get("check_seconds", DEFAULT_CHECK_SECONDS)
+
+        # tracemalloc hanya atas permintaan (config, Diagnostik, atau EDUBOT_PROFILE)
+        if config.get("tracemalloc", False):
+            start_tracing()
+
+        self.checks = 0
+        self.over_budget_checks = 0
+
+        registry.register_source("memory", self.stats)
+
+    def usage(self):
+        """
+        Mengukur pemakaian memori saat ini
+
+        Returns:
+            dict: rss_mb dari /proc jika tersedia, serta traced_mb dan peak_mb jika tracemalloc aktif
+        """
+        result = {}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            result["traced_mb"] = round(current / _MB, 1)
+            result["peak_mb"] = round(peak / _MB, 1)
+
+        rss = _rss_bytes()
+        if rss is not None:
+            result["rss_mb"] = round(rss / _MB, 1)
+        return result
+
+    def over_budget(self):
+        """
+        Memeriksa apakah pemakaian memori melewati anggaran
+
+        RSS proses dipakai karena juga mencakup dokumen Qt dan pustaka C, bukan hanya objek
+        Python. Memori yang dilacak tracemalloc hanya dipakai jika RSS tidak tersedia (bukan Linux).
+        """
+        self.checks += 1
+        usage = self.usage()
+        used = usage.get("rss_mb", usage.get("traced_mb", 0))
+        if used > self.budget_mb:
+            self.over_budget_checks += 1
+            return True
+        return False
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Pemakaian memori dan anggaran
+        """
+        result = self.usage()
+        result["budget_mb"] = self.budget_mb
+        result["checks"] = self.checks
+        result["over_budget_checks"] = self.over_budget_checks
+        return result
+
+class TranscriptBuffer:
+    """
+    Daftar pesan yang ditampilkan di satu widget transkrip
+
+    Hanya max_messages pesan terakhir yang disimpan di memori dan dokumen; pesan yang lebih
+    lama dipindahkan ke berkas dan dapat dimuat kembali sesuai permintaan.
+    """
+
+    def __init__(self, name, max_messages=DEFAULT_MAX_RENDERED, directory=TRANSCRIPTS_DIR):
+        """
+        Inisialisasi buffer transkrip
+
+        Args:
+            name (str): Nama transkrip (misalnya "chat"), digunakan sebagai nama berkas
+            max_messages (int, optional): Jumlah pesan yang tetap ditampilkan. Defaults to DEFAULT_MAX_RENDERED.
+            directory (str, optional): Direktori berkas transkrip. Defaults to TRANSCRIPTS_DIR.
+        """
+        self.name = name
+        self.max_messages = max_messages
+        self.messages = deque()
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self._offsets = []
+
+        # Transkrip lama dari jalannya aplikasi sebelumnya tidak dipakai lagi
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @property
+    def spilled(self):
+        """Jumlah pesan yang sedang tersimpan di disk"""
+        return len(self._offsets)
+
+    def add(self, html):
+        """
+        Menambahkan pesan yang baru ditampilkan
+
+        Returns:
+            bool: True jika transkrip perlu dipangkas lalu dirender ulang
+        """
+        self.messages.append(html)
+        # Pangkas secara bertahap agar dokumen tidak dirender ulang untuk setiap pesan
+        return len(self.messages) > self.max_messages + max(10, self.max_messages // 4)
+
+    def trim(self):
+        """
+        Memindahkan pesan tertua ke disk hingga tersisa max_messages
+
+        Returns:
+            int: Jumlah pesan yang dipindahkan
+        """
+        moved = 0
+        with open(self.path, "a", encoding="utf-8") as f:
+            while len(self.messages) > self.max_messages:
+                self._offsets.append(f.tell())
+                f.write(json.dumps(self.messages.popleft(), ensure_ascii=False) + "\n")
+                moved += 1
+        return moved
+
+    def restore(self, count=None):
+        """
+        Memuat kembali pesan terbaru dari disk ke awal transkrip
+
+        Args:
+            count (int, optional): Jumlah pesan yang dimuat. Defaults to max_messages.
+
+        Returns:
+            int: Jumlah pesan yang dimuat
+        """
+        count = min(count or self.max_messages, len(self._offsets))
+        if not count:
+            return 0
+
+        start = self._offsets[-count]
+        with open(self.path, "r+", encoding="utf-8") as f:
+            f.seek(start)
+            lines = f.read().splitlines()
+            f.seek(start)
+            f.truncate()
+        del self._offsets[-count:]
+
+        for line in reversed(lines):
+            self.messages.appendleft(json.loads(line))
+        return len(lines)
+
+    def render(self):
+        """Menggabungkan pesan yang disimpan di memori menjadi HTML"""
+        return "".join(self.messages)
+
+    def clear(self):
+        """Menghapus semua pesan, termasuk yang ada di disk"""
+        self.messages.clear()
+        self._offsets.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def clear_transcripts(directory=TRANSCRIPTS_DIR):
+    """Menghapus semua berkas transkrip"""
+    shutil.rmtree(directory, ignore_errors=True)
+
+def _rss_bytes():
+    """Resident set size proses saat ini dari /proc (Linux), atau None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul riwayat pesan untuk EduBot
+Representasi pesan yang ringkas (slot, role yang di-intern, prompt sistem yang dipakai
+bersama) dan riwayat sesi berbentuk ring buffer. Permintaan ke provider disusun sebagai
+view atas riwayat, bukan salinan daftar pesan.
+"""
+import sys
+import threading
+import weakref
+from collections import deque
+from collections.abc import Sequence
+
+# Jumlah pesan pengguna/asisten terakhir yang disimpan per sesi (untuk menghemat token)
+DEFAULT_MAX_MESSAGES = 8
+
+class Message:
+    """
+    Satu pesan {"role", "content"}
+
+    Mendukung msg["role"] dan msg["content"] seperti dict agar kode yang membaca pesan
+    tidak perlu tahu representasinya; to_dict() dipakai saat membentuk payload JSON.
+    """
+
+    __slots__ = ("role", "content", "__weakref__")
+
+    def __init__(self, role, content):
+        # Role di-intern agar ribuan pesan berbagi tiga objek string yang sama
+        self.role = sys.intern(role)
+        self.content = content
+
+    def __getitem__(self, key):
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """Seperti dict.get"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """Pesan dalam bentuk dict untuk payload provider"""
+        return {"role": self.role, "content": self.content}
+
+    def __eq__(self, other):
+        if isinstance(other, Message):
+            return self.role == other.role and self.content == other.content
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.role, self.content))
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content[:40]!r})"
+
+# Pesan sistem dipakai bersama oleh semua sesi dengan prompt yang sama; entri hilang
+# sendiri setelah tidak ada sesi yang memakainya
+_system_messages = weakref.WeakValueDictionary()
+_system_lock = threading.Lock()
+
+def system_message(content):
+    """
+    Pesan sistem bersama untuk isi prompt tertentu
+
+    Args:
+        content (str): Prompt sistem
+
+    Returns:
+        Message: Objek yang sama untuk isi yang sama
+    """
+    with _system_lock:
+        message = _system_messages.get(content)
+        if message is None:
+            message = Message("system", content)
+            _system_messages[content] = message
+        return message
+
+def as_payload(messages):
+    """
+    Daftar dict {"role", "content"} untuk dikirim ke provider
+
+    Args:
+        messages (MessagesView|list): View dari build_messages atau daftar dict biasa
+
+    Returns:
+        list: Daftar dict
+    """
+    if isinstance(messages, MessagesView):
+        return messages.payload()
+    return messages
+
+class MessagesView(Sequence):
+    """Daftar pesan baca-saja: prompt sistem, potret riwayat, dan pesan baru"""
+
+    __slots__ = ("_system", "_turns", "_extra")
+
+    def __init__(self, system, turns, extra=None):
+        """
+        Args:
+            system (Message): Pesan sistem, atau None
+            turns (tuple): Potret pesan riwayat (referensi, bukan salinan pesan)
+            extra (Message, optional): Pesan pengguna baru. Defaults to None.
+        """
+        self._system = system
+        self._turns = turns
+        self._extra = extra
+
+    def __len__(self):
+        return (self._system is not None) + len(self._turns) + (self._extra is not None)
+
+    def __iter__(self):
+        if self._system is not None:
+            yield self._system
+        yield from self._turns
+        if self._extra is not None:
+            yield self._extra
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(index)
+        if self._system is not None:
+            if index == 0:
+                return self._system
+            index -= 1
+        if index < len(self._turns):
+            return self._turns[index]
+        return self._extra
+
+    def payload(self):
+        """Daftar dict untuk payload JSON/SDK; satu-satunya tempat pesan dibentuk ulang"""
+        return [message.to_dict() for message in self]
+
+class SessionHistory:
+    """Riwayat satu sesi: prompt sistem bersama dan ring buffer pesan terakhir"""
+
+    __slots__ = ("system", "turns")
+
+    def __init__(self, system_prompt=None, max_messages=DEFAULT_MAX_MESSAGES):
+        """
+        Args:
+            system_prompt (str, optional): Prompt sistem sesi. Defaults to None.
+            max_messages (int, optional): Jumlah pesan yang disimpan. Defaults to DEFAULT_MAX_MESSAGES.
+        """
+        self.system = system_message(system_prompt) if system_prompt else None
+        self.turns = deque(maxlen=max_messages)
+
+    def __len__(self):
+        return (self.system is not None) + len(self.turns)
+
+    def append(self, role, content):
+        """Menambahkan pesan; pesan tertua keluar otomatis saat buffer penuh"""
+        self.turns.append(Message(role, content))
+
+    def last(self):
+        """Pesan terakhir, atau None jika riwayat kosong"""
+        if self.turns:
+            return self.turns[-1]
+        return self.system
+
+    def clear(self):
+        """Menghapus pesan tetapi mempertahankan prompt sistem"""
+        self.turns.clear()
+
+    def view(self, message=None):
+        """
+        View pesan untuk permintaan tanpa menyalin isi pesan
+
+        Args:
+            message (str, optional): Pesan pengguna baru di akhir view. Defaults to None.
+
+        Returns:
+            MessagesView: View baca-saja
+        """
+        extra = Message("user", message) if message is not None else None
+        return MessagesView(self.system, tuple(self.turns), extra)
+
+    def to_list(self):
+        """Daftar dict untuk disimpan ke disk (format SessionStore)"""
+        return self.view().payload()
+
+    @classmethod
+    def from_list(cls, messages, max_messages=DEFAULT_MAX_MESSAGES):
+        """
+        Membangun riwayat dari daftar dict (misalnya dari SessionStore)
+
+        Args:
+            messages (list): Daftar pesan {"role", "content"}
+            max_messages (int, optional): Jumlah pesan yang disimpan. Defaults to DEFAULT_MAX_MESSAGES.
+
+        Returns:
+            SessionHistory: Riwayat sesi
+        """
+        system_prompt = next((msg["content"] for msg in messages if msg["role"] == "system"), None)
+        history = cls(system_prompt, max_messages)
+        for msg in messages:
+            if msg["role"] != "system":
+                history.append(msg["role"], msg["content"])
+        return history
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul metrik untuk EduBot
+Mengumpulkan penghitung dan statistik dari berbagai komponen untuk tampilan diagnostik
+"""
+import threading
+
+class MetricsRegistry:
+    """Registri metrik yang aman digunakan dari banyak thread"""
+
+    def __init__(self):
+        """Inisialisasi registri kosong"""
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._sources = {}
+
+    def increment(self, name, amount=1):
+        """
+        Menambah nilai penghitung
+
+        Args:
+            name (str): Nama metrik, misalnya "prefetch.started"
+            amount (int, optional): Besar penambahan. Defaults to 1.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        """
+        Mengatur nilai metrik sesaat (misalnya kedalaman antrean)
+
+        Args:
+            name (str): Nama metrik
+            value: Nilai metrik
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def register_source(self, name, callback):
+        """
+        Mendaftarkan sumber metrik yang dibaca saat snapshot diambil
+
+        Args:
+            name (str): Awalan nama metrik dari sumber ini
+            callback (callable): Fungsi tanpa argumen yang mengembalikan dict metrik
+        """
+        with self._lock:
+            self._sources[name] = callback
+
+    def unregister_source(self, name):
+        """Menghapus sumber metrik yang terdaftar"""
+        with self._lock:
+            self._sources.pop(name, None)
+
+    def get(self, name, default=0):
+        """Mengembalikan nilai penghitung atau gauge tertentu"""
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name]
+            return self._gauges.get(name, default)
+
+    def snapshot(self):
+        """
+        Mengambil salinan semua metrik saat ini
+
+        Returns:
+            dict: Nama metrik ke nilai, diurutkan berdasarkan nama
+        """
+        with self._lock:
+            values = dict(self._counters)
+            values.update(self._gauges)
+            sources = list(self._sources.items())
+
+        # Sumber dibaca di luar lock agar tidak terjadi deadlock dengan komponen lain
+        for prefix, callback in sources:
+            try:
+                for key, value in callback().items():
+                    values[f"{prefix}.{key}"] = value
+            except Exception as e:
+                values[f"{prefix}.error"] = str(e)
+
+        return dict(sorted(values.items()))
+
+# Registri bersama untuk seluruh aplikasi
+registry = MetricsRegistry()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul katalog model untuk EduBot
+Menyimpan daftar model setiap provider di ~/.edubot dan memperbaruinya di latar belakang
+paling banyak sekali per TTL
+"""
+import logging
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+
+from app_config import CONFIG_DIR
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = os.path.join(CONFIG_DIR, "models.json")
+
+# Umur katalog sebelum diambil ulang (detik)
+DEFAULT_TTL = 24 * 60 * 60
+
+# Satu model beserta batas konteksnya (token, None jika tidak diketahui)
+ModelInfo = namedtuple("ModelInfo", ["name", "context_limit"])
+
+# Daftar cadangan selama katalog belum pernah diambil
+DEFAULT_MODELS = {
+    "openai": ["gpt-3.5-turbo", "gpt-4o-mini", "gpt-4o", "gpt-4"],
+    "deepseek": ["deepseek-chat", "deepseek-reasoner"],
+    "gemini": ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-pro"],
+}
+
+# Batas konteks yang diketahui untuk provider yang tidak melaporkannya (awalan nama terpanjang menang)
+KNOWN_CONTEXT_LIMITS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "o1": 200000,
+    "o3": 200000,
+    "o4-mini": 200000,
+    "deepseek-chat": 64000,
+    "deepseek-reasoner": 64000,
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+    "gemini-2.0-flash": 1048576,
+    "gemini-pro": 32760,
+}
+
+def known_context_limit(model_name):
+    """
+    Mencari batas konteks model dari tabel bawaan
+
+    Args:
+        model_name (str): Nama model
+
+    Returns:
+        int: Batas konteks dalam token, atau None jika tidak diketahui
+    """
+    matches = [prefix for prefix in KNOWN_CONTEXT_LIMITS if model_name.startswith(prefix)]
+    if not matches:
+        return None
+    return KNOWN_CONTEXT_LIMITS[max(matches, key=len)]
+
+class ModelCatalog:
+    """Katalog model per provider dengan cache berkas dan pembaruan latar belakang"""
+
+    def __init__(self, path=CATALOG_FILE, ttl=DEFAULT_TTL):
+        """
+        Inisialisasi katalog dan muat cache dari berkas (tanpa akses jaringan)
+
+        Args:
+            path (str, optional): Lokasi berkas katalog. Defaults to CATALOG_FILE.
+            ttl (int, optional): Umur maksimum katalog dalam detik. Defaults to DEFAULT_TTL.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._listeners = []
+        self._providers = self._load()
+
+        registry.register_source("model_catalog", self.stats)
+
+    def models(self, provider):
+        """
+        Mengembalikan daftar model provider dari cache, tanpa menunggu jaringan
+
+        Args:
+            provider (str): Provider AI
+
+        Returns:
+            list: Daftar ModelInfo; daftar cadangan jika katalog belum pernah diambil
+        """
+        with self._lock:
+            entry = self._providers.get(provider)
+            if entry and entry["models"]:
+                return [ModelInfo(model["name"], model.get("context_limit")) for model in entry["models"]]
+        return [ModelInfo(name, known_context_limit(name)) for name in DEFAULT_MODELS.get(provider, [])]
+
+    def has_model(self, provider, model_name):
+        """Memeriksa apakah model ada di katalog (atau daftar cadangan) provider"""
+        return any(model.name == model_name for model in self.models(provider))
+
+    def context_limit(self, provider, model_name):
+        """
+        Mengembalikan batas konteks model
+
+        Args:
+            provider (str): Provider AI
+            model_name (str): Nama model
+
+        Returns:
+            int: Batas konteks dalam token, atau None jika tidak diketahui
+        """
+        for model in self.models(provider):
+            if model.name == model_name and model.context_limit:
+                return model.context_limit
+        return known_context_limit(model_name)
+
+    def is_stale(self, provider):
+        """Memeriksa apakah katalog provider belum ada atau sudah melewati TTL"""
+        with self._lock:
+            entry = self._providers.get(provider)
+            return not entry or time.time() - entry.get("fetched", 0) > self.ttl
+
+    def add_listener(self, callback):
+        """
+        Mendaftarkan fungsi yang dipanggil dengan nama provider setelah katalognya diperbarui
+
+        Callback dipanggil dari thread latar belakang.
+        """
+        self._listeners.append(callback)
+
+    def refresh(self, provider, fetch, force=False):
+        """
+        Memperbarui katalog provider di thread latar belakang jika sudah kedaluwarsa
+
+        Args:
+            provider (str): Provider AI
+            fetch (callable): Fungsi tanpa argumen yang mengembalikan daftar ModelInfo
+            force (bool, optional): Ambil ulang walaupun belum kedaluwarsa. Defaults to False.
+
+        Returns:
+            bool: True jika pembaruan dimulai
+        """
+        with self._lock:
+            if provider in self._refreshing:
+                return False
+            entry = self._providers.get(provider)
+            if not force and entry and time.time() - entry.get("fetched", 0) <= self.ttl:
+                return False
+            self._refreshing.add(provider)
+
+        thread = threading.Thread(target=self._run_refresh, args=(provider, fetch), daemon=True)
+        thread.start()
+        return True
+
+    def refresh_now(self, provider, fetch):
+        """Memperbarui katalog provider di thread saat ini (dipanggil dari thread latar)"""
+        with self._lock:
+            if provider in self._refreshing:
+                return
+            self._refreshing.add(provider)
+        self._run_refresh(provider, fetch)
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Jumlah model dan umur katalog (detik) per provider
+        """
+        now = time.time()
+        with self._lock:
+            result = {}
+            for provider, entry in self._providers.items():
+                result[f"{provider}.models"] = len(entry["models"])
+                result[f"{provider}.age"] = int(now - entry.get("fetched", 0))
+            return result
+
+    def _run_refresh(self, provider, fetch):
+        """Mengambil daftar model dan menyimpannya ke berkas"""
+        try:
+            models = fetch()
+        except Exception as e:
+            logger.error("Error saat memperbarui katalog model %s: %s", provider, e)
+            registry.increment("model_catalog.errors")
+            return
+        finally:
+            with self._lock:
+                self._refreshing.discard(provider)
+
+        if not models:
+            return
+
+        entry = {
+            "fetched": time.time(),
+            "models": [
+                {"name": model.name, "context_limit": model.context_limit or known_context_limit(model.name)}
+                for model in sorted(models, key=lambda model: model.name)
+            ]
+        }
+        with self._lock:
+            self._providers[provider] = entry
+            self._save()
+        registry.increment("model_catalog.refreshes")
+
+        for callback in list(self._listeners):
+            try:
+                callback(provider)
+            except Exception as e:
+                logger.error("Error pada listener katalog model: %s", e)
+
+    def _load(self):
+        """Membaca katalog dari berkas"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            providers = data.get("providers", {})
+            return providers if isinstance(providers, dict) else {}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error("Error saat membaca katalog model: %s", e)
+            return {}
+
+    def _save(self):
+        """Menyimpan katalog secara atomik (lock harus dipegang)"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"providers": self._providers}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Error saat menyimpan katalog model: %s", e)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul outbox untuk EduBot
+Antrean permintaan keluar yang tahan gangguan jaringan: pertanyaan yang gagal karena
+koneksi terputus dicatat di jurnal lokal, lalu dikirim ulang otomatis dengan backoff
+setelah provider kembali dapat dihubungi.
+"""
+import logging
+import os
+import json
+import time
+import uuid
+import random
+import socket
+import threading
+
+from app_config import CONFIG_DIR
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PATH = os.path.join(CONFIG_DIR, "outbox.jsonl")
+
+# Nilai bawaan yang dapat diubah melalui bagian "outbox" di config.json
+DEFAULT_PROBE_SECONDS = 15
+DEFAULT_MAX_BACKOFF = 300
+DEFAULT_MAX_ITEMS = 50
+DEFAULT_MAX_AGE_HOURS = 24
+
+# Nama kelas kesalahan koneksi dari requests, urllib3, httpx, SDK OpenAI, dan google-api-core;
+# dicocokkan berdasarkan nama agar modul ini tidak perlu mengimpor pustaka tersebut
+_CONNECTIVITY_ERRORS = {
+    "ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "TimeoutException",
+    "ConnectError", "NewConnectionError", "MaxRetryError", "ProtocolError",
+    "APIConnectionError", "APITimeoutError", "ServiceUnavailable", "RetryError",
+}
+
+class Offline(Exception):
+    """Permintaan gagal karena koneksi terputus; item berisi entri outbox jika disimpan"""
+
+    def __init__(self, message, item=None):
+        super().__init__(message)
+        self.item = item
+
+def is_connectivity_error(error):
+    """
+    Memeriksa apakah kesalahan disebabkan jaringan (bukan ditolak provider)
+
+    Args:
+        error (Exception): Kesalahan dari panggilan provider
+
+    Returns:
+        bool: True untuk koneksi terputus, DNS gagal, atau batas waktu habis
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (ConnectionError, TimeoutError, socket.gaierror, Offline)):
+            return True
+        if any(cls.__name__ in _CONNECTIVITY_ERRORS for cls in type(error).__mro__):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+class OutboxItem:
+    """Satu permintaan yang menunggu dikirim"""
+
+    __slots__ = ("id", "session_id", "message", "system_prompt", "index_text", "created", "attempts", "next_try")
+
+    def __init__(self, id, session_id, message, system_prompt=None, index_text=None, created=None):
+        self.id = id
+        self.session_id = session_id
+        self.message = message
+        self.system_prompt = system_prompt
+        self.index_text = index_text
+        self.created = created or time.time()
+        self.attempts = 0
+        self.next_try = 0.0
+
+    @property
+    def question(self):
+        """Teks pertanyaan yang ditampilkan kepada pengguna"""
+        return self.index_text or self.message
+
+    def to_dict(self):
+        """Entri jurnal untuk item ini"""
+        return {
+            "op": "add",
+            "id": self.id,
+            "session_id": self.session_id,
+            "message": self.message,
+            "system_prompt": self.system_prompt,
+            "index_text": self.index_text,
+            "created": self.created,
+        }
+
+class Outbox:
+    """Antrean permintaan keluar dengan jurnal di disk dan pengiriman ulang di latar belakang"""
+
+    def __init__(self, config=None, path=OUTBOX_PATH):
+        """
+        Inisialisasi outbox dan memuat permintaan yang tersisa dari jalannya aplikasi sebelumnya
+
+        Args:
+            config (dict, optional): Bagian "outbox" dari config.json. Defaults to None.
+            path (str, optional): Lokasi jurnal. Defaults to OUTBOX_PATH.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.probe_seconds = config.get("probe_seconds", DEFAULT_PROBE_SECONDS)
+        self.max_backoff = config.get("max_backoff_s", DEFAULT_MAX_BACKOFF)
+        self.max_items = config.get("max_items", DEFAULT_MAX_ITEMS)
+        self.max_age = config.get("max_age_hours", DEFAULT_MAX_AGE_HOURS) * 3600
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+        # send(item) -> jawaban; melempar Offline jika koneksi masih terputus
+        self.send = None
+        # probe() -> bool; pemeriksaan koneksi ringan sebelum mencoba mengirim
+        self.probe = None
+        # Dipanggil dengan (item, jawaban) dari thread outbox setelah jawaban diterima
+        self.on_delivered = None
+
+        self.delivered = 0
+        self.dropped = 0
+        self.retries = 0
+        self.online = True
+        self._items = self._load() if self.enabled else {}
+
+        registry.register_source("outbox", self.stats)
+
+    def add_listener(self, callback):
+        """
+        Mendaftarkan fungsi tanpa argumen yang dipanggil setiap kali isi antrean berubah
+
+        Callback dapat dipanggil dari thread pekerja atau thread outbox.
+        """
+        self._listeners.append(callback)
+
+    def depth(self):
+        """Jumlah permintaan yang menunggu dikirim"""
+        with self._lock:
+            return len(self._items)
+
+    def pending(self):
+        """Daftar permintaan yang menunggu, yang tertua lebih dulu"""
+        with self._lock:
+            return sorted(self._items.values(), key=lambda item: item.created)
+
+    def add(self, session_id, message, system_prompt=None, index_text=None):
+        """
+        Menyimpan permintaan yang gagal karena koneksi terputus
+
+        Permintaan yang sama untuk sesi yang sama hanya disimpan sekali.
+
+        Args:
+            session_id (str): ID sesi/tab tujuan jawaban
+            message (str): Pesan lengkap untuk provider
+            system_prompt (str, optional): Prompt sistem sesi. Defaults to None.
+            index_text (str, optional): Teks pertanyaan untuk indeks dan tampilan. Defaults to None.
+
+        Returns:
+            OutboxItem: Entri antrean, atau None jika outbox nonaktif atau penuh
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            for item in self._items.values():
+                if item.session_id == session_id and item.message == message:
+                    return item
+            if len(self._items) >= self.max_items:
+                self.dropped += 1
+                return None
+            item = OutboxItem(uuid.uuid4().hex, session_id, message, system_prompt, index_text)
+            # Permintaan baru saja gagal; coba lagi setelah pemeriksaan koneksi berikutnya
+            item.next_try = item.created + self.probe_seconds
+            self._items[item.id] = item
+            self._append(item.to_dict())
+            self.online = False
+
+        registry.increment("outbox.queued_events")
+        self._notify()
+        self.start()
+        self._wake.set()
+        return item
+
+    def remove(self, item_id):
+        """Menghapus permintaan dari antrean (misalnya dibatalkan pengguna)"""
+        with self._lock:
+            if self._items.pop(item_id, None) is None:
+                return
+            self._append({"op": "done", "id": item_id})
+            if not self._items:
+                self._compact()
+        self._notify()
+
+    def retry_now(self):
+        """Mencoba mengirim semua permintaan sekarang tanpa menunggu backoff"""
+        with self._lock:
+            for item in self._items.values():
+                item.next_try = 0.0
+        self._wake.set()
+
+    def start(self):
+        """Memulai thread pengiriman ulang jika ada permintaan yang menunggu"""
+        if self.send is None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is not None or not self._items:
+                return
+            self._thread = threading.Thread(target=self._run, name="edubot-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Menghentikan thread pengiriman ulang; antrean tetap tersimpan di jurnal"""
+        self._stopped.set()
+        self._wake.set()
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Kedalaman antrean, status koneksi, dan jumlah pengiriman
+        """
+        with self._lock:
+            depth = len(self._items)
+        return {
+            "depth": depth,
+            "online": self.online,
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "dropped": self.dropped,
+        }
+
+    def _run(self):
+        """Thread outbox: memeriksa koneksi lalu mengirim permintaan yang sudah jatuh tempo"""
+        while not self._stopped.is_set():
+            self._wake.wait(self.probe_seconds)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+
+            now = time.time()
+            # Toleransi satu detik agar item tidak tertunda satu putaran karena selisih waktu detak
+            due = [item for item in self.pending() if item.next_try <= now + 1.0]
+            if not due:
+                with self._lock:
+                    if not self._items:
+                        self._thread = None
+                        return
+                continue
+
+            if self.probe is not None and not self._probe():
+                continue
+
+            for item in due:
+                if self._stopped.is_set():
+                    return
+                if not self._deliver(item):
+                    # Koneksi putus lagi; sisa permintaan menunggu pemeriksaan berikutnya
+                    break
+
+    def _probe(self):
+        """Menjalankan pemeriksaan koneksi dan mencatat hasilnya"""
+        try:
+            self.online = bool(self.probe())
+        except Exception:
+            self.online = False
+        return self.online
+
+    def _deliver(self, item):
+        """
+        Mengirim satu permintaan dari antrean
+
+        Returns:
+            bool: False jika koneksi masih terputus
+        """
+        try:
+            response = self.send(item)
+        except Exception as e:
+            if not is_connectivity_error(e):
+                # Kesalahan lain tidak akan pulih dengan mencoba ulang; sampaikan ke tab
+                response = f"Terjadi kesalahan: {str(e)}"
+            else:
+                with self._lock:
+                    item.attempts += 1
+                    backoff = min(self.max_backoff, self.probe_seconds * 2 ** item.attempts)
+                    item.next_try = time.time() + backoff * random.uniform(0.8, 1.2)
+                self.retries += 1
+                self.online = False
+                registry.increment("outbox.retry_events")
+                return False
+
+        self.online = True
+        self.delivered += 1
+        registry.increment("outbox.delivered_events")
+        self.remove(item.id)
+        if self.on_delivered is not None:
+            try:
+                self.on_delivered(item, response)
+            except Exception as e:
+                logger.error("Error saat menyampaikan jawaban tertunda: %s", e)
+        return True
+
+    def _notify(self):
+        """Memberi tahu listener bahwa isi antrean berubah"""
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Error pada listener outbox: %s", e)
+
+    def _append(self, entry):
+        """Menambahkan satu entri ke jurnal (dipanggil dengan lock)"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error("Error saat menulis jurnal outbox: %s", e)
+
+    def _compact(self):
+        """Menulis ulang jurnal hanya dengan permintaan yang masih menunggu (dipanggil dengan lock)"""
+        try:
+            if not self._items:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for item in self._items.values():
+                    f.write(json.dumps(item.to_dict(), ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Error saat memadatkan jurnal outbox: %s", e)
+
+    def _load(self):
+        """Memutar ulang jurnal; permintaan yang terlalu lama dibuang"""
+        items = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Baris terakhir bisa terpotong jika aplikasi berhenti saat menulis
+                        continue
+                    if entry.get("op") == "add":
+                        items[entry["id"]] = OutboxItem(
+                            entry["id"], entry["session_id"], entry["message"],
+                            entry.get("system_prompt"), entry.get("index_text"), entry.get("created")
+                        )
+                    elif entry.get("op") == "done":
+                        items.pop(entry.get("id"), None)
+        except FileNotFoundError:
+            return items
+        except (OSError, KeyError, TypeError) as e:
+            logger.error("Error saat membaca jurnal outbox: %s", e)
+
+        cutoff = time.time() - self.max_age
+        expired = [item_id for item_id, item in items.items() if item.created < cutoff]
+        for item_id in expired:
+            del items[item_id]
+        self.dropped += len(expired)
+
+        self._items = items
+        self._compact()
+        return items
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul prefetch spekulatif untuk EduBot
+Memulai permintaan di latar belakang saat perintah di tab terminal sudah jelas,
+sebelum pengguna menekan Enter
+"""
+import os
+import time
+import shlex
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from metrics import registry
+
+# Nilai bawaan yang dapat diubah melalui bagian "prefetch" di config.json
+DEFAULT_TTL = 60
+# Batas ini juga batas biaya tebakan yang salah: pembatalan hanya mencegah panggilan yang
+# belum dikirim. Panggilan HTTP yang sudah berjalan tetap selesai dan tetap dihitung ke kuota
+# dan pemakaian token; jumlahnya terlihat di Diagnostik (prefetch.cancelled_inflight).
+DEFAULT_MAX_PER_MINUTE = 6
+DEFAULT_MIN_CHARS = 2
+DEFAULT_DEBOUNCE_MS = 700
+
+# Nilai nice untuk thread prefetch agar tidak bersaing dengan permintaan interaktif
+PREFETCH_NICENESS = 10
+
+def command_key(text):
+    """
+    Mengurai input terminal parsial dengan shlex
+
+    Args:
+        text (str): Isi kotak input saat ini
+
+    Returns:
+        tuple: Token perintah, atau None jika input belum lengkap (misalnya kutip belum ditutup)
+    """
+    try:
+        tokens = shlex.split(text)
+    except ValueError:
+        return None
+
+    # Opsi yang belum selesai diketik ("ls -") belum stabil
+    if not tokens or tokens[-1] in ("-", "--", "|", "&&", "||", ";"):
+        return None
+    return tuple(tokens)
+
+class _Speculation:
+    """Satu permintaan spekulatif beserta hasilnya"""
+
+    __slots__ = ("key", "future", "cancelled", "created", "used")
+
+    def __init__(self, key):
+        self.key = key
+        self.future = Future()
+        self.cancelled = threading.Event()
+        self.created = time.monotonic()
+        self.used = False
+
+class SpeculativePrefetcher:
+    """Prefetch berprioritas rendah dengan cache berumur pendek dan batas per menit"""
+
+    def __init__(self, config=None):
+        """
+        Inisialisasi prefetcher
+
+        Args:
+            config (dict, optional): Bagian "prefetch" dari config.json. Defaults to None.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.ttl = config.get("ttl", DEFAULT_TTL)
+        self.max_per_minute = config.get("max_per_minute", DEFAULT_MAX_PER_MINUTE)
+        self.min_chars = config.get("min_chars", DEFAULT_MIN_CHARS)
+        self.debounce_ms = config.get("debounce_ms", DEFAULT_DEBOUNCE_MS)
+
+        self._lock = threading.Lock()
+        self._current = None
+        self._started = deque()
+
+    def speculate(self, key, fetch):
+        """
+        Memulai prefetch untuk kunci tertentu jika belum ada
+
+        Args:
+            key (tuple): Kunci yang akan dicocokkan saat pengguna mengirim pertanyaan
+            fetch (callable): Fungsi tanpa argumen yang menghasilkan jawaban (dijalankan di thread latar)
+
+        Returns:
+            bool: True jika prefetch baru dimulai
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            current = self._current
+            if current is not None and current.key == key and not self._expired(current):
+                # Kunci yang sama sudah diproses atau tersimpan
+                return False
+
+            # Batasi jumlah prefetch per menit untuk menjaga biaya
+            now = time.monotonic()
+            while self._started and now - self._started[0] > 60:
+                self._started.popleft()
+            if len(self._started) >= self.max_per_minute:
+                registry.increment("prefetch.throttled")
+                return False
+
+            self._discard(current)
+            speculation = _Speculation(key)
+            self._current = speculation
+            self._started.append(now)
+
+        registry.increment("prefetch.started")
+        thread = threading.Thread(target=self._run, args=(speculation, fetch), daemon=True)
+        thread.start()
+        return True
+
+    def take(self, key):
+        """
+        Mengambil hasil prefetch yang cocok dengan kunci
+
+        Args:
+            key (tuple): Kunci pertanyaan yang dikirim pengguna
+
+        Returns:
+            Future: Future berisi jawaban (mungkin masih berjalan), atau None jika tidak ada
+        """
+        with self._lock:
+            current = self._current
+            if current is None:
+                return None
+
+            if current.key != key or self._expired(current) or current.cancelled.is_set():
+                registry.increment("prefetch.misses")
+                self._discard(current)
+                self._current = None
+                return None
+
+            current.used = True
+            self._current = None
+
+        if current.future.done():
+            registry.increment("prefetch.hits")
+        else:
+            # Pengguna menekan Enter saat prefetch masih berjalan, ikut menunggu hasilnya
+            registry.increment("prefetch.joined")
+        return current.future
+
+    def cancel(self):
+        """Membatalkan prefetch yang sedang berjalan atau tersimpan"""
+        with self._lock:
+            self._discard(self._current)
+            self._current = None
+
+    def _discard(self, speculation):
+        """Membuang spekulasi yang tidak terpakai (lock harus dipegang)"""
+        if speculation is None or speculation.used:
+            return
+        if speculation.future.done():
+            registry.increment("prefetch.wasted")
+            return
+        speculation.cancelled.set()
+        registry.increment("prefetch.cancelled")
+        if speculation.future.running():
+            # Sudah dikirim ke provider: jawabannya dibuang, tetapi panggilannya tetap dibayar
+            registry.increment("prefetch.cancelled_inflight")
+
+    def _expired(self, speculation):
+        """Memeriksa apakah hasil prefetch sudah terlalu lama"""
+        return time.monotonic() - speculation.created > self.ttl
+
+    def _run(self, speculation, fetch):
+        """Menjalankan fetch di thread latar dengan prioritas rendah"""
+        try:
+            # Turunkan prioritas thread ini saja (hanya didukung di Linux)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICENESS)
+        except (AttributeError, OSError):
+            pass
+
+        # Prefetch yang dibatalkan sebelum sempat berjalan tidak perlu memanggil API. Pemeriksaan
+        # dan penandaan berjalan memakai lock yang sama dengan cancel(), sehingga pembatalan
+        # tidak dapat terselip di antaranya.
+        with self._lock:
+            if speculation.cancelled.is_set():
+                speculation.future.cancel()
+                return
+            speculation.future.set_running_or_notify_cancel()
+
+        try:
+            result = fetch()
+        except Exception as e:
+            registry.increment("prefetch.errors")
+            speculation.future.set_exception(e)
+            return
+        speculation.future.set_result(result)
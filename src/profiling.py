@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul profiling opsional untuk EduBot
+Diaktifkan dengan variabel lingkungan EDUBOT_PROFILE, misalnya
+
+    EDUBOT_PROFILE=1 edubot                 # waktu per tahap + sampling + tracemalloc
+    EDUBOT_PROFILE=cprofile edubot          # waktu per tahap + cProfile + tracemalloc
+    EDUBOT_PROFILE=sample,cprofile edubot   # mode dapat digabung dengan koma
+
+Tahap penting (panggilan provider, parsing jawaban, format Markdown, setHtml/append,
+pemangkasan riwayat) ditandai dengan dekorator stage. Saat EDUBOT_PROFILE tidak diisi,
+stage mengembalikan fungsi aslinya sehingga tidak ada biaya tambahan sama sekali.
+
+Saat aplikasi keluar, hasilnya ditulis sebagai bundel di ~/.edubot/profiles/ (direktori
+dan arsip .zip) yang dapat dilampirkan pada laporan bug.
+"""
+import logging
+import os
+import sys
+import json
+import time
+import atexit
+import shutil
+import platform
+import threading
+import functools
+from datetime import datetime
+
+from app_config import CONFIG_DIR
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PROFILES_DIR = os.path.join(CONFIG_DIR, "profiles")
+
+ENV_VAR = "EDUBOT_PROFILE"
+
+# Mode yang dikenal; "1"/"on" berarti mode bawaan berbiaya rendah
+MODES = ("stages", "sample", "cprofile", "tracemalloc")
+DEFAULT_MODES = ("stages", "sample", "tracemalloc")
+
+# Interval sampling (ms), dapat diubah dengan EDUBOT_PROFILE_INTERVAL_MS
+DEFAULT_SAMPLE_INTERVAL_MS = 10
+
+# Kedalaman stack per sampel dan jumlah frame tracemalloc per alokasi
+MAX_SAMPLE_DEPTH = 40
+TRACEMALLOC_FRAMES = 10
+
+# Jumlah baris teratas di laporan teks
+REPORT_LINES = 40
+
+def _parse_modes(value):
+    """
+    Membaca mode dari nilai EDUBOT_PROFILE
+
+    Returns:
+        tuple: Mode aktif (kosong jika profiling mati)
+    """
+    value = (value or "").strip().lower()
+    if value in ("", "0", "off", "false", "no"):
+        return ()
+    if value in ("1", "on", "true", "yes"):
+        return DEFAULT_MODES
+    modes = {"stages"}
+    for name in value.split(","):
+        name = name.strip()
+        if name in MODES:
+            modes.add(name)
+        elif name:
+            logger.warning("Mode %s tidak dikenal diabaikan: %s", ENV_VAR, name)
+    # tracemalloc selalu disertakan agar bundel memuat gambaran memori
+    modes.add("tracemalloc")
+    return tuple(mode for mode in MODES if mode in modes)
+
+class ProfileSession:
+    """Pengumpul data profiling untuk satu sesi aplikasi"""
+
+    def __init__(self, modes, interval_ms=DEFAULT_SAMPLE_INTERVAL_MS):
+        """
+        Inisialisasi sesi profiling
+
+        Args:
+            modes (tuple): Mode aktif (lihat MODES)
+            interval_ms (int, optional): Interval sampling. Defaults to DEFAULT_SAMPLE_INTERVAL_MS.
+        """
+        self.modes = modes
+        self.interval = max(1, interval_ms) / 1000.0
+        self.started = None
+        self._started_at = None
+
+        self._lock = threading.Lock()
+        # Nama tahap -> [jumlah, total detik, maksimum detik]
+        self._stages = {}
+
+        # cProfile hanya dijalankan untuk satu tahap terluar dalam satu waktu
+        self._profiler = None
+        self._profiler_lock = threading.Lock()
+        self._profiler_owner = threading.local()
+
+        # Stack terlipat ("a;b;c") -> jumlah sampel
+        self._samples = {}
+        self._sample_count = 0
+        self._stopped = threading.Event()
+        self._sampler = None
+
+        self._baseline = None
+        self._written = None
+
+    def start(self):
+        """Mulai mengumpulkan data dan menulis bundel saat aplikasi keluar"""
+        if self.started is not None:
+            return
+        self.started = datetime.now()
+        self._started_at = time.perf_counter()
+
+        if "cprofile" in self.modes:
+            import cProfile
+            self._profiler = cProfile.Profile()
+        if "tracemalloc" in self.modes:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._baseline = tracemalloc.take_snapshot()
+        if "sample" in self.modes:
+            self._sampler = threading.Thread(target=self._sample, name="edubot-profiler", daemon=True)
+            self._sampler.start()
+
+        registry.register_source("profile", self.stage_stats)
+        atexit.register(self.write_bundle)
+        logger.info("Profiling EduBot aktif (%s); bundel ditulis ke %s saat keluar", ', '.join(self.modes), PROFILES_DIR)
+
+    def record(self, name, elapsed):
+        """Mencatat durasi satu pemanggilan tahap"""
+        with self._lock:
+            entry = self._stages.get(name)
+            if entry is None:
+                self._stages[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+
+    def stage_stats(self):
+        """
+        Statistik per tahap untuk diagnostik dan bundel
+
+        Returns:
+            dict: "<tahap>.count", "<tahap>.total_ms", "<tahap>.mean_ms", "<tahap>.max_ms"
+        """
+        with self._lock:
+            stages = {name: list(entry) for name, entry in self._stages.items()}
+        result = {}
+        for name, (count, total, worst) in sorted(stages.items()):
+            result[f"{name}.count"] = count
+            result[f"{name}.total_ms"] = round(total * 1000, 1)
+            result[f"{name}.mean_ms"] = round(total * 1000 / count, 2)
+            result[f"{name}.max_ms"] = round(worst * 1000, 1)
+        return result
+
+    def wrap(self, name, func):
+        """Membungkus fungsi agar durasinya dicatat sebagai tahap name"""
+        session = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = session._enter_profiler()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                session.record(name, time.perf_counter() - start)
+                if profiler is not None:
+                    profiler.disable()
+                    session._profiler_owner.active = False
+                    session._profiler_lock.release()
+        return wrapper
+
+    def _enter_profiler(self):
+        """Menyalakan cProfile untuk tahap terluar jika tidak ada tahap lain yang sedang diprofil"""
+        profiler = self._profiler
+        if profiler is None or self.started is None:
+            return None
+        # Tahap bersarang di thread yang sama sudah tercakup oleh tahap luarnya
+        if getattr(self._profiler_owner, "active", False):
+            return None
+        if not self._profiler_lock.acquire(blocking=False):
+            return None
+        self._profiler_owner.active = True
+        profiler.enable()
+        return profiler
+
+    def _sample(self):
+        """Thread sampling: mencatat stack semua thread setiap interval"""
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            with self._lock:
+                self._sample_count += 1
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None and len(stack) < MAX_SAMPLE_DEPTH:
+                        code = frame.f_code
+                        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    key = ";".join(reversed(stack))
+                    self._samples[key] = self._samples.get(key, 0) + 1
+
+    def write_bundle(self, directory=PROFILES_DIR):
+        """
+        Menulis bundel profiling (dipanggil otomatis saat aplikasi keluar)
+
+        Args:
+            directory (str, optional): Direktori induk bundel. Defaults to PROFILES_DIR.
+
+        Returns:
+            str: Lokasi arsip .zip bundel, atau None jika gagal
+        """
+        if self.started is None:
+            return None
+        if self._written is not None:
+            return self._written
+        self._stopped.set()
+        if self._profiler is not None:
+            # Tunggu tahap yang sedang diprofil selesai agar statistik konsisten
+            self._profiler_lock.acquire(timeout=1.0)
+
+        path = os.path.join(directory, f"{self.started:%Y%m%d-%H%M%S}-{os.getpid()}")
+        try:
+            os.makedirs(path, exist_ok=True)
+            self._write_summary(path)
+            if self._profiler is not None:
+                self._write_cprofile(path)
+            if self._sampler is not None:
+                self._write_samples(path)
+            if self._baseline is not None:
+                self._write_tracemalloc(path)
+            self._written = shutil.make_archive(path, "zip", path)
+        except Exception as e:
+            logger.error("Error saat menulis bundel profiling: %s", e)
+            return None
+
+        logger.info("Bundel profiling EduBot: %s", self._written)
+        return self._written
+
+    def _write_summary(self, path):
+        """summary.json dan stages.txt: waktu per tahap, lingkungan, dan snapshot metrik"""
+        stats = self.stage_stats()
+        summary = {
+            "created": self.started.isoformat(timespec="seconds"),
+            "duration_s": round(time.perf_counter() - self._started_at, 1),
+            "modes": list(self.modes),
+            "python": sys.version,
+            "platform": platform.platform(),
+            "argv": sys.argv,
+            "stages": stats,
+            "metrics": {key: value for key, value in registry.snapshot().items() if not key.startswith("profile.")},
+        }
+        with open(os.path.join(path, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+
+        with self._lock:
+            stages = sorted(self._stages.items(), key=lambda item: item[1][1], reverse=True)
+        lines = [f"{'tahap':<32} {'jumlah':>8} {'total ms':>12} {'rata ms':>10} {'maks ms':>10}"]
+        for name, (count, total, worst) in stages:
+            lines.append(
+                f"{name:<32} {count:>8} {total * 1000:>12.1f} {total * 1000 / count:>10.2f} {worst * 1000:>10.1f}"
+            )
+        with open(os.path.join(path, "stages.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _write_cprofile(self, path):
+        """cprofile.pstats (untuk pstats/snakeviz) dan ringkasan teks berdasarkan waktu kumulatif"""
+        import io
+        import pstats
+
+        self._profiler.disable()
+        self._profiler.dump_stats(os.path.join(path, "cprofile.pstats"))
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=output)
+        stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+        with open(os.path.join(path, "cprofile.txt"), "w", encoding="utf-8") as f:
+            f.write(output.getvalue())
+
+    def _write_samples(self, path):
+        """samples.txt dalam format stack terlipat (dapat dibuka dengan flamegraph.pl/speedscope)"""
+        self._sampler.join(timeout=1.0)
+        with self._lock:
+            samples = sorted(self._samples.items(), key=lambda item: item[1], reverse=True)
+            count = self._sample_count
+        with open(os.path.join(path, "samples.txt"), "w", encoding="utf-8") as f:
+            for stack, hits in samples:
+                f.write(f"{stack} {hits}\n")
+        with open(os.path.join(path, "samples_info.json"), "w", encoding="utf-8") as f:
+            json.dump({"interval_ms": self.interval * 1000, "ticks": count}, f, indent=2)
+
+    def _write_tracemalloc(self, path):
+        """tracemalloc.txt: alokasi terbesar dan pertumbuhan sejak profiling dimulai"""
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [f"Dilacak: {current / 1024 / 1024:.1f} MB, puncak: {peak / 1024 / 1024:.1f} MB", ""]
+        lines.append(f"Alokasi terbesar ({REPORT_LINES} baris teratas):")
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:REPORT_LINES])
+        lines.append("")
+        lines.append("Pertumbuhan sejak profiling dimulai:")
+        lines.extend(str(stat) for stat in snapshot.compare_to(self._baseline, "lineno")[:REPORT_LINES])
+        lines.append("")
+        lines.append("Traceback alokasi terbesar:")
+        for stat in snapshot.statistics("traceback")[:3]:
+            lines.append(f"{stat.count} blok, {stat.size / 1024:.1f} KiB")
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+        with open(os.path.join(path, "tracemalloc.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+def _interval_ms():
+    """Interval sampling dari EDUBOT_PROFILE_INTERVAL_MS"""
+    try:
+        return int(os.environ.get(f"{ENV_VAR}_INTERVAL_MS", DEFAULT_SAMPLE_INTERVAL_MS))
+    except ValueError:
+        return DEFAULT_SAMPLE_INTERVAL_MS
+
+# Dibaca sekali saat modul dimuat; None berarti profiling mati
+_modes = _parse_modes(os.environ.get(ENV_VAR))
+session = ProfileSession(_modes, _interval_ms()) if _modes else None
+
+def enabled():
+    """Memeriksa apakah profiling diaktifkan lewat EDUBOT_PROFILE"""
+    return session is not None
+
+def start():
+    """Memulai profiling jika diaktifkan (dipanggil sekali oleh main)"""
+    if session is not None:
+        session.start()
+
+def stage(name):
+    """
+    Dekorator yang menandai fungsi sebagai satu tahap yang diukur
+
+    Saat profiling mati, fungsi dikembalikan apa adanya (tanpa pembungkus).
+
+    Args:
+        name (str): Nama tahap, misalnya "provider.call" atau "render.append"
+    """
+    def decorate(func):
+        if session is None:
+            return func
+        return session.wrap(name, func)
+    return decorate
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul validasi skrip untuk EduBot
+Memeriksa sintaks skrip hasil AI secara lokal (bash -n, compile(), shellcheck) di pool proses
+"""
+import re
+import shutil
+import threading
+import subprocess
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Hasil validasi satu kandidat skrip
+ValidationResult = namedtuple("ValidationResult", ["index", "script", "valid", "checked", "messages"])
+
+# Batas waktu setiap pemeriksa eksternal (detik)
+CHECK_TIMEOUT = 10
+
+_CODE_BLOCK_RE = re.compile(r'```(?:bash|sh|python|powershell)?\n(.*?)```', re.DOTALL)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def extract_script(response):
+    """
+    Mengambil isi blok kode pertama dari respons AI
+
+    Args:
+        response (str): Respons lengkap dari AI
+
+    Returns:
+        str: Skrip di dalam blok kode, atau seluruh respons jika tidak ada blok kode
+    """
+    code_blocks = _CODE_BLOCK_RE.findall(response)
+    if code_blocks:
+        return code_blocks[0].strip()
+    return response.strip()
+
+def check_script(script, script_type):
+    """
+    Memeriksa sintaks satu skrip (dijalankan di proses pekerja)
+
+    Args:
+        script (str): Isi skrip
+        script_type (str): Jenis skrip ("bash", "python", "powershell")
+
+    Returns:
+        tuple: (valid, diperiksa, daftar pesan) - diperiksa False jika tidak ada pemeriksa untuk jenis ini
+    """
+    messages = []
+
+    if script_type == "python":
+        try:
+            compile(script, "<skrip>", "exec")
+        except SyntaxError as e:
+            return False, True, [f"Baris {e.lineno}: {e.msg}"]
+        return True, True, messages
+
+    if script_type == "bash":
+        bash = shutil.which("bash")
+        if not bash:
+            return True, False, ["bash tidak ditemukan, sintaks tidak diperiksa"]
+
+        try:
+            result = subprocess.run(
+                [bash, "-n"], input=script, capture_output=True, text=True, timeout=CHECK_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:
+            return False, True, ["Pemeriksaan bash -n melebihi batas waktu"]
+        if result.returncode != 0:
+            return False, True, result.stderr.strip().splitlines() or ["bash -n gagal"]
+
+        # shellcheck bersifat opsional; hanya temuan tingkat error yang menggagalkan kandidat
+        shellcheck = shutil.which("shellcheck")
+        if shellcheck:
+            try:
+                result = subprocess.run(
+                    [shellcheck, "--shell=bash", "--severity=error", "--format=gcc", "-"],
+                    input=script, capture_output=True, text=True, timeout=CHECK_TIMEOUT
+                )
+                if result.returncode != 0 and result.stdout.strip():
+                    return False, True, result.stdout.strip().splitlines()
+            except subprocess.TimeoutExpired:
+                messages.append("shellcheck melebihi batas waktu, dilewati")
+        return True, True, messages
+
+    # Belum ada pemeriksa lokal untuk jenis skrip lain (misalnya PowerShell)
+    return True, False, [f"Tidak ada pemeriksa sintaks lokal untuk {script_type}"]
+
+def validate_candidates(scripts, script_type):
+    """
+    Memvalidasi beberapa kandidat skrip secara paralel di pool proses
+
+    Args:
+        scripts (list): Daftar isi skrip
+        script_type (str): Jenis skrip
+
+    Returns:
+        list: Daftar ValidationResult sesuai urutan kandidat
+    """
+    if not scripts:
+        return []
+
+    executor = _get_executor()
+    futures = [executor.submit(check_script, script, script_type) for script in scripts]
+
+    results = []
+    for index, (script, future) in enumerate(zip(scripts, futures)):
+        try:
+            valid, checked, messages = future.result()
+        except Exception as e:
+            valid, checked, messages = True, False, [f"Validasi gagal dijalankan: {e}"]
+        results.append(ValidationResult(index, script, valid, checked, messages))
+    return results
+
+def _get_executor():
+    """Membuat pool proses sekali saja dan memakainya kembali"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn" aman dipakai dari aplikasi Qt yang memiliki banyak thread
+            _executor = ProcessPoolExecutor(
+                max_workers=min(4, multiprocessing.cpu_count()),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul indeks pencarian percakapan untuk EduBot
+Menyimpan pasangan pertanyaan/jawaban dari semua tab dan mencarinya dengan BM25 (SQLite FTS5)
+"""
+import logging
+import os
+import re
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+from app_config import CONFIG_DIR
+
+logger = logging.getLogger(__name__)
+
+# Lokasi database indeks
+INDEX_FILE = os.path.join(CONFIG_DIR, "history.db")
+
+# Bobot BM25 untuk kolom (pertanyaan, jawaban): kecocokan di pertanyaan lebih penting
+QUESTION_WEIGHT = 2.0
+ANSWER_WEIGHT = 1.0
+
+# Hasil pencarian
+SearchResult = namedtuple(
+    "SearchResult",
+    ["exchange_id", "provider", "session_id", "question", "answer", "created", "score", "snippet"]
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text):
+    """
+    Memecah teks menjadi token kata huruf kecil
+
+    Args:
+        text (str): Teks yang akan dipecah
+
+    Returns:
+        list: Daftar token
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+class ConversationIndex:
+    """Indeks lokal untuk semua giliran pengguna/asisten yang pernah tersimpan"""
+
+    def __init__(self, db_path=INDEX_FILE):
+        """
+        Inisialisasi indeks dan membuat tabel jika belum ada
+
+        Args:
+            db_path (str, optional): Lokasi file database. Defaults to INDEX_FILE.
+        """
+        self.db_path = db_path
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            if db_path != ":memory:":
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+            # Koneksi dipakai bersama oleh thread pekerja, akses dilindungi lock
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS exchanges ("
+                "id INTEGER PRIMARY KEY, provider TEXT, session_id TEXT, "
+                "question TEXT, answer TEXT, created REAL)"
+            )
+            # Tabel FTS5 dengan konten eksternal agar teks tidak disimpan dua kali,
+            # indeks prefiks membuat pencarian saat mengetik tetap cepat
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS exchanges_fts USING fts5("
+                "question, answer, session_id UNINDEXED, content='exchanges', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            self._conn.commit()
+            self.enabled = True
+        except sqlite3.Error as e:
+            # FTS5 tidak tersedia atau database tidak bisa dibuka, indeks dinonaktifkan
+            logger.error("Error saat menginisialisasi indeks pencarian: %s", e)
+
+    def add_exchange(self, provider, session_id, question, answer):
+        """
+        Menambahkan satu pasangan pertanyaan/jawaban ke indeks (inkremental)
+
+        Args:
+            provider (str): Provider AI yang menjawab
+            session_id (str): ID sesi/tab asal percakapan
+            question (str): Pertanyaan pengguna
+            answer (str): Jawaban asisten
+        """
+        if not self.enabled:
+            return
+
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "INSERT INTO exchanges (provider, session_id, question, answer, created) VALUES (?, ?, ?, ?, ?)",
+                    (provider, session_id, question, answer, time.time())
+                )
+                self._conn.execute(
+                    "INSERT INTO exchanges_fts (rowid, question, answer, session_id) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, question, answer, session_id)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Error saat menambahkan ke indeks pencarian: %s", e)
+
+    def search(self, query, limit=20, session_id=None, match_any=False, column=None):
+        """
+        Mencari percakapan yang relevan dengan peringkat BM25
+
+        Args:
+            query (str): Teks pencarian
+            limit (int, optional): Jumlah hasil maksimum. Defaults to 20.
+            session_id (str, optional): Batasi ke sesi tertentu. Defaults to None.
+            match_any (bool, optional): True untuk mencocokkan salah satu kata (OR),
+                False untuk semua kata dengan prefiks pada kata terakhir. Defaults to False.
+            column (str, optional): Batasi ke kolom "question" atau "answer". Defaults to None.
+
+        Returns:
+            list: Daftar SearchResult, yang paling relevan lebih dulu
+        """
+        if not self.enabled:
+            return []
+
+        match = self._build_match(query, match_any)
+        if not match:
+            return []
+        if column in ("question", "answer"):
+            match = f"{column} : ({match})"
+
+        # Peringkat dihitung pada tabel FTS saja; baris lengkap hanya diambil untuk hasil teratas
+        inner = "SELECT rowid, bm25(exchanges_fts, ?, ?) AS score FROM exchanges_fts WHERE exchanges_fts MATCH ?"
+        params = [QUESTION_WEIGHT, ANSWER_WEIGHT, match]
+        if session_id:
+            inner += " AND session_id = ?"
+            params.append(session_id)
+        inner += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        sql = (
+            "SELECT e.id, e.provider, e.session_id, e.question, e.answer, e.created, "
+            f"ranked.score, substr(e.answer, 1, 160) FROM ({inner}) ranked "
+            "JOIN exchanges e ON e.id = ranked.rowid ORDER BY ranked.score"
+        )
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Error saat mencari di indeks: %s", e)
+            return []
+
+        return [SearchResult(*row) for row in rows]
+
+    def suggest_answer(self, question, session_id=None, min_overlap=0.8):
+        """
+        Mencari jawaban lama untuk pertanyaan yang hampir sama
+
+        Args:
+            question (str): Pertanyaan baru dari pengguna
+            session_id (str, optional): Batasi ke sesi tertentu. Defaults to None.
+            min_overlap (float, optional): Kemiripan kata minimum (Jaccard). Defaults to 0.8.
+
+        Returns:
+            SearchResult: Hasil terbaik, atau None jika tidak ada yang cukup mirip
+        """
+        tokens = set(tokenize(question))
+        if not tokens:
+            return None
+
+        # Ambil kandidat dengan BM25 lalu saring dengan kemiripan kata
+        for result in self.search(question, limit=10, session_id=session_id, match_any=True, column="question"):
+            candidate = set(tokenize(result.question))
+            overlap = len(tokens & candidate) / len(tokens | candidate)
+            if overlap >= min_overlap:
+                return result
+
+        return None
+
+    def count(self):
+        """Mengembalikan jumlah pasangan percakapan dalam indeks"""
+        if not self.enabled:
+            return 0
+
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+
+    def close(self):
+        """Menutup koneksi database"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+            self.enabled = False
+
+    def _build_match(self, query, match_any):
+        """Membangun ekspresi MATCH FTS5 yang aman dari teks bebas"""
+        tokens = tokenize(query)
+        if not tokens:
+            return ""
+
+        # Setiap token dikutip agar karakter khusus FTS5 tidak diinterpretasikan
+        quoted = [f'"{token}"' for token in tokens]
+        if match_any:
+            return " OR ".join(quoted)
+
+        # Prefiks pada kata terakhir agar hasil muncul saat pengguna masih mengetik;
+        # kata yang sangat pendek dicocokkan utuh karena prefiksnya terlalu luas
+        if len(tokens[-1]) >= 3:
+            quoted[-1] += "*"
+        return " ".join(quoted)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul cache penjelasan per bagian kode untuk EduBot
+Menyimpan penjelasan setiap bagian (fungsi/kelas) berdasarkan isi bagian tersebut, sehingga
+saat kode yang sudah dijelaskan diedit, hanya bagian yang berubah yang diminta ulang ke AI
+"""
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+from metrics import registry
+
+# Nilai bawaan yang dapat diubah melalui bagian "code_sections" di config.json
+DEFAULT_MAX_ENTRIES = 500
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+def section_key(text, *context):
+    """
+    Kunci cache untuk isi satu bagian kode
+
+    Spasi di akhir baris dan baris kosong diabaikan agar perubahan format saja tidak
+    membuat bagian dijelaskan ulang; indentasi tetap dihitung.
+
+    Args:
+        text (str): Isi bagian kode
+        *context: Nilai lain yang memengaruhi penjelasan (misalnya provider dan model)
+
+    Returns:
+        str: Hash heksadesimal
+    """
+    normalized = _BLANK_LINES_RE.sub("\n", _TRAILING_SPACE_RE.sub("", text)).strip("\n")
+    digest = hashlib.sha1()
+    for value in context:
+        digest.update(str(value).encode("utf-8") + b"\0")
+    digest.update(normalized.encode("utf-8"))
+    return digest.hexdigest()
+
+class SectionCache:
+    """Cache LRU penjelasan per bagian kode, aman digunakan dari banyak thread"""
+
+    def __init__(self, config=None):
+        """
+        Inisialisasi cache
+
+        Args:
+            config (dict, optional): Bagian "code_sections" dari config.json. Defaults to None.
+        """
+        config = config or {}
+        self.max_entries = config.get("max_entries", DEFAULT_MAX_ENTRIES)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        registry.register_source("code_sections", self.stats)
+
+    def get(self, key):
+        """Penjelasan tersimpan untuk kunci, atau None"""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        """Menyimpan penjelasan; entri yang paling lama tidak dipakai dibuang jika penuh"""
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Menghapus semua penjelasan tersimpan"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Jumlah entri, hit, dan miss
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul cache semantik untuk EduBot
+Mengenali pertanyaan yang hampir sama (misalnya "apa fungsi ls -la" dan "jelaskan ls -la")
+dengan vektor TF-IDF n-gram karakter yang dihitung lokal di CPU
+"""
+import re
+import math
+import time
+import hashlib
+import threading
+from collections import OrderedDict, Counter
+
+from metrics import registry
+
+# Nilai bawaan yang dapat diubah melalui bagian "semantic_cache" di config.json
+DEFAULT_THRESHOLD = 0.82
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Ambang bawaan per tab; kode dan skrip butuh kecocokan hampir persis
+DEFAULT_THRESHOLDS = {
+    "code_explanation": 0.97,
+    "script_generation": 0.95,
+}
+
+NGRAM_SIZES = (3, 4)
+
+# Kata tanya/perintah yang tidak mengubah inti pertanyaan ("apa fungsi", "jelaskan", ...)
+STOPWORDS = frozenset("""
+    apa apakah itu fungsi kegunaan guna arti maksud jelaskan jelasin terangkan tolong dong
+    bagaimana gimana cara caranya yang untuk dengan dari di ke dan atau ini adalah
+    saya aku mau ingin bisa minta berikan kasih penjelasan tentang mengenai perintah
+    what is are does do the a an how explain about please
+""".split())
+
+_NORMALIZE_RE = re.compile(r"[^\w\s\-./]+", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize(text):
+    """
+    Menormalkan teks: huruf kecil, tanda baca umum dan kata tanya dihapus
+
+    Args:
+        text (str): Pertanyaan asli
+
+    Returns:
+        str: Inti pertanyaan, atau teks lengkap jika semua kata adalah kata tanya
+    """
+    words = _SPACE_RE.sub(" ", _NORMALIZE_RE.sub(" ", text.lower())).strip().split()
+    core = [word for word in words if word not in STOPWORDS]
+    return " ".join(core or words)
+
+def vectorize(text):
+    """
+    Mengubah teks menjadi vektor frekuensi n-gram karakter (per kata)
+
+    Args:
+        text (str): Teks yang sudah dinormalkan
+
+    Returns:
+        Counter: Fitur n-gram ke frekuensi
+    """
+    features = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(max(1, len(padded) - size + 1)):
+                features[padded[i:i + size]] += 1
+    return features
+
+def key_terms(text):
+    """
+    Mengambil istilah teknis (opsi, path, angka) yang harus sama persis
+
+    Pertanyaan "ls -la" dan "ls -lh" sangat mirip secara karakter, tetapi maknanya berbeda.
+
+    Args:
+        text (str): Teks yang sudah dinormalkan
+
+    Returns:
+        frozenset: Istilah yang mengandung karakter selain huruf
+    """
+    return frozenset(word for word in text.split() if not word.isalpha())
+
+def _history_digest(history):
+    """
+    Bagian riwayat dari konteks cache
+
+    Args:
+        history (tuple): Sidik jari riwayat (panjang, hash pesan terakhir), atau None
+
+    Returns:
+        str: Digest pendek, atau "" untuk giliran pertama (riwayat kosong)
+    """
+    if not history or not history[0]:
+        return ""
+    return hashlib.sha1(repr(history).encode("utf-8")).hexdigest()[:12]
+
+class _Entry:
+    """Satu jawaban dalam cache"""
+
+    __slots__ = ("context", "history", "text", "vector", "terms", "answer", "created")
+
+    def __init__(self, context, history, text, vector, terms, answer):
+        self.context = context
+        self.history = history
+        self.text = text
+        self.vector = vector
+        self.terms = terms
+        self.answer = answer
+        self.created = time.time()
+
+class SemanticCache:
+    """Cache jawaban berbasis kemiripan untuk ledakan pertanyaan serupa di kelas"""
+
+    def __init__(self, config=None):
+        """
+        Inisialisasi cache
+
+        Args:
+            config (dict, optional): Bagian "semantic_cache" dari config.json. Defaults to None.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.default_threshold = config.get("threshold", DEFAULT_THRESHOLD)
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        self.thresholds.update(config.get("thresholds", {}))
+        self.max_entries = config.get("max_entries", DEFAULT_MAX_ENTRIES)
+        self.ttl = config.get("ttl", DEFAULT_TTL)
+
+        self._lock = threading.Lock()
+        # Urutan LRU atas semua entri: id -> _Entry
+        self._entries = OrderedDict()
+        self._next_id = 0
+        # Indeks terbalik per konteks: konteks -> fitur -> set id entri
+        self._postings = {}
+        # Entri per (konteks, teks ternormalisasi) agar pertanyaan yang sama tidak disimpan dua kali
+        self._by_text = {}
+        # Frekuensi dokumen per konteks untuk bobot IDF
+        self._doc_freq = {}
+        self._doc_count = Counter()
+
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+        registry.register_source("semantic_cache", self.stats)
+
+    def threshold_for(self, session_id):
+        """Mengembalikan ambang kemiripan untuk sesi/tab tertentu"""
+        return self.thresholds.get(session_id, self.default_threshold)
+
+    def lookup(self, session_id, system_prompt, text, history=None):
+        """
+        Mencari jawaban untuk pertanyaan yang cukup mirip dalam konteks yang sama
+
+        Pertanyaan lanjutan ("contohnya?") hanya cocok dengan jawaban yang diberikan
+        setelah riwayat percakapan yang sama.
+
+        Args:
+            session_id (str): ID sesi/tab
+            system_prompt (str): Prompt sistem yang digunakan (bagian dari konteks)
+            text (str): Pertanyaan pengguna
+            history (tuple, optional): Sidik jari riwayat sesi sebelum pertanyaan ini
+                (lihat BaseAPI.history_fingerprint). Defaults to None (giliran pertama).
+
+        Returns:
+            str: Jawaban yang tersimpan, atau None jika tidak ada yang cocok
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self.lookups += 1
+        entry_id = self._find(session_id, system_prompt, text, history)
+        if entry_id is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            self.hits += 1
+            self._entries.move_to_end(entry_id)
+            return entry.answer
+
+    def contains(self, session_id, system_prompt, text, history=None):
+        """
+        Memeriksa apakah ada jawaban yang cocok tanpa memengaruhi statistik dan urutan LRU
+
+        Args:
+            session_id (str): ID sesi/tab
+            system_prompt (str): Prompt sistem yang digunakan
+            text (str): Pertanyaan pengguna
+            history (tuple, optional): Sidik jari riwayat sesi. Defaults to None.
+
+        Returns:
+            bool: True jika lookup untuk pertanyaan ini akan menghasilkan hit
+        """
+        return self._find(session_id, system_prompt, text, history) is not None
+
+    def store(self, session_id, system_prompt, text, answer, history=None):
+        """
+        Menyimpan jawaban baru ke cache
+
+        Args:
+            session_id (str): ID sesi/tab
+            system_prompt (str): Prompt sistem yang digunakan
+            text (str): Pertanyaan pengguna
+            answer (str): Jawaban dari provider
+            history (tuple, optional): Sidik jari riwayat sesi sebelum pertanyaan dikirim.
+                Defaults to None.
+        """
+        if not self.enabled:
+            return
+
+        normalized = normalize(text)
+        if not normalized:
+            return
+
+        history = _history_digest(history)
+        context = self._context_key(session_id, system_prompt, history)
+        entry = _Entry(context, history, normalized, vectorize(normalized), key_terms(normalized), answer)
+
+        with self._lock:
+            existing_id = self._by_text.get((context, normalized))
+            if existing_id is not None:
+                # Pertanyaan yang sama persis: perbarui jawaban saja
+                existing = self._entries[existing_id]
+                existing.answer = answer
+                existing.created = entry.created
+                self._entries.move_to_end(existing_id)
+                return
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._by_text[(context, normalized)] = entry_id
+
+            postings = self._postings.setdefault(context, {})
+            doc_freq = self._doc_freq.setdefault(context, Counter())
+            for feature in entry.vector:
+                postings.setdefault(feature, set()).add(entry_id)
+                doc_freq[feature] += 1
+            self._doc_count[context] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def entries(self, first_turn_only=False):
+        """
+        Mengembalikan salinan semua entri yang masih berlaku
+
+        Args:
+            first_turn_only (bool, optional): Hanya jawaban giliran pertama (tanpa riwayat),
+                satu-satunya yang berguna di komputer lain. Defaults to False.
+
+        Returns:
+            list: Tuple (konteks, teks ternormalisasi, jawaban)
+        """
+        now = time.time()
+        with self._lock:
+            return [
+                (entry.context, entry.text, entry.answer)
+                for entry in self._entries.values()
+                if now - entry.created <= self.ttl and not (first_turn_only and entry.history)
+            ]
+
+    def clear(self):
+        """Mengosongkan cache"""
+        with self._lock:
+            self._entries.clear()
+            self._by_text.clear()
+            self._postings.clear()
+            self._doc_freq.clear()
+            self._doc_count.clear()
+
+    def stats(self):
+        """
+        Mengembalikan statistik cache untuk diagnostik
+
+        Returns:
+            dict: Jumlah entri, pencarian, hit, eviction, dan hit rate
+        """
+        with self._lock:
+            lookups, hits = self.lookups, self.hits
+            return {
+                "entries": len(self._entries),
+                "lookups": lookups,
+                "hits": hits,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def _find(self, session_id, system_prompt, text, history=None):
+        """Mencari id entri terbaik di atas ambang kemiripan, atau None"""
+        if not self.enabled:
+            return None
+
+        normalized = normalize(text)
+        if not normalized:
+            return None
+
+        context = self._context_key(session_id, system_prompt, _history_digest(history))
+        vector = vectorize(normalized)
+        terms = key_terms(normalized)
+        threshold = self.threshold_for(session_id)
+
+        with self._lock:
+            postings = self._postings.get(context)
+            if not postings:
+                return None
+
+            # Kandidat hanya entri yang berbagi minimal satu fitur
+            candidates = set()
+            for feature in vector:
+                candidates.update(postings.get(feature, ()))
+
+            idf = self._idf_function(context)
+            query_norm = self._norm(vector, idf)
+            now = time.time()
+            best_id, best_score = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry.terms != terms or now - entry.created > self.ttl:
+                    continue
+                score = self._cosine(vector, query_norm, entry.vector, idf)
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+        if best_id is None or best_score < threshold:
+            return None
+        return best_id
+
+    def _evict_oldest(self):
+        """Mengeluarkan entri yang paling lama tidak digunakan (lock harus dipegang)"""
+        entry_id, entry = self._entries.popitem(last=False)
+        self._by_text.pop((entry.context, entry.text), None)
+        postings = self._postings.get(entry.context, {})
+        doc_freq = self._doc_freq.get(entry.context, Counter())
+        for feature in entry.vector:
+            ids = postings.get(feature)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del postings[feature]
+            doc_freq[feature] -= 1
+            if doc_freq[feature] <= 0:
+                del doc_freq[feature]
+        self._doc_count[entry.context] -= 1
+        self.evictions += 1
+
+    def _context_key(self, session_id, system_prompt, history=None):
+        """Konteks cache: tab yang sama dengan prompt sistem dan riwayat yang sama"""
+        digest = hashlib.sha1((system_prompt or "").encode("utf-8")).hexdigest()[:12]
+        if history:
+            # Format tanpa riwayat tetap sama dengan kunci cache bersama (shared_cache.cache_key)
+            return f"{session_id}:{digest}:{history}"
+        return f"{session_id}:{digest}"
+
+    def _idf_function(self, context):
+        """Membuat fungsi IDF (dihaluskan) untuk konteks tertentu"""
+        doc_freq = self._doc_freq.get(context, {})
+        total = self._doc_count.get(context, 0)
+        return lambda feature: math.log((total + 1) / (doc_freq.get(feature, 0) + 1)) + 1.0
+
+    @staticmethod
+    def _norm(vector, idf):
+        """Panjang vektor TF-IDF"""
+        return math.sqrt(sum((count * idf(feature)) ** 2 for feature, count in vector.items()))
+
+    def _cosine(self, query, query_norm, other, idf):
+        """Kemiripan kosinus TF-IDF antara dua vektor frekuensi"""
+        other_norm = self._norm(other, idf)
+        if not query_norm or not other_norm:
+            return 0.0
+        dot = sum(count * other[feature] * idf(feature) ** 2
+                  for feature, count in query.items() if feature in other)
+        return dot / (query_norm * other_norm)
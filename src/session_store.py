@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul penyimpanan sesi untuk EduBot
+Menyimpan riwayat sesi yang tidak aktif ke disk agar tidak menetap di memori
+"""
+import logging
+import os
+import json
+import shutil
+import hashlib
+
+from app_config import CONFIG_DIR
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_DIR = os.path.join(CONFIG_DIR, "sessions")
+
+class SessionStore:
+    """Penyimpanan riwayat sesi per provider dalam berkas JSON"""
+
+    def __init__(self, provider, directory=SESSIONS_DIR, clear=True):
+        """
+        Inisialisasi penyimpanan sesi
+
+        Args:
+            provider (str): Provider AI, digunakan sebagai subdirektori
+            directory (str, optional): Direktori induk. Defaults to SESSIONS_DIR.
+            clear (bool, optional): Hapus sesi sisa dari jalannya aplikasi sebelumnya. Defaults to True.
+        """
+        self.directory = os.path.join(directory, provider)
+        if clear:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def save(self, session_id, messages):
+        """
+        Menyimpan riwayat sesi secara atomik
+
+        Args:
+            session_id (str): ID sesi
+            messages (list): Daftar pesan {"role", "content"}
+
+        Returns:
+            bool: True jika berhasil disimpan
+        """
+        path = self._path(session_id)
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"session_id": session_id, "messages": messages}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.error("Error saat menyimpan sesi %s: %s", session_id, e)
+            return False
+
+    def load(self, session_id, remove=True):
+        """
+        Memuat riwayat sesi dari disk
+
+        Args:
+            session_id (str): ID sesi
+            remove (bool, optional): Hapus berkas setelah dimuat. Defaults to True.
+
+        Returns:
+            list: Daftar pesan, atau None jika sesi tidak tersimpan
+        """
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                messages = json.load(f).get("messages", [])
+        except (OSError, ValueError) as e:
+            logger.error("Error saat memuat sesi %s: %s", session_id, e)
+            return None
+        if remove:
+            self.delete(session_id)
+        return messages
+
+    def delete(self, session_id):
+        """Menghapus sesi yang tersimpan"""
+        try:
+            os.remove(self._path(session_id))
+        except OSError:
+            pass
+
+    def count(self):
+        """Mengembalikan jumlah sesi yang tersimpan di disk"""
+        try:
+            return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+        except OSError:
+            return 0
+
+    def _path(self, session_id):
+        """Nama berkas aman untuk ID sesi apa pun"""
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.json")
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul cache jawaban bersama untuk EduBot
+Berkas cache tidak berubah (indeks + data) yang diterbitkan satu komputer guru ke share
+NFS/SMB atau alamat HTTP di LAN, lalu dibaca lewat mmap oleh semua komputer di lab
+"""
+import logging
+import os
+import mmap
+import time
+import struct
+import hashlib
+import threading
+import urllib.error
+import urllib.request
+from email.utils import formatdate
+
+from app_config import CONFIG_DIR
+from metrics import registry
+from semantic_cache import normalize
+
+logger = logging.getLogger(__name__)
+
+# Salinan lokal saat sumber berupa alamat HTTP
+DOWNLOAD_FILE = os.path.join(CONFIG_DIR, "shared_cache.bin")
+
+# Nilai bawaan yang dapat diubah melalui bagian "shared_cache" di config.json
+DEFAULT_CHECK_INTERVAL = 60
+
+# Format berkas:
+#   header : magic, versi format, generasi (waktu terbit), jumlah entri, offset indeks, offset data
+#   indeks : (hash kunci, offset, panjang) per entri, terurut menurut hash untuk pencarian biner
+#   data   : panjang kunci, kunci UTF-8, jawaban UTF-8 per entri
+MAGIC = b"EDUSHC\x00\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQIQQ")
+INDEX_ENTRY = struct.Struct("<QQI")
+RECORD_KEY_LENGTH = struct.Struct("<I")
+
+def cache_key(session_id, system_prompt, text):
+    """
+    Kunci entri cache bersama: tab, prompt sistem, dan pertanyaan yang dinormalkan
+
+    Args:
+        session_id (str): ID sesi/tab
+        system_prompt (str): Prompt sistem yang digunakan
+        text (str): Pertanyaan pengguna
+
+    Returns:
+        str: Kunci, atau None jika pertanyaan kosong setelah dinormalkan
+    """
+    normalized = normalize(text)
+    if not normalized:
+        return None
+    digest = hashlib.sha1((system_prompt or "").encode("utf-8")).hexdigest()[:12]
+    return entry_key(f"{session_id}:{digest}", normalized)
+
+def entry_key(context, normalized):
+    """
+    Kunci dari konteks dan teks yang sudah dinormalkan (format SemanticCache.entries)
+
+    Args:
+        context (str): Konteks cache ("<sesi>:<hash prompt sistem>")
+        normalized (str): Pertanyaan yang sudah dinormalkan
+
+    Returns:
+        str: Kunci entri
+    """
+    return f"{context}\n{normalized}"
+
+def read_entries(path):
+    """
+    Membaca semua entri dari berkas cache bersama yang sudah ada
+
+    Args:
+        path (str): Lokasi berkas
+
+    Returns:
+        list: Tuple (kunci, jawaban), kosong jika berkas tidak ada atau tidak valid
+    """
+    try:
+        snapshot = _Snapshot(path)
+    except (OSError, ValueError, struct.error):
+        return []
+    try:
+        return list(snapshot.items())
+    finally:
+        snapshot.close()
+
+def _key_hash(key):
+    """Hash 64-bit untuk indeks"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def publish(path, entries):
+    """
+    Menulis berkas cache bersama secara atomik
+
+    Berkas ditulis ke nama sementara di direktori yang sama lalu diganti dengan os.replace,
+    sehingga pembaca tidak pernah melihat berkas yang setengah tertulis.
+
+    Args:
+        path (str): Lokasi berkas (misalnya di share NFS/SMB)
+        entries (iterable): Tuple (kunci, jawaban); kunci dari cache_key
+
+    Returns:
+        int: Jumlah entri yang ditulis
+    """
+    records = {}
+    for key, answer in entries:
+        if key and answer:
+            records[key] = answer
+
+    index = []
+    data = bytearray()
+    for key, answer in records.items():
+        key_bytes = key.encode("utf-8")
+        record = RECORD_KEY_LENGTH.pack(len(key_bytes)) + key_bytes + answer.encode("utf-8")
+        index.append((_key_hash(key), len(data), len(record)))
+        data += record
+    index.sort()
+
+    index_offset = HEADER.size
+    data_offset = index_offset + INDEX_ENTRY.size * len(index)
+    generation = time.time_ns()
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, generation, len(index), index_offset, data_offset))
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(index)
+
+class _Snapshot:
+    """Satu versi berkas cache bersama yang dipetakan ke memori (hanya baca)"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.generation, self.count, self.index_offset, self.data_offset = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError("Bukan berkas cache bersama EduBot")
+        if version != FORMAT_VERSION:
+            self.map.close()
+            raise ValueError(f"Versi format cache bersama {version} tidak didukung")
+
+    def get(self, key):
+        """Mencari jawaban untuk kunci dengan pencarian biner atas indeks"""
+        target = _key_hash(key)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_hash = INDEX_ENTRY.unpack_from(self.map, self.index_offset + middle * INDEX_ENTRY.size)[0]
+            if entry_hash < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        # Beberapa entri bisa berbagi hash; bandingkan kuncinya
+        key_bytes = key.encode("utf-8")
+        while low < self.count:
+            entry_hash, offset, length = INDEX_ENTRY.unpack_from(self.map, self.index_offset + low * INDEX_ENTRY.size)
+            if entry_hash != target:
+                break
+            start = self.data_offset + offset
+            key_length = RECORD_KEY_LENGTH.unpack_from(self.map, start)[0]
+            key_start = start + RECORD_KEY_LENGTH.size
+            if self.map[key_start:key_start + key_length] == key_bytes:
+                return self.map[key_start + key_length:start + length].decode("utf-8")
+            low += 1
+        return None
+
+    def items(self):
+        """Menghasilkan semua pasangan (kunci, jawaban)"""
+        for position in range(self.count):
+            _, offset, length = INDEX_ENTRY.unpack_from(self.map, self.index_offset + position * INDEX_ENTRY.size)
+            start = self.data_offset + offset
+            key_length = RECORD_KEY_LENGTH.unpack_from(self.map, start)[0]
+            key_start = start + RECORD_KEY_LENGTH.size
+            yield (
+                self.map[key_start:key_start + key_length].decode("utf-8"),
+                self.map[key_start + key_length:start + length].decode("utf-8"),
+            )
+
+    def close(self):
+        self.map.close()
+
+class SharedCache:
+    """Pembaca cache jawaban bersama (hanya baca) yang mengikuti versi terbaru berkas"""
+
+    def __init__(self, config=None):
+        """
+        Inisialisasi pembaca cache bersama
+
+        Args:
+            config (dict, optional): Bagian "shared_cache" dari config.json. Defaults to None.
+                "source" berupa path berkas (misalnya di share NFS/SMB) atau alamat http(s).
+        """
+        config = config or {}
+        self.source = config.get("source")
+        self.enabled = bool(self.source) and config.get("enabled", True)
+        self.check_interval = config.get("check_interval", DEFAULT_CHECK_INTERVAL)
+        self.is_remote = bool(self.source) and self.source.startswith(("http://", "https://"))
+        self.path = DOWNLOAD_FILE if self.is_remote else self.source
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._last_check = None
+        self._downloading = False
+
+        self.lookups = 0
+        self.hits = 0
+        self.reloads = 0
+        self.errors = 0
+
+        registry.register_source("shared_cache", self.stats)
+
+    def lookup(self, session_id, system_prompt, text):
+        """
+        Mencari jawaban untuk pertanyaan yang sama persis (setelah dinormalkan)
+
+        Args:
+            session_id (str): ID sesi/tab
+            system_prompt (str): Prompt sistem yang digunakan
+            text (str): Pertanyaan pengguna
+
+        Returns:
+            str: Jawaban dari cache bersama, atau None
+        """
+        if not self.enabled:
+            return None
+        key = cache_key(session_id, system_prompt, text)
+        if key is None:
+            return None
+
+        snapshot = self._current()
+        with self._lock:
+            self.lookups += 1
+        if snapshot is None:
+            return None
+
+        answer = snapshot.get(key)
+        if answer is not None:
+            with self._lock:
+                self.hits += 1
+        return answer
+
+    def contains(self, session_id, system_prompt, text):
+        """Memeriksa apakah pertanyaan ada di cache bersama tanpa memengaruhi statistik"""
+        if not self.enabled:
+            return False
+        key = cache_key(session_id, system_prompt, text)
+        snapshot = self._current()
+        return key is not None and snapshot is not None and snapshot.get(key) is not None
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Generasi berkas, jumlah entri, pencarian, dan hit
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "enabled": self.enabled,
+                "generation": snapshot.generation if snapshot else 0,
+                "entries": snapshot.count if snapshot else 0,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "errors": self.errors,
+            }
+
+    def _current(self):
+        """Snapshot terbaru; memeriksa berkas baru paling sering sekali per check_interval"""
+        now = time.monotonic()
+        with self._lock:
+            due = self._last_check is None or now - self._last_check >= self.check_interval
+            if due:
+                self._last_check = now
+            snapshot = self._snapshot
+        if not due:
+            return snapshot
+
+        if self.is_remote:
+            # Unduhan berjalan di latar belakang; permintaan ini memakai versi yang sudah ada
+            self._start_download()
+        self._reload_if_changed()
+        with self._lock:
+            return self._snapshot
+
+    def _reload_if_changed(self):
+        """Memetakan ulang berkas jika sudah diganti dengan versi baru"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if self._snapshot is not None and self._snapshot.signature == signature:
+                return
+
+        try:
+            snapshot = _Snapshot(self.path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error("Error saat membaca cache bersama %s: %s", self.path, e)
+            with self._lock:
+                self.errors += 1
+            return
+
+        with self._lock:
+            # Snapshot lama tidak ditutup: pembaca lain mungkin masih memakainya, dan
+            # berkas lama tetap valid karena diganti lewat rename, bukan ditimpa
+            self._snapshot = snapshot
+            self.reloads += 1
+
+    def _start_download(self):
+        """Mengunduh berkas dari alamat HTTP jika berubah (di thread latar belakang)"""
+        with self._lock:
+            if self._downloading:
+                return
+            self._downloading = True
+        threading.Thread(target=self._download, daemon=True).start()
+
+    def _download(self):
+        """Unduhan bersyarat (If-Modified-Since) ke berkas sementara lalu os.replace"""
+        try:
+            request = urllib.request.Request(self.source)
+            if os.path.exists(self.path):
+                request.add_header("If-Modified-Since", formatdate(os.path.getmtime(self.path), usegmt=True))
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    tmp_path = f"{self.path}.tmp-{os.getpid()}"
+                    with open(tmp_path, "wb") as f:
+                        while True:
+                            chunk = response.read(64 * 1024)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                    os.replace(tmp_path, self.path)
+            except urllib.error.HTTPError as e:
+                if e.code != 304:
+                    raise
+                return
+            self._reload_if_changed()
+        except Exception as e:
+            logger.error("Error saat mengunduh cache bersama %s: %s", self.source, e)
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._downloading = False
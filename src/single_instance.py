@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul instance tunggal untuk EduBot
+Peluncuran pertama menjadi proses residen yang mendengarkan di Unix domain socket;
+peluncuran berikutnya hanya mengirim perintah ke socket itu lalu keluar.
+
+Modul ini sengaja hanya memakai pustaka standar agar peluncuran kedua tidak perlu
+memuat PyQt maupun SDK provider.
+
+Selain perintah satu baris, socket menerima permintaan JSON satu baris yang dijawab
+dengan beberapa baris JSON (lihat request), misalnya jawaban AI yang di-stream ke CLI.
+"""
+import logging
+import os
+import json
+import socket
+import threading
+
+from app_config import CONFIG_DIR
+
+logger = logging.getLogger(__name__)
+
+# Batas waktu menunggu balasan instance yang sedang berjalan (detik)
+DEFAULT_TIMEOUT = 2.0
+
+# Jumlah permintaan JSON yang dilayani bersamaan
+MAX_REQUESTS = 4
+
+COMMAND_SHOW = "show"
+
+def socket_path():
+    """
+    Lokasi socket instance untuk pengguna saat ini
+
+    $XDG_RUNTIME_DIR dipakai jika tersedia (dibersihkan saat logout), selain itu ~/.edubot.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "edubot.sock")
+    return os.path.join(CONFIG_DIR, "edubot.sock")
+
+def notify_running(command=COMMAND_SHOW, path=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Mengirim perintah ke instance EduBot yang sedang berjalan
+
+    Args:
+        command (str, optional): Perintah untuk instance residen. Defaults to COMMAND_SHOW.
+        path (str, optional): Lokasi socket. Defaults to socket_path().
+        timeout (float, optional): Batas waktu koneksi dan balasan. Defaults to DEFAULT_TIMEOUT.
+
+    Returns:
+        bool: True jika ada instance yang menerima perintah
+    """
+    path = path or socket_path()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(path)
+            client.sendall(command.encode("utf-8") + b"\n")
+            return client.recv(16).startswith(b"ok")
+    except OSError:
+        return False
+
+def request(payload, on_event, path=None, timeout=None):
+    """
+    Mengirim permintaan JSON ke instance yang berjalan dan membaca event balasannya
+
+    Args:
+        payload (dict): Permintaan, misalnya {"op": "ask", "text": "..."}
+        on_event (callable): Dipanggil dengan setiap event (dict) yang diterima
+        path (str, optional): Lokasi socket. Defaults to socket_path().
+        timeout (float, optional): Batas waktu menunggu setiap event. Defaults to tanpa batas.
+
+    Returns:
+        dict: Event terakhir ({"done": ...} atau {"error": ...})
+
+    Raises:
+        ConnectionError: Jika tidak ada instance yang berjalan atau koneksi terputus
+    """
+    path = path or socket_path()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.settimeout(DEFAULT_TIMEOUT)
+            client.connect(path)
+        except OSError as e:
+            raise ConnectionError(str(e)) from e
+        client.settimeout(timeout)
+        client.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+
+        with client.makefile("rb") as reader:
+            for line in reader:
+                event = json.loads(line)
+                on_event(event)
+                if "done" in event or "error" in event:
+                    return event
+    raise ConnectionError("Koneksi ke EduBot terputus sebelum jawaban selesai")
+
+class InstanceServer:
+    """Pendengar perintah dari peluncuran berikutnya di thread latar belakang"""
+
+    def __init__(self, on_command, path=None):
+        """
+        Inisialisasi server
+
+        Args:
+            on_command (callable): Dipanggil dengan nama perintah dari thread latar belakang
+            path (str, optional): Lokasi socket. Defaults to socket_path().
+        """
+        self.on_command = on_command
+        self.path = path or socket_path()
+        self._socket = None
+
+        # Dipanggil dengan (permintaan, send) di thread koneksi untuk permintaan JSON;
+        # send(event) mengirim satu event ke klien
+        self.on_request = None
+        self._request_slots = threading.BoundedSemaphore(MAX_REQUESTS)
+
+    def start(self):
+        """
+        Mulai mendengarkan di socket
+
+        Returns:
+            bool: False jika instance lain sudah mendengarkan di socket yang sama
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(self.path)
+        except OSError:
+            # Socket sisa proses yang berhenti tidak wajar tidak menjawab dan boleh dihapus
+            if notify_running("ping", self.path, timeout=0.5):
+                server.close()
+                return False
+            try:
+                os.unlink(self.path)
+                server.bind(self.path)
+            except OSError as e:
+                logger.error("Error saat membuka socket instance %s: %s", self.path, e)
+                server.close()
+                return False
+
+        os.chmod(self.path, 0o600)
+        server.listen(4)
+        self._socket = server
+        threading.Thread(target=self._serve, name="edubot-instance", daemon=True).start()
+        return True
+
+    def stop(self):
+        """Berhenti mendengarkan dan menghapus socket"""
+        server, self._socket = self._socket, None
+        if server is None:
+            return
+        server.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _serve(self):
+        """Menerima koneksi; setiap koneksi membawa satu perintah atau satu permintaan JSON"""
+        while self._socket is not None:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            try:
+                connection.settimeout(DEFAULT_TIMEOUT)
+                line = connection.makefile("rb").readline(1024 * 1024)
+            except OSError:
+                connection.close()
+                continue
+
+            if line.startswith(b"{"):
+                # Permintaan bisa lama (jawaban AI); layani di thread sendiri
+                threading.Thread(
+                    target=self._handle_request, args=(connection, line), name="edubot-request", daemon=True
+                ).start()
+                continue
+
+            with connection:
+                try:
+                    command = line.decode("utf-8", "replace").strip()
+                    if command and command != "ping":
+                        self.on_command(command)
+                    connection.sendall(b"ok\n")
+                except OSError:
+                    continue
+                except Exception as e:
+                    logger.error("Error saat memproses perintah instance: %s", e)
+
+    def _handle_request(self, connection, line):
+        """Melayani satu permintaan JSON dan mengirim event balasan sebagai baris JSON"""
+        closed = []
+
+        def send(event):
+            # Klien yang sudah pergi tidak menghentikan permintaan; jawabannya tetap di-cache
+            if closed:
+                return
+            try:
+                connection.sendall(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+            except OSError:
+                closed.append(True)
+
+        with connection:
+            connection.settimeout(None)
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                send({"error": "Permintaan tidak valid"})
+                return
+            if self.on_request is None:
+                send({"error": "EduBot belum siap menerima permintaan"})
+                return
+            if not self._request_slots.acquire(blocking=False):
+                send({"error": "EduBot sedang sibuk, coba lagi sebentar lagi"})
+                return
+            try:
+                self.on_request(payload, send)
+            except Exception as e:
+                logger.error("Error saat memproses permintaan instance: %s", e)
+                send({"error": str(e)})
+            finally:
+                self._request_slots.release()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul single-flight untuk EduBot
+Menggabungkan permintaan identik yang berjalan bersamaan menjadi satu panggilan API;
+potongan jawaban yang di-stream diteruskan ke semua pemanggil yang menunggu
+"""
+import threading
+
+from metrics import registry
+
+class _Call:
+    """Satu panggilan yang sedang berjalan beserta hasilnya"""
+
+    __slots__ = ("done", "result", "error", "waiters", "deltas", "changed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        # Potongan jawaban yang sudah diterima, untuk pemanggil yang ikut belakangan
+        self.deltas = []
+        self.changed = threading.Condition()
+
+class SingleFlight:
+    """Menjalankan paling banyak satu panggilan per kunci pada satu waktu"""
+
+    def __init__(self, name="singleflight"):
+        """
+        Inisialisasi single-flight
+
+        Args:
+            name (str, optional): Awalan nama metrik. Defaults to "singleflight".
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.saved = 0
+
+        registry.register_source(name, self.stats)
+
+    def do(self, key, fn, on_delta=None):
+        """
+        Menjalankan fn untuk kunci tertentu, atau menunggu panggilan yang sama yang sedang berjalan
+
+        Args:
+            key (hashable): Kunci permintaan (provider, model, konteks sesi, prompt)
+            fn (callable): Fungsi yang melakukan panggilan sebenarnya. Menerima emit, yang dipanggil
+                dengan setiap potongan jawaban jika panggilannya di-stream.
+            on_delta (callable, optional): Menerima setiap potongan jawaban, termasuk dari panggilan
+                pemanggil lain yang diikuti (potongan yang sudah lewat dikirim ulang lebih dulu).
+                Defaults to None.
+
+        Returns:
+            tuple: (hasil, shared) - shared bernilai True jika hasil berasal dari panggilan lain
+
+        Raises:
+            Exception: Kesalahan dari fn diteruskan ke semua pemanggil
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                # Permintaan identik sedang berjalan, tunggu hasilnya
+                call.waiters += 1
+                self.saved += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            if on_delta is None:
+                call.done.wait()
+            else:
+                self._follow(call, on_delta)
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        def emit(delta):
+            with call.changed:
+                call.deltas.append(delta)
+                call.changed.notify_all()
+            if on_delta is not None:
+                on_delta(delta)
+
+        try:
+            call.result = fn(emit)
+        except Exception as e:
+            call.error = e
+        finally:
+            # Hapus dari daftar sebelum memberi sinyal agar permintaan berikutnya memanggil ulang
+            with self._lock:
+                self._calls.pop(key, None)
+            with call.changed:
+                call.done.set()
+                call.changed.notify_all()
+
+        if call.error is not None:
+            raise call.error
+        return call.result, False
+
+    def _follow(self, call, on_delta):
+        """
+        Meneruskan potongan jawaban panggilan lain ke on_delta sampai panggilan itu selesai
+
+        on_delta dipanggil di thread pemanggil ini, sehingga penerima yang lambat tidak
+        memperlambat stream panggilan pertama.
+        """
+        sent = 0
+        while True:
+            with call.changed:
+                while len(call.deltas) == sent and not call.done.is_set():
+                    call.changed.wait()
+                pending = call.deltas[sent:]
+                finished = call.done.is_set()
+            sent += len(pending)
+            for delta in pending:
+                on_delta(delta)
+            if finished:
+                return
+
+    def in_flight(self):
+        """Mengembalikan jumlah panggilan yang sedang berjalan"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Jumlah panggilan yang dijalankan, dihemat, dan sedang berjalan
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "saved": self.saved,
+                "in_flight": len(self._calls),
+            }
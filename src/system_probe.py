@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul pemeriksaan sistem untuk EduBot
+Informasi sistem untuk tab Info Sistem dan sekumpulan pemeriksaan lokal baca-saja
+(disk, memori, paket, layanan, log) yang dapat dipanggil model lewat tool calling,
+sehingga model tidak perlu meminta siswa menjalankan perintah lalu menyalin hasilnya
+"""
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import platform
+import threading
+import subprocess
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Nilai bawaan yang dapat diubah melalui bagian "system_probe" di config.json
+DEFAULT_CACHE_TTL = 15
+DEFAULT_SESSIONS = ("system_help",)
+
+# Batas satu pemeriksaan: waktu jalan, panjang keluaran, dan jumlah baris log
+PROBE_TIMEOUT = 5
+MAX_OUTPUT_CHARS = 4000
+MAX_LOG_LINES = 50
+MAX_PARALLEL = 4
+
+# Nama paket dan unit systemd yang diterima; mencegah opsi atau pola glob disisipkan
+_PACKAGE_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9+._-]{0,127}$")
+_UNIT_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9@:._-]{0,127}$")
+
+# Berkas log teks yang boleh dibaca, jika journald tidak tersedia
+LOG_FILES = {
+    "syslog": ("/var/log/syslog", "/var/log/messages"),
+    "kernel": ("/var/log/kern.log",),
+}
+
+class ProbeError(Exception):
+    """Argumen pemeriksaan tidak valid atau pemeriksaan tidak dapat dijalankan"""
+
+def system_info_text():
+    """
+    Informasi sistem dalam format teks biasa
+
+    Returns:
+        str: Sistem operasi, kernel, distribusi, CPU, dan total RAM (satu per baris)
+    """
+    info = []
+
+    # Informasi dasar
+    info.append(f"Sistem Operasi: {platform.system()} {platform.release()}")
+    info.append(f"Versi OS: {platform.version()}")
+    info.append(f"Arsitektur: {platform.machine()}")
+    info.append(f"Nama Host: {platform.node()}")
+
+    # Untuk informasi lebih lanjut yang spesifik untuk Linux
+    if platform.system() == "Linux":
+        try:
+            info.append(f"Versi Kernel: {platform.release()}")
+
+            if os.path.exists("/etc/os-release"):
+                with open("/etc/os-release", "r") as f:
+                    for line in f:
+                        if line.startswith("PRETTY_NAME="):
+                            distro = line.split("=")[1].strip().strip('"')
+                            info.append(f"Distribusi: {distro}")
+                            break
+
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        info.append(f"CPU: {line.split(':', 1)[1].strip()}")
+                        break
+
+            with open("/proc/meminfo", "r") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        total_kb = int(line.split()[1])
+                        info.append(f"Total RAM: {total_kb / (1024 * 1024):.1f}Gi")
+                        break
+        except (OSError, ValueError, IndexError):
+            # Jika ada error, lewati
+            pass
+
+    return "\n".join(info)
+
+def _run(argv):
+    """Menjalankan perintah tanpa shell dan mengembalikan keluarannya"""
+    if shutil.which(argv[0]) is None:
+        raise ProbeError(f"Perintah {argv[0]} tidak tersedia di sistem ini")
+    try:
+        result = subprocess.run(
+            argv, capture_output=True, text=True, errors="replace", timeout=PROBE_TIMEOUT,
+            stdin=subprocess.DEVNULL
+        )
+    except subprocess.TimeoutExpired:
+        raise ProbeError(f"{argv[0]} tidak selesai dalam {PROBE_TIMEOUT} detik")
+    output = result.stdout.strip()
+    if result.returncode != 0 and result.stderr.strip():
+        output = (output + "\n" + result.stderr.strip()).strip()
+    return output or f"(tidak ada keluaran, kode keluar {result.returncode})"
+
+def _tail_file(paths, lines):
+    """Baris terakhir dari berkas pertama yang dapat dibaca"""
+    for path in paths:
+        try:
+            with open(path, "r", errors="replace") as f:
+                return "".join(deque(f, maxlen=lines)).rstrip()
+        except OSError:
+            continue
+    raise ProbeError("Berkas log tidak ditemukan atau tidak dapat dibaca")
+
+def disk_usage(path="/"):
+    """Pemakaian disk sistem berkas yang memuat path"""
+    if not isinstance(path, str) or not os.path.isabs(path) or not os.path.exists(path):
+        raise ProbeError("path harus berupa path absolut yang ada")
+    if shutil.which("df"):
+        return _run(["df", "-h", "--", path])
+    usage = shutil.disk_usage(path)
+    gib = 1024 ** 3
+    return f"{path}: total {usage.total / gib:.1f}G, terpakai {usage.used / gib:.1f}G, sisa {usage.free / gib:.1f}G"
+
+def memory_usage():
+    """Pemakaian memori dan swap"""
+    return _run(["free", "-h"])
+
+def package_status(name):
+    """Status instalasi dan versi satu paket (dpkg atau rpm)"""
+    if not isinstance(name, str) or not _PACKAGE_RE.match(name):
+        raise ProbeError("Nama paket tidak valid")
+    if shutil.which("dpkg-query"):
+        return _run(["dpkg-query", "-W", "-f=${Package} ${Version} ${db:Status-Status}\n", name])
+    return _run(["rpm", "-q", name])
+
+def service_status(name):
+    """Status unit systemd"""
+    if not isinstance(name, str) or not _UNIT_RE.match(name):
+        raise ProbeError("Nama layanan tidak valid")
+    return _run([
+        "systemctl", "show", "--no-pager",
+        "-p", "Id,Description,LoadState,ActiveState,SubState,UnitFileState,ActiveEnterTimestamp",
+        "--", name
+    ])
+
+def log_tail(source="journal", lines=20, unit=None):
+    """Baris terakhir log sistem: journal (opsional per unit), kernel, atau syslog"""
+    try:
+        lines = max(1, min(int(lines), MAX_LOG_LINES))
+    except (TypeError, ValueError):
+        raise ProbeError("lines harus berupa angka")
+    if unit is not None and (not isinstance(unit, str) or not _UNIT_RE.match(unit)):
+        raise ProbeError("Nama unit tidak valid")
+
+    if source in ("journal", "kernel") and shutil.which("journalctl"):
+        argv = ["journalctl", "--no-pager", "-q", "-n", str(lines)]
+        if source == "kernel":
+            argv.append("-k")
+        elif unit:
+            argv += ["-u", unit]
+        return _run(argv)
+    if source == "journal":
+        source = "syslog"
+    if source not in LOG_FILES:
+        raise ProbeError(f"Sumber log harus salah satu dari: journal, {', '.join(LOG_FILES)}")
+    return _tail_file(LOG_FILES[source], lines)
+
+# func: fungsi pemeriksaan; parameters: JSON Schema argumen seperti yang diminta tool calling
+Probe = namedtuple("Probe", ["name", "description", "parameters", "func"])
+
+def _schema(properties=None, required=()):
+    return {"type": "object", "properties": properties or {}, "required": list(required)}
+
+PROBES = {probe.name: probe for probe in (
+    Probe(
+        "disk_usage",
+        "Pemakaian disk (df -h) sistem berkas yang memuat path tertentu.",
+        _schema({"path": {"type": "string", "description": "Path absolut, bawaan \"/\""}}),
+        disk_usage,
+    ),
+    Probe(
+        "memory_usage",
+        "Pemakaian RAM dan swap (free -h).",
+        _schema(),
+        memory_usage,
+    ),
+    Probe(
+        "package_status",
+        "Apakah paket terpasang beserta versinya (dpkg-query atau rpm -q).",
+        _schema({"name": {"type": "string", "description": "Nama paket, misalnya \"python3\""}}, ["name"]),
+        package_status,
+    ),
+    Probe(
+        "service_status",
+        "Status layanan systemd (aktif, gagal, dimuat, diaktifkan saat boot).",
+        _schema({"name": {"type": "string", "description": "Nama unit, misalnya \"ssh\" atau \"cups.service\""}}, ["name"]),
+        service_status,
+    ),
+    Probe(
+        "log_tail",
+        f"Baris terakhir log sistem (paling banyak {MAX_LOG_LINES}).",
+        _schema({
+            "source": {"type": "string", "enum": ["journal", "kernel", "syslog"]},
+            "lines": {"type": "integer", "description": "Jumlah baris, bawaan 20"},
+            "unit": {"type": "string", "description": "Unit systemd untuk source journal (opsional)"},
+        }),
+        log_tail,
+    ),
+    Probe(
+        "system_info",
+        "Sistem operasi, distribusi, kernel, CPU, dan total RAM.",
+        _schema(),
+        system_info_text,
+    ),
+)}
+
+class ProbeRunner:
+    """
+    Menjalankan pemeriksaan yang diizinkan untuk tool calling
+
+    Hasil disimpan sebentar (cache_ttl detik) agar pertanyaan lanjutan atau beberapa
+    panggilan yang sama dalam satu giliran tidak menjalankan perintah berulang kali.
+    """
+
+    def __init__(self, config=None):
+        """
+        Inisialisasi runner
+
+        Args:
+            config (dict, optional): Bagian "system_probe" dari config.json, misalnya
+                {"enabled": true, "sessions": ["system_help", "terminal"], "tools": ["disk_usage"],
+                "cache_ttl": 15}. Defaults to None.
+        """
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.sessions = set(config.get("sessions", DEFAULT_SESSIONS))
+        self.ttl = config.get("cache_ttl", DEFAULT_CACHE_TTL)
+        allowed = config.get("tools")
+        self.probes = {name: probe for name, probe in PROBES.items() if allowed is None or name in allowed}
+
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+
+        registry.register_source("system_probe", self.stats)
+
+    def enabled_for(self, session_id):
+        """True jika model boleh memanggil pemeriksaan pada sesi/tab ini"""
+        return self.enabled and bool(self.probes) and session_id in self.sessions
+
+    def tool_specs(self):
+        """
+        Definisi alat dalam format tool calling OpenAI
+
+        Returns:
+            list: {"type": "function", "function": {"name", "description", "parameters"}}
+        """
+        return [
+            {
+                "type": "function",
+                "function": {"name": probe.name, "description": probe.description, "parameters": probe.parameters},
+            }
+            for probe in self.probes.values()
+        ]
+
+    def run(self, name, arguments=None):
+        """
+        Menjalankan satu pemeriksaan
+
+        Args:
+            name (str): Nama pemeriksaan
+            arguments (dict|str, optional): Argumen, boleh berupa string JSON dari model. Defaults to None.
+
+        Returns:
+            str: Keluaran pemeriksaan, atau pesan kesalahan untuk model
+        """
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except ValueError:
+                arguments = None
+        if not isinstance(arguments, dict):
+            return "Gagal: argumen harus berupa objek JSON"
+
+        probe = self.probes.get(name)
+        if probe is None:
+            return f"Gagal: alat {name} tidak tersedia"
+
+        key = (name, json.dumps(arguments, sort_keys=True))
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self.cache_hits += 1
+                return cached[1]
+
+        started = time.perf_counter()
+        try:
+            text = probe.func(**arguments)
+        except (ProbeError, TypeError, OSError) as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning("Pemeriksaan %s gagal: %s", name, e)
+            return f"Gagal: {e}"
+        if len(text) > MAX_OUTPUT_CHARS:
+            text = text[-MAX_OUTPUT_CHARS:] + "\n(keluaran dipotong)"
+        logger.info(
+            "Pemeriksaan %s %s", name, key[1],
+            extra={"elapsed_ms": round((time.perf_counter() - started) * 1000)}
+        )
+
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, text)
+            # Entri kedaluwarsa dibuang saat menyimpan agar cache tidak tumbuh terus
+            for old in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+                del self._cache[old]
+        return text
+
+    def run_all(self, calls):
+        """
+        Menjalankan beberapa pemeriksaan secara bersamaan
+
+        Args:
+            calls (list): Daftar (nama, argumen)
+
+        Returns:
+            list: Keluaran, dengan urutan yang sama dengan calls
+        """
+        if len(calls) <= 1:
+            return [self.run(name, arguments) for name, arguments in calls]
+        with ThreadPoolExecutor(max_workers=min(len(calls), MAX_PARALLEL)) as executor:
+            return list(executor.map(lambda call: self.run(*call), calls))
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Jumlah panggilan, hit cache, dan kegagalan
+        """
+        with self._lock:
+            return {"calls": self.calls, "cache_hits": self.cache_hits, "errors": self.errors}
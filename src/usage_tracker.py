@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul pencatatan pemakaian untuk EduBot
+Mencatat permintaan dan token per provider dan per API key, lalu mengatur laju permintaan
+agar tidak melewati batas per menit/per hari sebelum provider menolak dengan 429
+"""
+import logging
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import date, datetime, timedelta
+from collections import deque
+
+from app_config import CONFIG_DIR
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+USAGE_FILE = os.path.join(CONFIG_DIR, "usage.json")
+
+# Batas bawaan yang diketahui (rpm: permintaan/menit, tpm: token/menit, rpd: permintaan/hari).
+# Provider berbayar tanpa batas tetap tidak dicantumkan; semuanya dapat diubah lewat
+# bagian "usage" -> "limits" di config.json.
+DEFAULT_LIMITS = {
+    "gemini": {"rpm": 15, "tpm": 1000000, "rpd": 1500},
+}
+
+# Lama menunggu maksimum sebelum permintaan ditolak atau dialihkan (detik)
+DEFAULT_MAX_WAIT = 30
+
+# Lama provider dianggap penuh setelah membalas 429 tanpa keterangan (detik)
+DEFAULT_BACKOFF = 60
+
+WINDOW = 60.0
+
+class QuotaExceeded(Exception):
+    """Permintaan ditolak karena kuota provider habis atau harus menunggu terlalu lama"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = 429
+
+class UsageTracker:
+    """Pencatat pemakaian dan kontrol penerimaan permintaan per akun provider"""
+
+    def __init__(self, config=None, path=USAGE_FILE):
+        """
+        Inisialisasi pencatat dan muat pemakaian hari ini dari berkas
+
+        Args:
+            config (dict, optional): Bagian "usage" dari config.json. Defaults to None.
+            path (str, optional): Lokasi berkas pemakaian. Defaults to USAGE_FILE.
+        """
+        config = config or {}
+        self.path = path
+        self.limits = {provider: dict(limits) for provider, limits in DEFAULT_LIMITS.items()}
+        for provider, limits in config.get("limits", {}).items():
+            self.limits.setdefault(provider, {}).update(limits)
+        self.max_wait = config.get("max_wait_s", DEFAULT_MAX_WAIT)
+        self.reroute = config.get("reroute", True)
+
+        self._lock = threading.Lock()
+        self._accounts = self._load()
+        self._recent = {}
+        self._blocked_until = {}
+        self._listeners = []
+
+        self.paced = 0
+        self.rejected = 0
+
+        registry.register_source("usage", self.stats)
+
+    def add_listener(self, callback):
+        """
+        Mendaftarkan fungsi tanpa argumen yang dipanggil setiap kali pemakaian berubah
+
+        Callback dipanggil dari thread pekerja.
+        """
+        self._listeners.append(callback)
+
+    def delay(self, provider, api_key, tokens=0, count=1):
+        """
+        Menghitung berapa lama permintaan harus menunggu agar tetap dalam batas
+
+        Args:
+            provider (str): Provider AI
+            api_key (str): API key yang dipakai
+            tokens (int, optional): Perkiraan token permintaan. Defaults to 0.
+            count (int, optional): Jumlah permintaan. Defaults to 1.
+
+        Returns:
+            float: Detik menunggu; 0 jika bisa langsung dikirim, inf jika kuota harian habis
+        """
+        with self._lock:
+            return self._delay(provider, _account(provider, api_key), tokens, count, time.monotonic())
+
+    def admit(self, provider, api_key, tokens=0, count=1, wait=True):
+        """
+        Menunggu sampai permintaan boleh dikirim lalu mencatatnya ke jendela per menit
+
+        Args:
+            provider (str): Provider AI
+            api_key (str): API key yang dipakai
+            tokens (int, optional): Perkiraan token permintaan. Defaults to 0.
+            count (int, optional): Jumlah permintaan yang dikirim sekaligus. Defaults to 1.
+            wait (bool, optional): False untuk langsung menolak jika harus menunggu. Defaults to True.
+
+        Raises:
+            QuotaExceeded: Jika kuota harian habis atau harus menunggu lebih dari max_wait
+        """
+        account = _account(provider, api_key)
+        paced = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._delay(provider, account, tokens, count, now)
+                if delay <= 0:
+                    recent = self._recent.setdefault(account, deque())
+                    for _ in range(count):
+                        recent.append((now, tokens / count))
+                    entry = self._today(account)
+                    entry["requests"] += count
+                    entry["total_requests"] += count
+                    if paced:
+                        self.paced += 1
+                    return
+
+                if not wait or delay > self.max_wait:
+                    self.rejected += 1
+                    registry.increment("usage.rejected_events")
+                    raise QuotaExceeded(_quota_message(provider, delay), retry_after=delay)
+
+            # Tunggu di thread pekerja (bukan thread GUI) sampai jendela per menit bergeser
+            paced = True
+            time.sleep(min(delay, 1.0))
+
+    def record(self, provider, api_key, prompt_tokens, completion_tokens, estimated=False):
+        """
+        Mencatat token yang dipakai oleh satu respons dan menyimpannya ke berkas
+
+        Args:
+            provider (str): Provider AI
+            api_key (str): API key yang dipakai
+            prompt_tokens (int): Token masukan
+            completion_tokens (int): Token keluaran
+            estimated (bool, optional): True jika token diperkirakan dari panjang teks. Defaults to False.
+        """
+        account = _account(provider, api_key)
+        with self._lock:
+            entry = self._today(account)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["total_tokens"] += prompt_tokens + completion_tokens
+            if estimated:
+                entry["estimated"] += 1
+            self._save()
+        self._notify()
+
+    def note_rate_limited(self, provider, api_key, retry_after=None):
+        """
+        Mencatat bahwa provider menolak permintaan dengan 429
+
+        Args:
+            provider (str): Provider AI
+            api_key (str): API key yang dipakai
+            retry_after (float, optional): Detik sebelum boleh mencoba lagi. Defaults to DEFAULT_BACKOFF.
+        """
+        account = _account(provider, api_key)
+        with self._lock:
+            self._blocked_until[account] = time.monotonic() + (retry_after or DEFAULT_BACKOFF)
+        registry.increment("usage.rate_limited_events")
+        self._notify()
+
+    def remaining(self, provider, api_key):
+        """
+        Mengembalikan pemakaian hari ini dan sisa kuota untuk ditampilkan di toolbar
+
+        Args:
+            provider (str): Provider AI
+            api_key (str): API key yang dipakai
+
+        Returns:
+            dict: requests, tokens, serta rpd_left/rpm_left jika provider memiliki batas
+        """
+        account = _account(provider, api_key)
+        limits = self.limits.get(provider, {})
+        with self._lock:
+            entry = self._today(account)
+            result = {"requests": entry["requests"], "tokens": entry["total_tokens"]}
+            if limits.get("rpd"):
+                result["rpd_left"] = max(0, limits["rpd"] - entry["requests"])
+            if limits.get("rpm"):
+                recent = self._prune(account, time.monotonic())
+                result["rpm_left"] = max(0, limits["rpm"] - len(recent))
+            blocked = self._blocked_until.get(account, 0) - time.monotonic()
+            if blocked > 0:
+                result["blocked_s"] = int(blocked)
+        return result
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Permintaan dan token hari ini per akun, serta jumlah permintaan yang ditahan/ditolak
+        """
+        with self._lock:
+            result = {"paced": self.paced, "rejected": self.rejected}
+            for account in list(self._accounts):
+                entry = self._today(account)
+                result[f"{account}.requests"] = entry["requests"]
+                result[f"{account}.tokens"] = entry["total_tokens"]
+                result[f"{account}.lifetime_tokens"] = entry["lifetime_tokens"] + entry["total_tokens"]
+            return result
+
+    def _delay(self, provider, account, tokens, count, now):
+        """Menghitung lama menunggu untuk satu akun (lock harus dipegang)"""
+        limits = self.limits.get(provider)
+        delay = self._blocked_until.get(account, 0) - now
+        if not limits:
+            return max(0.0, delay)
+
+        if limits.get("rpd") and self._today(account)["requests"] + count > limits["rpd"]:
+            return float("inf")
+
+        recent = self._prune(account, now)
+        if limits.get("rpm") and recent and len(recent) + count > limits["rpm"]:
+            # Permintaan tertua harus keluar dari jendela sebelum ada tempat
+            index = min(len(recent) - 1, len(recent) + count - limits["rpm"] - 1)
+            delay = max(delay, recent[index][0] + WINDOW - now)
+        if limits.get("tpm") and recent and sum(used for _, used in recent) + tokens > limits["tpm"]:
+            delay = max(delay, recent[0][0] + WINDOW - now)
+        return max(0.0, delay)
+
+    def _prune(self, account, now):
+        """Membuang permintaan yang sudah keluar dari jendela per menit (lock harus dipegang)"""
+        recent = self._recent.setdefault(account, deque())
+        while recent and now - recent[0][0] >= WINDOW:
+            recent.popleft()
+        return recent
+
+    def _today(self, account):
+        """Entri pemakaian hari ini; pemakaian kemarin dipindahkan ke total (lock harus dipegang)"""
+        today = date.today().isoformat()
+        entry = self._accounts.get(account)
+        if entry is None or entry.get("date") != today:
+            lifetime = 0
+            total_requests = 0
+            if entry is not None:
+                lifetime = entry.get("lifetime_tokens", 0) + entry.get("total_tokens", 0)
+                total_requests = entry.get("total_requests", 0)
+            entry = {
+                "date": today,
+                "requests": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0,
+                "estimated": 0,
+                "total_requests": total_requests,
+                "lifetime_tokens": lifetime,
+            }
+            self._accounts[account] = entry
+        return entry
+
+    def _notify(self):
+        """Memberi tahu listener bahwa pemakaian berubah"""
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Error pada listener pemakaian: %s", e)
+
+    def _load(self):
+        """Membaca pemakaian dari berkas"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                accounts = json.load(f).get("accounts", {})
+            return accounts if isinstance(accounts, dict) else {}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error("Error saat membaca data pemakaian: %s", e)
+            return {}
+
+    def _save(self):
+        """Menyimpan pemakaian secara atomik (lock harus dipegang)"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"accounts": self._accounts}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Error saat menyimpan data pemakaian: %s", e)
+
+def _account(provider, api_key):
+    """Nama akun untuk pencatatan; API key tidak pernah disimpan, hanya sidik jarinya"""
+    digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:8]
+    return f"{provider}:{digest}"
+
+def _quota_message(provider, delay):
+    """Pesan untuk pengguna saat permintaan ditolak oleh kontrol kuota"""
+    if delay == float("inf"):
+        tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        return f"Kuota harian {provider} sudah habis. Coba lagi setelah {tomorrow:%d-%m-%Y %H:%M} atau ganti provider."
+    return f"Batas permintaan {provider} tercapai. Coba lagi dalam {int(delay) + 1} detik."
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul watchdog event loop untuk EduBot
+Mengukur keterlambatan event loop Qt dan merekam stack thread GUI saat jendela macet
+"""
+import os
+import sys
+import logging
+import time
+import threading
+import traceback
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Nilai bawaan yang dapat diubah melalui bagian "watchdog" di config.json
+DEFAULT_INTERVAL_MS = 100
+DEFAULT_THRESHOLD_MS = 250
+
+# Jumlah kemacetan terakhir dan pelaku terburuk yang disimpan
+MAX_RECENT_STALLS = 20
+MAX_OFFENDERS = 5
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Stall:
+    """Satu kejadian event loop macet"""
+
+    __slots__ = ("started", "duration_ms", "location", "stack")
+
+    def __init__(self, started, duration_ms, location, stack):
+        self.started = started
+        self.duration_ms = duration_ms
+        self.location = location
+        self.stack = stack
+
+class StallWatchdog(QObject):
+    """Watchdog berbasis detak QTimer di thread GUI dan thread pengamat terpisah"""
+
+    def __init__(self, config=None, parent=None):
+        """
+        Inisialisasi watchdog
+
+        Args:
+            config (dict, optional): Bagian "watchdog" dari config.json. Defaults to None.
+            parent (QObject, optional): Induk Qt. Defaults to None.
+        """
+        super().__init__(parent)
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.interval = config.get("interval_ms", DEFAULT_INTERVAL_MS) / 1000.0
+        self.threshold = config.get("threshold_ms", DEFAULT_THRESHOLD_MS) / 1000.0
+
+        self._lock = threading.Lock()
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._pending_stack = None
+        self._stopped = threading.Event()
+
+        self.lag_ms = 0
+        self.stall_count = 0
+        self.total_stall_ms = 0
+        self.max_stall_ms = 0
+        self.recent = deque(maxlen=MAX_RECENT_STALLS)
+        self._offenders = {}
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(self.interval * 1000))
+        self.timer.timeout.connect(self._beat)
+
+        registry.register_source("watchdog", self.stats)
+
+    def start(self):
+        """Memulai detak di thread GUI dan thread pengamat (harus dipanggil dari thread GUI)"""
+        if not self.enabled:
+            return
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self.timer.start()
+        threading.Thread(target=self._watch, name="edubot-watchdog", daemon=True).start()
+
+    def stop(self):
+        """Menghentikan watchdog"""
+        self.timer.stop()
+        self._stopped.set()
+
+    def worst_offenders(self):
+        """
+        Mengembalikan lokasi kode yang paling sering/lama membuat event loop macet
+
+        Returns:
+            list: Daftar (lokasi, jumlah, durasi maksimum ms), yang terburuk lebih dulu
+        """
+        with self._lock:
+            offenders = [(location, count, worst) for location, (count, worst) in self._offenders.items()]
+        offenders.sort(key=lambda item: (item[2], item[1]), reverse=True)
+        return offenders[:MAX_OFFENDERS]
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Jumlah kemacetan, durasi, lag terakhir, dan pelaku terburuk
+        """
+        with self._lock:
+            result = {
+                "lag_ms": self.lag_ms,
+                "stalls": self.stall_count,
+                "stall_total_ms": self.total_stall_ms,
+                "stall_max_ms": self.max_stall_ms,
+            }
+            last = self.recent[-1] if self.recent else None
+        if last is not None:
+            result["last"] = f"{last.duration_ms} ms @ {last.location}"
+        for rank, (location, count, worst) in enumerate(self.worst_offenders(), start=1):
+            result[f"worst.{rank}"] = f"{worst} ms (x{count}) @ {location}"
+        return result
+
+    def _beat(self):
+        """Detak di thread GUI; selisih dari interval adalah lag event loop"""
+        now = time.monotonic()
+        with self._lock:
+            gap = now - self._last_beat
+            self._last_beat = now
+            stack = self._pending_stack
+            self._pending_stack = None
+
+        lag = max(0.0, gap - self.interval)
+        self.lag_ms = int(lag * 1000)
+        if lag >= self.threshold:
+            self._record(now - gap, self.lag_ms, stack)
+
+    def _watch(self):
+        """Thread pengamat: merekam stack thread GUI selagi event loop masih macet"""
+        check = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(check):
+            with self._lock:
+                late = time.monotonic() - self._last_beat - self.interval
+                need_stack = late >= self.threshold and self._pending_stack is None
+            if need_stack:
+                frame = sys._current_frames().get(self._gui_thread_id)
+                if frame is not None:
+                    stack = traceback.extract_stack(frame)
+                    with self._lock:
+                        self._pending_stack = stack
+
+    def _record(self, started, duration_ms, stack):
+        """Mencatat satu kemacetan dan menuliskannya ke log"""
+        location = _blame(stack) if stack else "tidak diketahui"
+        stall = Stall(started, duration_ms, location, stack)
+
+        with self._lock:
+            self.stall_count += 1
+            self.total_stall_ms += duration_ms
+            self.max_stall_ms = max(self.max_stall_ms, duration_ms)
+            self.recent.append(stall)
+            count, worst = self._offenders.get(location, (0, 0))
+            self._offenders[location] = (count + 1, max(worst, duration_ms))
+
+        registry.increment("watchdog.stall_events")
+        if stack:
+            logger.warning(
+                "Event loop macet %s ms di %s\n%s",
+                duration_ms, location, "".join(traceback.format_list(stack[-8:])).rstrip(),
+                extra={"elapsed_ms": duration_ms}
+            )
+        else:
+            logger.warning("Event loop macet %s ms di %s", duration_ms, location, extra={"elapsed_ms": duration_ms})
+
+def _blame(stack):
+    """Lokasi paling dalam di kode EduBot (bukan PyQt/pustaka) dari stack yang direkam"""
+    for frame in reversed(stack):
+        if os.path.dirname(os.path.abspath(frame.filename)) == _SRC_DIR and not frame.filename.endswith("watchdog.py"):
+            return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    frame = stack[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
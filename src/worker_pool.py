@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modul pool pekerja untuk EduBot
+Menjalankan permintaan AI di sejumlah thread tetap dengan antrean terbatas dan prioritas,
+lalu mengirim hasilnya kembali ke thread GUI melalui sinyal Qt
+"""
+import heapq
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from metrics import registry
+
+# Prioritas tugas (angka lebih kecil dijalankan lebih dulu)
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Nilai bawaan yang dapat diubah melalui bagian "workers" di config.json
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_QUEUE = 16
+
+class Task:
+    """Satu tugas di pool beserta callback-nya"""
+
+    __slots__ = ("fn", "priority", "key", "callbacks", "cancelled", "pool")
+
+    def __init__(self, pool, fn, priority, key):
+        self.pool = pool
+        self.fn = fn
+        self.priority = priority
+        self.key = key
+        self.callbacks = []
+        self.cancelled = False
+
+    def report(self, *args):
+        """Mengirim kemajuan tugas ke callback on_progress di thread GUI (dipanggil dari pekerja)"""
+        self.pool._progress.emit(self, args)
+
+    def cancel(self):
+        """Membatalkan tugas yang belum berjalan"""
+        self.cancelled = True
+
+class WorkerPool(QObject):
+    """Pool thread berukuran tetap dengan antrean berprioritas yang dibatasi"""
+
+    # Sinyal internal dari thread pekerja ke thread GUI
+    _finished = pyqtSignal(object, object, object)
+    _progress = pyqtSignal(object, object)
+
+    def __init__(self, config=None, parent=None):
+        """
+        Inisialisasi pool dan jalankan thread pekerja
+
+        Args:
+            config (dict, optional): Bagian "workers" dari config.json. Defaults to None.
+            parent (QObject, optional): Induk Qt. Defaults to None.
+        """
+        super().__init__(parent)
+        config = config or {}
+        self.max_workers = config.get("max_workers", DEFAULT_MAX_WORKERS)
+        self.max_queue = config.get("max_queue", DEFAULT_MAX_QUEUE)
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._counter = itertools.count()
+        self._by_key = {}
+        self._running = 0
+        self._closed = False
+
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.evicted = 0
+        self.max_depth = 0
+
+        self._finished.connect(self._deliver)
+        self._progress.connect(self._deliver_progress)
+
+        for number in range(self.max_workers):
+            threading.Thread(target=self._work, name=f"edubot-worker-{number}", daemon=True).start()
+
+        registry.register_source("workers", self.stats)
+
+    def submit(self, fn, on_done, on_error=None, on_progress=None, priority=INTERACTIVE, key=None):
+        """
+        Menjadwalkan fungsi di pool
+
+        Args:
+            fn (callable): Fungsi yang dijalankan di thread pekerja; menerima Task sebagai argumen
+            on_done (callable): Dipanggil di thread GUI dengan hasil fn
+            on_error (callable, optional): Dipanggil di thread GUI dengan kesalahan.
+                Defaults to None (on_done dipanggil dengan teks "Error: ...").
+            on_progress (callable, optional): Dipanggil di thread GUI dengan argumen Task.report.
+                Defaults to None.
+            priority (int, optional): INTERACTIVE atau BACKGROUND. Defaults to INTERACTIVE.
+            key (hashable, optional): Tugas dengan kunci sama yang masih antre atau berjalan
+                digabung menjadi satu; on_done yang sama hanya dipanggil sekali.
+                Defaults to None.
+
+        Returns:
+            Task: Tugas yang dijadwalkan (atau digabung), None jika antrean penuh
+        """
+        callbacks = (on_done, on_error, on_progress)
+        evicted = None
+
+        with self._condition:
+            if self._closed:
+                return None
+
+            # Klik beruntun untuk permintaan yang sama ikut menunggu tugas yang sudah ada
+            if key is not None:
+                existing = self._by_key.get(key)
+                if existing is not None and not existing.cancelled:
+                    # on_done yang sudah terpasang (misalnya metode yang sama) tidak dipanggil dua kali
+                    if all(on_done != attached for attached, _, _ in existing.callbacks):
+                        existing.callbacks.append(callbacks)
+                    self.coalesced += 1
+                    return existing
+
+            if len(self._queue) >= self.max_queue:
+                evicted = self._evict_for(priority)
+                if evicted is None:
+                    self.rejected += 1
+                    registry.increment("workers.rejected_events")
+                    return None
+
+            task = Task(self, fn, priority, key)
+            task.callbacks.append(callbacks)
+            heapq.heappush(self._queue, (priority, next(self._counter), task))
+            if key is not None:
+                self._by_key[key] = task
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify()
+
+        if evicted is not None:
+            self._finished.emit(evicted, None, RuntimeError("Permintaan latar belakang dibatalkan karena antrean penuh"))
+        return task
+
+    def pending(self, key):
+        """Memeriksa apakah tugas dengan kunci ini masih antre atau berjalan"""
+        with self._condition:
+            task = self._by_key.get(key)
+            return task is not None and not task.cancelled
+
+    def queue_depth(self):
+        """Mengembalikan jumlah tugas yang menunggu"""
+        with self._condition:
+            return len(self._queue)
+
+    def shutdown(self):
+        """Menghentikan pekerja setelah tugas yang sedang berjalan selesai"""
+        with self._condition:
+            self._closed = True
+            for _, _, task in self._queue:
+                task.cancelled = True
+            self._queue.clear()
+            self._by_key.clear()
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Mengembalikan statistik untuk diagnostik
+
+        Returns:
+            dict: Kedalaman antrean, pekerja aktif, dan jumlah tugas per hasil
+        """
+        with self._condition:
+            return {
+                "queued": len(self._queue),
+                "running": self._running,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "max_depth": self.max_depth,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "coalesced": self.coalesced,
+                "evicted": self.evicted,
+            }
+
+    def _evict_for(self, priority):
+        """
+        Membuang tugas antre berprioritas lebih rendah agar tugas baru muat (lock harus dipegang)
+
+        Returns:
+            Task: Tugas yang dibuang, atau None jika tidak ada yang bisa dibuang
+        """
+        lowest = max(self._queue, key=lambda entry: (entry[0], entry[1]), default=None)
+        if lowest is None or lowest[0] <= priority:
+            return None
+
+        self._queue.remove(lowest)
+        heapq.heapify(self._queue)
+        task = lowest[2]
+        task.cancelled = True
+        if task.key is not None and self._by_key.get(task.key) is task:
+            del self._by_key[task.key]
+        self.evicted += 1
+        return task
+
+    def _work(self):
+        """Loop thread pekerja"""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                _, _, task = heapq.heappop(self._queue)
+                if task.cancelled:
+                    continue
+                self._running += 1
+
+            result = error = None
+            try:
+                result = task.fn(task)
+            except Exception as e:
+                error = e
+
+            with self._condition:
+                self._running -= 1
+                if task.key is not None and self._by_key.get(task.key) is task:
+                    del self._by_key[task.key]
+                if error is None:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+            self._finished.emit(task, result, error)
+
+    def _deliver(self, task, result, error):
+        """Memanggil callback tugas di thread GUI"""
+        with self._condition:
+            callbacks = list(task.callbacks)
+
+        for on_done, on_error, _ in callbacks:
+            if error is None:
+                on_done(result)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                on_done(f"Error: {str(error)}")
+
+    def _deliver_progress(self, task, args):
+        """Meneruskan kemajuan tugas ke callback on_progress di thread GUI"""
+        with self._condition:
+            callbacks = list(task.callbacks)
+
+        for _, _, on_progress in callbacks:
+            if on_progress is not None:
+                on_progress(*args)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tes cache semantik EduBot
+Pertanyaan lanjutan yang sama setelah riwayat berbeda tidak boleh saling memakai jawaban
+
+Jalankan dari direktori repositori:
+    python3 -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from semantic_cache import SemanticCache
+
+SYSTEM_PROMPT = "Anda adalah asisten yang ahli dalam perintah terminal Linux."
+
+# Sidik jari riwayat (lihat BaseAPI.history_fingerprint) setelah dua percakapan berbeda
+HISTORY_LS = (2, hash("ls -la menampilkan semua berkas, termasuk berkas tersembunyi."))
+HISTORY_CHMOD = (2, hash("chmod mengubah izin akses berkas."))
+
+def test_follow_up_after_different_history_misses():
+    cache = SemanticCache()
+    cache.store("chat", SYSTEM_PROMPT, "berikan contohnya", "Contoh: ls -la /etc", HISTORY_LS)
+
+    assert cache.lookup("chat", SYSTEM_PROMPT, "berikan contohnya", HISTORY_CHMOD) is None
+    assert cache.lookup("chat", SYSTEM_PROMPT, "contohnya?", HISTORY_CHMOD) is None
+    assert not cache.contains("chat", SYSTEM_PROMPT, "berikan contohnya", HISTORY_CHMOD)
+
+def test_follow_up_after_same_history_hits():
+    cache = SemanticCache()
+    cache.store("chat", SYSTEM_PROMPT, "berikan contohnya", "Contoh: ls -la /etc", HISTORY_LS)
+
+    assert cache.lookup("chat", SYSTEM_PROMPT, "berikan contohnya", HISTORY_LS) == "Contoh: ls -la /etc"
+
+def test_follow_up_misses_first_turn_answer():
+    cache = SemanticCache()
+    cache.store("chat", SYSTEM_PROMPT, "jelaskan lebih lanjut", "Jawaban tanpa konteks")
+
+    assert cache.lookup("chat", SYSTEM_PROMPT, "jelaskan lebih lanjut", HISTORY_LS) is None
+    assert cache.lookup("chat", SYSTEM_PROMPT, "jelaskan lebih lanjut", (0, None)) == "Jawaban tanpa konteks"
+
+def test_only_first_turns_are_shared():
+    cache = SemanticCache()
+    cache.store("chat", SYSTEM_PROMPT, "apa fungsi ls -la", "Menampilkan semua berkas")
+    cache.store("chat", SYSTEM_PROMPT, "berikan contohnya", "Contoh: ls -la /etc", HISTORY_LS)
+
+    assert [text for _, text, _ in cache.entries(first_turn_only=True)] == ["ls -la"]
+    assert len(cache.entries()) == 2